@@ -0,0 +1,67 @@
+"""
+Script measuring the cost per cell of building the diagram XML.
+
+For the sample interfaces and scaled up copies of them, it reports the time to build
+the XML of the diagram divided by the number of mxCell elements, and the number of
+memory blocks allocated per cell.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from src.main.data_definitions import SourceStructure
+from src.main.interface_diagram import InterfaceDiagram
+from src.main.json_parser import JSONParser
+
+from scripts.benchmark_cell_ids import JSON_FILE, SCALES, scale_records
+
+REPEAT = 5
+
+
+def measure(interfaces):
+    """
+    Build the diagram XML, returning the number of cells, the best time per cell and the
+    number of memory blocks allocated per cell.
+    """
+    best_time = None
+    for _ in range(REPEAT):
+        diagram = InterfaceDiagram(interfaces)
+        start = time.perf_counter()
+        diagram.build_xml_file()
+        elapsed = time.perf_counter() - start
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+
+    cells = len(diagram.xml_content['root'])
+
+    diagram = InterfaceDiagram(interfaces)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    diagram.build_xml_file()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+
+    return cells, best_time / cells, blocks / cells
+
+
+def main():
+    """Run the benchmark and print one line per input size."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--json-file', default=JSON_FILE)
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as file_content:
+        records = json.load(file_content)
+
+    print(f'{"records":>8} {"cells":>7} {"us/cell":>8} {"blocks/cell":>12}')
+    for scale in args.scales:
+        scaled = scale_records(records, scale)
+        interfaces = JSONParser.json_to_object([SourceStructure(**item) for item in scaled])
+        cells, cell_time, cell_blocks = measure(interfaces)
+        print(f'{len(scaled):>8} {cells:>7} {cell_time * 1e6:>8.2f} {cell_blocks:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
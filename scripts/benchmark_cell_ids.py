@@ -0,0 +1,82 @@
+"""
+Script comparing the 'name' and 'short' mxCell id strategies of the InterfaceDiagram.
+
+For the sample interfaces and scaled up copies of them, it reports the size of the XML,
+the time to build and encode it and the length of the final URL.
+"""
+import argparse
+import json
+import time
+import xml.etree.ElementTree as ET
+
+from src.main import config
+from src.main.data_definitions import SourceStructure
+from src.main.encoding_helper import EncodingHelper
+from src.main.interface_diagram import InterfaceDiagram
+from src.main.json_parser import JSONParser
+
+JSON_FILE = 'src/tests/test_data/interfaces.json'
+SCALES = (1, 4, 16)
+REPEAT = 5
+
+
+def scale_records(records, scale):
+    """
+    Repeat the records, with distinct code ids and connected apps on each copy.
+    """
+    connected_apps = {record['app_name'] for record in records
+                      if record['app_type'] == 'connected_app'}
+
+    def rename(app_name, copy):
+        return f'{app_name} #{copy}' if app_name in connected_apps else app_name
+
+    scaled = []
+    for copy in range(scale):
+        for record in records:
+            record = dict(record)
+            record['code_id'] = f'{record["code_id"]} #{copy}'
+            record['app_name'] = rename(record['app_name'], copy)
+            record['connection_app'] = rename(record['connection_app'], copy)
+            scaled.append(record)
+    return scaled
+
+
+def measure(records, id_strategy):
+    """
+    Build and encode the diagram, returning the XML size, the best time and the URL length.
+    """
+    encoder = EncodingHelper()
+    best_time = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        interfaces = JSONParser.json_to_object([SourceStructure(**item) for item in records])
+        diagram = InterfaceDiagram(interfaces, id_strategy=id_strategy)
+        diagram.build_xml_file()
+        xml_data = ET.tostring(diagram.xml_content['mxfile'])
+        url = 'https://viewer.diagrams.net/?#R' + encoder.encode_diagram_data(xml_data)
+        elapsed = time.perf_counter() - start
+        best_time = elapsed if best_time is None else min(best_time, elapsed)
+    return len(xml_data), best_time, len(url)
+
+
+def main():
+    """Run the benchmark and print one line per input size and strategy."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--json-file', default=JSON_FILE)
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES)
+    args = parser.parse_args()
+
+    with open(args.json_file, 'r', encoding='utf-8') as file_content:
+        records = json.load(file_content)
+
+    print(f'{"records":>8} {"strategy":>8} {"xml bytes":>10} {"ms":>8} {"url length":>11}')
+    for scale in args.scales:
+        scaled = scale_records(records, scale)
+        for id_strategy in config.ID_STRATEGIES:
+            xml_size, elapsed, url_length = measure(scaled, id_strategy)
+            print(f'{len(scaled):>8} {id_strategy:>8} {xml_size:>10} '
+                  f'{elapsed * 1000:>8.1f} {url_length:>11}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Script comparing the latency of the first and the following invocations of a container.
+
+It reports the time to create the S3 getter of an invocation, with a new boto3 client per
+invocation as before and with the shared client, and the latency of the API handler on
+the sample interfaces. Run it in a new process, so the first invocation is cold.
+"""
+import argparse
+import os
+import time
+
+import boto3
+
+from src.main import shared_resources
+from src.main.lambda_api_function import lambda_handler
+from src.main.s3_interface_url_getter import S3InterfaceURLGetter
+
+JSON_FILE = 'src/tests/test_data/interfaces.json'
+SOURCE_DIR = 's3://interface-diagram-files/in/'
+EXCEL_FILE = 's3://interface-diagram-files/out/interfaces_diagrams_urls.xlsx'
+INVOCATIONS = 10
+
+
+def measure(invoke, invocations):
+    """
+    Call invoke the given number of times, returning the first and the mean of the
+    following latencies, in milliseconds.
+    """
+    latencies = []
+    for _ in range(invocations):
+        start = time.perf_counter()
+        invoke()
+        latencies.append((time.perf_counter() - start) * 1000)
+    following = latencies[1:] or latencies
+    return latencies[0], sum(following) / len(following)
+
+
+def main():
+    """Run the benchmark and print one line per scenario."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--json-file', default=JSON_FILE)
+    parser.add_argument('--invocations', type=int, default=INVOCATIONS)
+    args = parser.parse_args()
+
+    # Creating a client needs a region, not credentials nor network
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with open(args.json_file, 'r', encoding='utf-8') as file_content:
+        event = {'body': file_content.read()}
+
+    scenarios = [
+        ('getter, new client', lambda: S3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=boto3.client('s3'))),
+        ('getter, shared client', lambda: S3InterfaceURLGetter(SOURCE_DIR, EXCEL_FILE)),
+        ('api handler', lambda: lambda_handler(event, None)),
+    ]
+
+    print(f'{"scenario":<24} {"first ms":>9} {"next ms":>9}')
+    for name, invoke in scenarios:
+        shared_resources.reset()
+        first, following = measure(invoke, args.invocations)
+        print(f'{name:<24} {first:>9.1f} {following:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
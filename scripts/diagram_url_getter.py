@@ -5,9 +5,13 @@ This module contains a script that reads JSON files from a specified directory,
 processes the contents of these files, and updates an Excel file with the parsed data.
 If no JSON files are found, a blank record is created in the Excel file.
 
-Usage: setup a scheduler to run the E2E Flow diagram local or on a server
+Usage: setup a scheduler to run the E2E Flow diagram local or on a server, or run it
+with --watch to keep the Excel file up to date as files are dropped in the directory.
 """
+import argparse
+
 from src.main.local_interface_url_getter import LocalInterfaceURLGetter
+from src.main.watch_local_interface_url_getter import WatchLocalInterfaceURLGetter
 
 SOURCE_DIR = './diagram/in'
 EXCEL_FILE = './diagram/out/interfaces_diagrams_urls.xlsx'
@@ -15,6 +19,21 @@ EXCEL_FILE = './diagram/out/interfaces_diagrams_urls.xlsx'
 
 def main():
     """main function"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--watch', action='store_true',
+                        help='watch the source directory instead of running once')
+    parser.add_argument('--debounce', type=float, default=1.0,
+                        help='seconds without change before a file is processed')
+    args = parser.parse_args()
+
+    if args.watch:
+        getter = WatchLocalInterfaceURLGetter(SOURCE_DIR, EXCEL_FILE, debounce=args.debounce)
+        try:
+            getter.watch()
+        except KeyboardInterrupt:
+            pass
+        return
+
     getter = LocalInterfaceURLGetter(SOURCE_DIR, EXCEL_FILE)
     getter.process_json_files()
     getter.save_results()
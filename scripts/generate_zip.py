@@ -58,9 +58,15 @@ def main() -> None:
         API_ZIP,
         [
             ('src/main/lambda_api_function.py', 'src/main/lambda_api_function.py'),
+            ('src/main/diagram_rendering.py', 'src/main/diagram_rendering.py'),
+            ('src/main/http_encoding.py', 'src/main/http_encoding.py'),
             ('src/main/interface_diagram.py', 'src/main/interface_diagram.py'),
+            ('src/main/render_profile.py', 'src/main/render_profile.py'),
             ('src/main/encoding_helper.py', 'src/main/encoding_helper.py'),
             ('src/main/logging_utils.py', 'src/main/logging_utils.py'),
+            ('src/main/shared_resources.py', 'src/main/shared_resources.py'),
+            ('src/main/profiling.py', 'src/main/profiling.py'),
+            ('src/main/storage.py', 'src/main/storage.py'),
             ('src/main/data_definitions.py', 'src/main/data_definitions.py'),
             ('src/main/json_parser.py', 'src/main/json_parser.py'),
             ('src/main/config.py', 'src/main/config.py')
@@ -74,14 +80,29 @@ def main() -> None:
         [
             ('src/main/lambda_s3_function.py', 'src/main/lambda_s3_function.py'),
             ('src/main/interface_diagram.py', 'src/main/interface_diagram.py'),
+            ('src/main/render_profile.py', 'src/main/render_profile.py'),
             ('src/main/encoding_helper.py', 'src/main/encoding_helper.py'),
             ('src/main/logging_utils.py', 'src/main/logging_utils.py'),
+            ('src/main/shared_resources.py', 'src/main/shared_resources.py'),
+            ('src/main/profiling.py', 'src/main/profiling.py'),
             ('src/main/data_definitions.py', 'src/main/data_definitions.py'),
             ('src/main/json_parser.py', 'src/main/json_parser.py'),
             ('src/main/excel_utils.py', 'src/main/excel_utils.py'),
+            ('src/main/result_collector.py', 'src/main/result_collector.py'),
+            ('src/main/storage.py', 'src/main/storage.py'),
+            ('src/main/batch_operations.py', 'src/main/batch_operations.py'),
+            ('src/main/interface_url_getter.py', 'src/main/interface_url_getter.py'),
+            ('src/main/diagram_rendering.py', 'src/main/diagram_rendering.py'),
+            ('src/main/json_stream.py', 'src/main/json_stream.py'),
+            ('src/main/csv_ingestion.py', 'src/main/csv_ingestion.py'),
+            ('src/main/manifest.py', 'src/main/manifest.py'),
+            ('src/main/time_budget.py', 'src/main/time_budget.py'),
+            ('src/main/sharding.py', 'src/main/sharding.py'),
             ('src/main/config.py', 'src/main/config.py'),
             ('src/main/s3_interface_url_getter.py',
-             'src/main/s3_interface_url_getter.py')
+             'src/main/s3_interface_url_getter.py'),
+            ('src/main/async_s3_interface_url_getter.py',
+             'src/main/async_s3_interface_url_getter.py')
         ]
     )
 
@@ -0,0 +1,220 @@
+"""
+Script load testing the diagram API, in-process or through the local HTTP server.
+
+It replays synthetic payloads, scaled up copies of the sample interfaces, and recorded
+payloads, Json files of interface records, at a given concurrency and, optionally, a
+given request rate. It reports the throughput, the latency percentiles, the responses
+by status and, in-process, the peak memory of the process, e.g. to size the memory of
+the Lambda and to detect regressions:
+    python -m scripts.load_test_api --requests 500 --concurrency 8 --scales 1 16
+    python -m scripts.load_test_api --url http://127.0.0.1:8080/ --rate 50 --json
+"""
+import argparse
+import gc
+import http.client
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from src.main.lambda_api_function import lambda_handler
+
+from scripts.benchmark_cell_ids import JSON_FILE, scale_records
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+REQUESTS = 200
+CONCURRENCY = 4
+SCALES = (1, 4)
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: Sequence[float], rank: float) -> float:
+    """
+    Return the nearest-rank percentile of sorted values.
+    """
+    if not values:
+        return 0.0
+    index = max(int(round(rank / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def load_payloads(json_file: str, scales: Sequence[int],
+                  recorded: Sequence[str]) -> List[Tuple[str, List[Dict]]]:
+    """
+    Return the named payloads: the sample records scaled up, then the recorded files.
+    """
+    with open(json_file, 'r', encoding='utf-8') as file_content:
+        records = json.load(file_content)
+
+    payloads = [(f'synthetic x{scale}', scale_records(records, scale)) for scale in scales]
+    for file_name in recorded:
+        with open(file_name, 'r', encoding='utf-8') as file_content:
+            payloads.append((file_name, json.load(file_content)))
+    return payloads
+
+
+def make_body(records: List[Dict], sequence: int, unique: bool) -> str:
+    """
+    Serialize a payload, tagging its code ids so the URL cache does not answer it.
+    """
+    if unique:
+        records = [dict(record, code_id=f'{record["code_id"]} ~{sequence}')
+                   for record in records]
+    return json.dumps(records)
+
+
+class InProcessTarget:  # pylint: disable=too-few-public-methods
+    """
+    Calls the Lambda handler in the current process.
+    """
+
+    def __call__(self, body: str) -> int:
+        try:
+            return lambda_handler({'body': body}, None)['statusCode']
+        except (KeyError, TypeError, ValueError):
+            # Unhandled by the handler, answered with a 502 by API Gateway
+            return 502
+
+
+class HttpTarget:  # pylint: disable=too-few-public-methods
+    """
+    Posts to the local HTTP server, over a kept-alive connection per thread.
+    """
+
+    def __init__(self, url: str) -> None:
+        url = urlsplit(url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.path = (url.path or '/') + (f'?{url.query}' if url.query else '')
+        self._local = threading.local()
+
+    def __call__(self, body: str) -> int:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(
+                self.host, self.port)
+        try:
+            connection.request('POST', self.path, body.encode('utf-8'),
+                               {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            return 0
+
+
+def run_load(target: Callable[[str], int], bodies: Callable[[int], str], requests: int,
+             concurrency: int, rate: Optional[float]) -> Tuple[List[float], Counter, float]:
+    """
+    Send the requests, concurrency at a time, started at the given rate when set.
+
+    :param bodies: Callable returning the body of the request of a sequence number.
+    :return: Sorted latencies in seconds, responses by status and elapsed seconds.
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def send(sequence: int) -> None:
+        if rate:
+            # Open loop: each request has its start time, whatever the latencies
+            delay = start + sequence / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        body = bodies(sequence)
+        request_start = time.perf_counter()
+        status = target(body)
+        latency = time.perf_counter() - request_start
+        with lock:
+            latencies.append(latency)
+            statuses[status] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, range(requests)))
+
+    return sorted(latencies), statuses, time.perf_counter() - start
+
+
+def peak_memory_mb() -> Optional[float]:
+    """
+    Return the peak resident memory of the process, in MiB, where available.
+    """
+    if resource is None:
+        return None
+    # Kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    """Run the load test of each payload and print one line per payload."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='URL of the local HTTP server. In-process by default.')
+    parser.add_argument('--requests', type=int, default=REQUESTS,
+                        help='Requests sent per payload.')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Requests started per second. As fast as possible by default.')
+    parser.add_argument('--json-file', default=JSON_FILE)
+    parser.add_argument('--scales', type=int, nargs='*', default=SCALES,
+                        help='Scales of the synthetic payloads.')
+    parser.add_argument('--payloads', nargs='*', default=[],
+                        help='Json files of recorded interface records.')
+    parser.add_argument('--cached', action='store_true',
+                        help='Repeat identical bodies, answered from the URL cache.')
+    parser.add_argument('--json', action='store_true', help='Print the report as Json.')
+    args = parser.parse_args()
+
+    target = HttpTarget(args.url) if args.url else InProcessTarget()
+    report = []
+
+    for index, (name, records) in enumerate(
+            load_payloads(args.json_file, args.scales, args.payloads)):
+        # The bodies are built by the senders, so they are not all held in memory, and
+        # the sequence numbers of the payloads do not overlap
+        first_sequence = index * args.requests
+
+        def bodies(sequence, records=records, first_sequence=first_sequence):
+            return make_body(records, first_sequence + sequence, not args.cached)
+
+        gc.collect()
+        latencies, statuses, elapsed = run_load(
+            target, bodies, args.requests, args.concurrency, args.rate)
+        report.append({
+            'payload': name,
+            'records': len(records),
+            'body_bytes': len(bodies(0)),
+            'requests': len(latencies),
+            'throughput': len(latencies) / elapsed if elapsed else 0.0,
+            **{f'p{rank}_ms': percentile(latencies, rank) * 1000 for rank in PERCENTILES},
+            'max_ms': latencies[-1] * 1000 if latencies else 0.0,
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+            # The memory of the server is not visible from the client
+            'peak_memory_mb': None if args.url else peak_memory_mb()
+        })
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f'{"payload":<16} {"records":>8} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} '
+          f'{"p99 ms":>8} {"max ms":>8} {"peak MiB":>9} statuses')
+    for line in report:
+        memory = line['peak_memory_mb']
+        memory = 'n/a' if memory is None else f'{memory:.1f}'
+        print(f'{line["payload"]:<16} {line["records"]:>8} {line["throughput"]:>8.1f} '
+              f'{line["p50_ms"]:>8.1f} {line["p95_ms"]:>8.1f} {line["p99_ms"]:>8.1f} '
+              f'{line["max_ms"]:>8.1f} {memory:>9} {line["statuses"]}')
+
+
+if __name__ == '__main__':
+    main()
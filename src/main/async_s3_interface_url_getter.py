@@ -0,0 +1,160 @@
+"""
+Module to update the Interface Diagram URL Excel file on S3 using asyncio.
+
+This module contains a variant of the S3InterfaceURLGetter that lists and processes S3
+objects concurrently, the moves and deletions being batched as in the base class.
+Each file is processed by the shared _process_file of the base class, so the JSON and
+CSV files, the streamed records, the manifest and the profiling behave as in the sync
+getters. The S3 client calls and the parsing are blocking, so the files are processed
+on a bounded thread pool, while the diagram rendering may be offloaded to a separate
+executor. A bounded queue between the listing and the workers provides back-pressure.
+"""
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+from src.main.interface_url_getter import SOURCE_EXTENSIONS, render_diagram_url
+from src.main.s3_interface_url_getter import S3InterfaceURLGetter
+
+from src.main.logging_utils import debug_logging
+
+
+class AsyncS3InterfaceURLGetter(S3InterfaceURLGetter):
+    """
+    Class to update the Interface Diagram URL Excel file on S3, processing the files
+    concurrently.
+    """
+
+    @debug_logging
+    def __init__(self, source_dir: str, excel_file: str, max_concurrency: int = 16,
+                 render_executor: Optional[Executor] = None, **kwargs):
+        """
+        Initializes with specified S3 directory paths and an empty result collector.
+        The keyword arguments are passed to S3InterfaceURLGetter.
+
+        :param max_concurrency: Maximum number of files processed at the same time,
+            which is also the size of the thread pool used for the S3 calls.
+        :param render_executor: Executor used to render the diagrams of the JSON files.
+            By default they are rendered by the thread processing the file; a
+            ProcessPoolExecutor may be given where multiprocessing is available.
+        """
+        super().__init__(source_dir, excel_file, **kwargs)
+
+        self.max_concurrency = max_concurrency
+        self.render_executor = render_executor
+        self._io_executor = None
+
+    @debug_logging
+    def process_json_files(self):
+        """
+        Processes the JSON and CSV files from the S3 source directory and updates the
+        results.
+        """
+        if not self.file_info['is_s3']:
+            print(f'Not an S3 directory: {self.file_info["source_dir"]}')
+            return
+
+        asyncio.run(self.process_json_files_async())
+
+    async def process_json_files_async(self):
+        """
+        Lists the JSON and CSV files of the S3 source directory and processes them
+        concurrently.
+        """
+        queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as io_executor:
+            self._io_executor = io_executor
+
+            workers = [self._worker(queue) for _ in range(self.max_concurrency)]
+            json_files_found, *_ = await asyncio.gather(
+                self._produce(queue, len(workers)), *workers)
+
+            await self._call(self.flush_operations)
+            await self._call(self.finish_run)
+
+            self._io_executor = None
+
+        if not json_files_found:
+            self.results.append_empty_row()
+
+    async def _call(self, func, *args, **kwargs):
+        """
+        Run a blocking call on the S3 thread pool, in the context of the caller, e.g.
+        its profiling session.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._io_executor, functools.partial(context.run, func, *args, **kwargs))
+
+    async def _produce(self, queue: asyncio.Queue, worker_count: int) -> bool:
+        """
+        List the source directory page by page and queue the JSON and CSV files found.
+        Waits on the queue when the workers are behind, and queues one sentinel per
+        worker once the listing is complete.
+        """
+        json_files_found = False
+        pages = self.source.list_pages()
+
+        while True:
+            page = await self._call(next, pages, None)
+            if page is None:
+                break
+
+            for info in page:
+                if info.key.endswith(SOURCE_EXTENSIONS):
+                    json_files_found = True
+                    await queue.put(info.key)
+
+        for _ in range(worker_count):
+            await queue.put(None)
+
+        return json_files_found
+
+    async def _worker(self, queue: asyncio.Queue):
+        """
+        Process the queued files until a sentinel is received. Once the time budget,
+        if any, runs out, the files are counted as remaining instead of being processed.
+        """
+        while True:
+            key = await queue.get()
+            if key is None:
+                return
+            await self._process_within_budget_async(key)
+
+    async def _process_within_budget_async(self, filename: str):
+        """
+        Processes a file if the time budget allows it, as _process_within_budget does,
+        the processing time of each file being tracked for the next ones.
+        """
+        if self.time_budget is None:
+            await self.process_single_file_async(filename)
+            return
+
+        if not self.time_budget.has_time_for_item():
+            self.remaining += 1
+            return
+
+        start = self.time_budget.start_item()
+        try:
+            await self.process_single_file_async(filename)
+        finally:
+            self.time_budget.finish_item(start)
+
+    async def process_single_file_async(self, filename: str):
+        """
+        Processes a single file of the source directory on the S3 thread pool.
+        """
+        await self._call(self._process_file, filename)
+
+    def _render_url(self, data) -> str:
+        """
+        Render the diagram URL of the records of a JSON file on the render executor,
+        if any, waiting for it in the thread processing the file.
+        """
+        if self.render_executor is None:
+            return super()._render_url(data)
+        return self.render_executor.submit(render_diagram_url, data).result()
@@ -0,0 +1,109 @@
+"""
+This module provides a queue of storage move and delete operations flushed in batches.
+
+The moves are run in parallel when the queue is flushed. On storages with a batch
+deletion (S3), a move is a server-side copy, and the deletions of every moved or
+discarded object are sent together with delete_objects, up to 1,000 keys per request.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.main.storage import Storage, StorageError
+
+
+class BatchOperations:
+    """
+    Queues storage move and delete operations and flushes them in batches.
+    """
+
+    def __init__(self, storage: Storage, max_workers: int = 16) -> None:
+        """
+        Initialize the queue.
+
+        :param storage: Storage backend the operations apply to.
+        :param max_workers: Number of copies run in parallel.
+        """
+        self.storage = storage
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._copies: List[Tuple[str, str]] = []
+        self._deletes: List[str] = []
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of queued operations.
+        """
+        return len(self._copies) + len(self._deletes)
+
+    def queue_move(self, src_key: str, dest_key: str) -> None:
+        """
+        Queue the move of an object. The source is only deleted once the copy succeeded.
+        """
+        with self._lock:
+            self._copies.append((src_key, dest_key))
+
+    def queue_delete(self, key: str) -> None:
+        """
+        Queue the deletion of an object.
+        """
+        with self._lock:
+            self._deletes.append(key)
+
+    def flush(self) -> Dict[str, List]:
+        """
+        Run the queued copies in parallel, then delete the queued and moved objects
+        in batches.
+
+        :return: Dictionary with the 'copied' and 'deleted' key lists and the 'failed'
+            list of (key, error) pairs.
+        """
+        with self._lock:
+            copies, self._copies = self._copies, []
+            deletes, self._deletes = self._deletes, []
+
+        report = {'copied': [], 'deleted': [], 'failed': []}
+
+        if copies:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                errors = list(executor.map(self._copy, copies))
+
+            for (src_key, _), error in zip(copies, errors):
+                if error is not None:
+                    report['failed'].append((src_key, error))
+                elif self.storage.batch_deletes:
+                    report['copied'].append(src_key)
+                    deletes.append(src_key)
+                else:
+                    report['copied'].append(src_key)
+                    report['deleted'].append(src_key)
+
+        if deletes:
+            failed = self.storage.delete_many(deletes)
+            failed_keys = {key for key, _ in failed}
+            report['deleted'].extend(key for key in deletes if key not in failed_keys)
+            report['failed'].extend(failed)
+
+        for key, error in report['failed']:
+            logging.error('Storage operation failed for %s: %s',
+                          self.storage.uri(key), error)
+
+        return report
+
+    def _copy(self, copy: Tuple[str, str]) -> Optional[str]:
+        """
+        Copy an object, returning None on success or the error message. When the
+        storage has no batch deletion, the object is moved instead.
+        """
+        src_key, dest_key = copy
+        try:
+            if self.storage.batch_deletes:
+                self.storage.copy(src_key, dest_key)
+            else:
+                self.storage.move(src_key, dest_key)
+            return None
+        except (StorageError, OSError) as error:
+            return f'{type(error).__name__}: {error}'
@@ -59,6 +59,13 @@ MXFILE_PARAMETERS = {
 
 DIAGRAM_PARAMETERS = {'name': 'Page-1', 'id': 'xI1n7PUDQ-lDr-DjmP3Y'}
 
+# mxfile parameters of the compact serialization, without the editor metadata
+# (modified, agent, etag, version) that diagrams.net does not need to open the file
+COMPACT_MXFILE_PARAMETERS = {'host': 'app.diagrams.net', 'type': 'device'}
+
+# mxGraphModel parameters omitted by the compact serialization (editor scroll position)
+COMPACT_OMITTED_GRAPH_PARAMETERS = ('dx', 'dy')
+
 DEFAULT_PARENT_ID = '1'
 DEFAULT_VERTEX = '1'
 APP_GEOMETRY = 'geometry'
@@ -75,3 +82,19 @@ COLOR_MAP = {
     'other_middleware': (OTHER_FILL_COLOR, OTHER_STROKE_COLOR),
     'connected_app': (LAST_FILL_COLOR, LAST_STROKE_COLOR)
 }
+
+# Strategies to build the mxCell identifiers
+ID_STRATEGY_NAME = 'name'                 # Readable ids built from the app names
+ID_STRATEGY_SHORT = 'short'               # Compact base-36 ids
+ID_STRATEGIES = (ID_STRATEGY_NAME, ID_STRATEGY_SHORT)
+RESERVED_CELL_IDS = 2                     # mxCell ids '0' and '1' are the root cells
+
+# Serializations of the diagram XML
+SERIALIZATION_FULL = 'full'               # Attributes written by the diagrams.net editor
+SERIALIZATION_COMPACT = 'compact'         # Without the redundant and default attributes
+SERIALIZATIONS = (SERIALIZATION_FULL, SERIALIZATION_COMPACT)
+
+# Page budget of the diagrams: the rows, a row per code ID, are split into pages of at
+# most this number of rows and of estimated cells. None builds a single page.
+MAX_ROWS_PER_PAGE = None
+MAX_CELLS_PER_PAGE = None
@@ -0,0 +1,186 @@
+"""
+This module provides the ingestion of landscape CSV exports.
+
+The CSV export (see src/tests/test_data/interfaces.csv) holds the records of every
+interface, each interface being a run of rows sharing a code_id. The rows are read
+once and partitioned into one batch of records per diagram, by default the interfaces
+of each connected app, without writing intermediate JSON files. When more rows than
+allowed are buffered, the partitions are spilled to temporary files. The columns and
+the rows are checked while the file is read, before the first partition is yielded.
+"""
+import csv
+import json
+import os
+import tempfile
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from src.main.data_definitions import SourceStructure
+
+PARTITION_BY_CONNECTED_APP = 'connected_app'
+MAX_BUFFERED_ROWS = 50000
+
+# Columns of the CSV exports, the fields of the source records
+CSV_COLUMNS = tuple(field.name for field in fields(SourceStructure))
+
+
+class CSVPartitioner:  # pylint: disable=too-many-instance-attributes
+    """
+    Partitions interface records into per-diagram batches with a bounded number of
+    rows in memory.
+
+    The partition of an interface is the name of its connected app, or, for any other
+    partition key, the value of that column on the first row of the interface. The rows
+    of an interface are expected to be contiguous, as in the CSV export.
+    """
+
+    def __init__(self, partition_key: str = PARTITION_BY_CONNECTED_APP,
+                 max_buffered_rows: int = MAX_BUFFERED_ROWS,
+                 spill_dir: Optional[str] = None) -> None:
+        """
+        Initialize the partitioner.
+
+        :param partition_key: 'connected_app' or the name of a column.
+        :param max_buffered_rows: Number of rows kept in memory before the partitions
+            are spilled to temporary files.
+        :param spill_dir: Directory of the temporary files, defaults to the system one.
+        """
+        self.partition_key = partition_key
+        self.max_buffered_rows = max_buffered_rows
+        self.spill_dir = spill_dir
+
+        self._partitions: Dict[str, List[Dict]] = {}
+        self._spilled: Dict[str, str] = {}
+        self._buffered_rows = 0
+        self._temp_dir: Optional[tempfile.TemporaryDirectory] = None
+
+        self._interface_rows: List[Dict] = []
+
+    def __enter__(self) -> 'CSVPartitioner':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Remove the temporary files.
+        """
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+        self._spilled = {}
+
+    @property
+    def spilled(self) -> bool:
+        """
+        Whether some partitions were spilled to temporary files.
+        """
+        return bool(self._spilled)
+
+    def add_rows(self, rows: Iterable[Dict]) -> None:
+        """
+        Add rows to the partitions.
+        """
+        for row in rows:
+            if self._interface_rows and row['code_id'] != self._interface_rows[0]['code_id']:
+                self._add_interface()
+            self._interface_rows.append(row)
+
+    def partitions(self) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Yield the (partition, records) pairs in the order the partitions were first
+        seen, reading back the spilled records.
+        """
+        self._add_interface()
+
+        for partition in list(self._partitions):
+            records = []
+            if partition in self._spilled:
+                with open(self._spilled[partition], 'r', encoding='utf-8') as spill_file:
+                    records.extend(json.loads(line) for line in spill_file)
+            records.extend(self._partitions.pop(partition))
+            yield partition, records
+
+        self._buffered_rows = 0
+
+    def _add_interface(self) -> None:
+        """
+        Add the rows of the current interface to its partition.
+        """
+        rows, self._interface_rows = self._interface_rows, []
+        if not rows:
+            return
+
+        if self.partition_key == PARTITION_BY_CONNECTED_APP:
+            partition = next((row['app_name'] for row in rows
+                              if row['app_type'] == 'connected_app'), '')
+        else:
+            partition = rows[0][self.partition_key]
+
+        self._partitions.setdefault(partition, []).extend(rows)
+        self._buffered_rows += len(rows)
+
+        if self._buffered_rows > self.max_buffered_rows:
+            self._spill()
+
+    def _spill(self) -> None:
+        """
+        Append the buffered records of every partition to its temporary file.
+        """
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.TemporaryDirectory(  # pylint: disable=consider-using-with
+                prefix='csv_partitions_', dir=self.spill_dir)
+
+        for partition, records in self._partitions.items():
+            if not records:
+                continue
+            if partition not in self._spilled:
+                self._spilled[partition] = os.path.join(
+                    self._temp_dir.name, f'{len(self._spilled)}.jsonl')
+            with open(self._spilled[partition], 'a', encoding='utf-8') as spill_file:
+                spill_file.writelines(json.dumps(record) + '\n' for record in records)
+            records.clear()
+
+        self._buffered_rows = 0
+
+
+def check_rows(reader: csv.DictReader, partition_key: str) -> Iterator[Dict]:
+    """
+    Yield the rows of a CSV export, checking that the columns of the records and of
+    the partition key exist and that each row has a value per column.
+
+    :raises ValueError: On a missing column or a row with missing or extra fields.
+    """
+    columns = reader.fieldnames or []
+    required = CSV_COLUMNS if partition_key == PARTITION_BY_CONNECTED_APP \
+        else CSV_COLUMNS + (partition_key,)
+    missing = [column for column in required if column not in columns]
+    if missing:
+        raise ValueError(f'Missing CSV columns: {", ".join(missing)}')
+
+    for row in reader:
+        # DictReader fills the missing fields with None and keeps the extra ones
+        # under the None key
+        if None in row or None in row.values():
+            raise ValueError(f'Line {reader.line_num} does not have {len(columns)} fields.')
+        yield row
+
+
+def iter_csv_partitions(csv_stream: TextIO, partition_key: str = PARTITION_BY_CONNECTED_APP,
+                        max_buffered_rows: int = MAX_BUFFERED_ROWS
+                        ) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Read a CSV export once and yield the records of each partition.
+
+    :param csv_stream: Text stream of the CSV file, opened with newline=''.
+    :param partition_key: 'connected_app' or the name of a column.
+    :param max_buffered_rows: Number of rows kept in memory before spilling.
+    :return: Iterator of (partition, records) pairs, the records being dictionaries
+        with the SourceStructure fields.
+    :raises ValueError: On an invalid CSV export (see check_rows), before the first
+        partition is yielded.
+    """
+    with CSVPartitioner(partition_key, max_buffered_rows) as partitioner:
+        partitioner.add_rows(check_rows(csv.DictReader(csv_stream), partition_key))
+        yield from partitioner.partitions()
@@ -1,6 +1,7 @@
 """ This module contains data classes used for storing and transforming interface data. """
+from concurrent.futures import Executor
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 
 
 @dataclass
@@ -94,3 +95,22 @@ class LinkConfig:
     row: int
     text: str
     url: str
+
+
+@dataclass
+class GetterOptions:
+    """Options of the InterfaceURLGetter"""
+    chunk_size: Optional[int] = 1000
+    store_body: bool = True
+    stream_records: bool = False
+    partition_key: str = 'connected_app'
+    max_buffered_rows: int = 50000
+    manifest_path: Optional[str] = None
+
+
+@dataclass
+class PagingOptions:
+    """Options splitting the rows of the InterfaceDiagram into pages"""
+    max_rows: Optional[int] = None
+    max_cells: Optional[int] = None
+    executor: Optional[Executor] = None
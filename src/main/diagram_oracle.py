@@ -0,0 +1,295 @@
+"""
+This module provides a differential test oracle of the diagram render paths.
+
+The same interface records are rendered through the reference path, the full viewer URL
+with the name ids, and through alternative paths (other id strategies, serializations,
+output formats or encoders). Each output is decoded back to its mxGraphModel and reduced
+to a multiset of cell signatures: the value, style tokens and geometry of the vertices,
+and the same for the edges with the signatures of their source and target instead of
+their ids. Two outputs are equivalent when their signatures match, whatever the ids,
+the attribute order or the omitted default attributes.
+
+Randomized records, generated with a seed, exercise the paths at scale:
+    python -m src.main.diagram_oracle --cases 500 --seed 1
+"""
+import argparse
+import json
+import random
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.main import config
+from src.main.data_definitions import SourceStructure
+from src.main.encoding_helper import EncodingHelper
+from src.main.interface_diagram import InterfaceDiagram
+from src.main.json_parser import JSONParser
+
+URL_PREFIX = 'https://viewer.diagrams.net/?#R'
+REFERENCE_PATH = 'reference'
+
+# Cell attributes not part of the drawing: the ids are compared through the signatures
+# of the cells they reference, and diagrams.net ignores 'invert' on the edges
+IGNORED_CELL_ATTRIBUTES = ('id', 'parent', 'source', 'target', 'invert', 'value', 'style')
+GEOMETRY_NUMBERS = ('x', 'y', 'width', 'height')
+# The root cells, whose ids are reserved by every id strategy
+ROOT_IDS = ('0', '1')
+
+MISSING_CELL = ('missing',)
+
+
+def _records_to_interfaces(records: List[Dict]):
+    return JSONParser.json_to_object([SourceStructure(**item) for item in records])
+
+
+def _render_url_with_parallel_deflate(records: List[Dict]) -> str:
+    """
+    Render the URL compressing the XML in small parallel chunks.
+    """
+    data = InterfaceDiagram(_records_to_interfaces(records)).generate_diagram_xml()
+    encoder = EncodingHelper(parallel_threshold=1, chunk_size=4096)
+    return URL_PREFIX + encoder.encode_diagram_data(data)
+
+
+RENDER_PATHS: Dict[str, Callable[[List[Dict]], str]] = {
+    REFERENCE_PATH: lambda records: InterfaceDiagram(
+        _records_to_interfaces(records)).generate_diagram_url(),
+    'short_ids': lambda records: InterfaceDiagram(
+        _records_to_interfaces(records),
+        id_strategy=config.ID_STRATEGY_SHORT).generate_diagram_url(),
+    'compact': lambda records: InterfaceDiagram(
+        _records_to_interfaces(records),
+        serialization=config.SERIALIZATION_COMPACT).generate_diagram_url(),
+    'xml': lambda records: InterfaceDiagram(
+        _records_to_interfaces(records)).generate_diagram_xml().decode('utf-8'),
+    'compressed': lambda records: InterfaceDiagram(
+        _records_to_interfaces(records)).generate_compressed_xml().decode('utf-8'),
+    'parallel_deflate': _render_url_with_parallel_deflate,
+}
+
+
+def decode_graph_models(output: str) -> List[ET.Element]:
+    """
+    Return the mxGraphModel of each page of a rendered diagram: a viewer URL, an mxfile
+    or an mxfile with compressed diagrams.
+    """
+    helper = EncodingHelper()
+    if output.startswith(URL_PREFIX):
+        output = helper.decode_diagram_data(output[len(URL_PREFIX):])
+
+    models = []
+    for diagram in ET.fromstring(output).iter('diagram'):
+        model = diagram.find('mxGraphModel')
+        if model is None:
+            model = ET.fromstring(helper.decode_diagram_data(diagram.text.strip()))
+        models.append(model)
+    return models
+
+
+def decode_graph_model(output: str) -> ET.Element:
+    """
+    Return the mxGraphModel of the first page of a rendered diagram.
+    """
+    return decode_graph_models(output)[0]
+
+
+def _style_tokens(style: Optional[str]) -> frozenset:
+    return frozenset(token for token in (style or '').split(';') if token)
+
+
+def _geometry(cell: ET.Element) -> Tuple:
+    """
+    Return the geometry of a cell: its numbers, other attributes and points.
+    """
+    geometry = cell.find('mxGeometry')
+    if geometry is None:
+        return ()
+    numbers = tuple(float(geometry.get(name, 0)) for name in GEOMETRY_NUMBERS)
+    others = tuple(sorted((name, value) for name, value in geometry.attrib.items()
+                          if name not in GEOMETRY_NUMBERS and name != 'as'))
+    points = tuple((point.tag, point.get('as'), float(point.get('x', 0)),
+                    float(point.get('y', 0))) for point in geometry.iter('mxPoint'))
+    return numbers + (others, points)
+
+
+def cell_signatures(model: ET.Element) -> Counter:
+    """
+    Return the multiset of the signatures of the cells of an mxGraphModel.
+    """
+    cells = {cell.get('id'): cell for cell in model.iter('mxCell')}
+    signatures: Dict[str, Tuple] = {}
+
+    def signature(cell_id: Optional[str]) -> Tuple:
+        if cell_id in ROOT_IDS:
+            return ('root', cell_id)
+        if cell_id not in cells:
+            # Edges may reference protocols that were not drawn
+            return MISSING_CELL
+        if cell_id not in signatures:
+            cell = cells[cell_id]
+            kind = 'edge' if cell.get('edge') == '1' else 'vertex'
+            attributes = tuple(sorted(
+                (name, value) for name, value in cell.attrib.items()
+                if name not in IGNORED_CELL_ATTRIBUTES and name not in ('edge', 'vertex')))
+            references = ()
+            if kind == 'edge':
+                references = (signature(cell.get('source')), signature(cell.get('target')))
+            signatures[cell_id] = (kind, cell.get('value') or '',
+                                   _style_tokens(cell.get('style')), attributes,
+                                   _geometry(cell), signature(cell.get('parent')),
+                                   references)
+        return signatures[cell_id]
+
+    return Counter(signature(cell_id) for cell_id in cells if cell_id not in ROOT_IDS)
+
+
+def compare_outputs(reference: str, candidate: str) -> List[str]:
+    """
+    Compare two rendered diagrams semantically.
+
+    :return: The differences, empty when the diagrams are equivalent.
+    """
+    reference_models = decode_graph_models(reference)
+    candidate_models = decode_graph_models(candidate)
+    if len(reference_models) != len(candidate_models):
+        return [f'pages: {len(reference_models)} != {len(candidate_models)}']
+
+    differences = []
+    for page, (reference_model, candidate_model) in enumerate(
+            zip(reference_models, candidate_models), 1):
+        # The differences are only prefixed with their page in multi-page diagrams
+        prefix = f'page {page}: ' if len(reference_models) > 1 else ''
+        differences += [prefix + difference
+                        for difference in _compare_models(reference_model, candidate_model)]
+    return differences
+
+
+def _compare_models(reference_model: ET.Element, candidate_model: ET.Element) -> List[str]:
+    differences = []
+    for name in ('pageWidth', 'pageHeight'):
+        if reference_model.get(name) != candidate_model.get(name):
+            differences.append(f'{name}: {reference_model.get(name)} != '
+                               f'{candidate_model.get(name)}')
+
+    reference_cells = cell_signatures(reference_model)
+    candidate_cells = cell_signatures(candidate_model)
+    for cell, count in sorted((reference_cells - candidate_cells).items(), key=repr):
+        differences.append(f'missing {count} x {_describe(cell)}')
+    for cell, count in sorted((candidate_cells - reference_cells).items(), key=repr):
+        differences.append(f'extra {count} x {_describe(cell)}')
+    return differences
+
+
+def _describe(signature: Tuple) -> str:
+    kind, value, style, _, geometry, _, references = signature
+    description = f'{kind} {value!r} {sorted(style)[:2]} at {geometry[:4]}'
+    if references:
+        source, target = (reference[1] if len(reference) > 1 else 'missing'
+                          for reference in references)
+        description += f' from {source!r} to {target!r}'
+    return description
+
+
+APP_NAMES = ('S4HANA', 'MDG', 'S/4 HANA', 'Athena', 'iShift Tibco', 'FFT External',
+             'Ação & Co', 'R&D <Lab>', 'App "Quoted"', 'Café', 'CRM', 'Data Lake')
+FORMATS = ('ALE Idoc', 'idoc xml', 'REST', 'SFTP', '')
+DETAILS = ('Accounting document', 'Vendor', 'Stock & Materials', 'Customer <master>', '')
+
+
+def random_records(rng: random.Random, max_interfaces: int = 12) -> List[Dict]:
+    """
+    Generate the records of a random diagram: interfaces from an SAP application to a
+    connected application, through middlewares and gateways, as in the source files.
+    """
+    records = []
+    for index in range(rng.randint(1, max_interfaces)):
+        records += _random_interface(rng, f'IF_{index:03d}')
+    return records
+
+
+def _random_interface(rng: random.Random, code_id: str) -> List[Dict]:
+    """
+    Generate the records of an interface, each application connected to the previous
+    one. The connections to the SAP application carry the detail and the interface.
+    """
+    names = rng.sample(APP_NAMES, rng.randint(2, 5))
+    app_types = ['sap_app'] + [rng.choice(('middleware', 'middleware', 'gateway'))
+                               for _ in names[1:-1]] + ['connected_app']
+    interface_id = rng.choice((code_id, ''))
+    sap_connection = {
+        'connection_detail': rng.choice(DETAILS),
+        'interface_id': interface_id,
+        'interface_url': f'https://example.com/items?id={interface_id}&view=1'
+                         if interface_id else ''
+    }
+    no_connection = dict.fromkeys(sap_connection, '')
+    common = {'code_id': code_id, 'direction': rng.choice(('Inbound', 'Outbound'))}
+
+    records = []
+    previous = ''
+    for app_type, app_name in zip(app_types, names):
+        app = dict(common, app_type=app_type, app_name=app_name,
+                   format=rng.choice(FORMATS) if app_type in ('sap_app', 'connected_app')
+                   else '')
+        connections = [previous]
+        if previous and rng.random() < 0.5:
+            # Some source files also connect the applications to themselves
+            connections.append(app_name)
+        for connection_app in connections:
+            records.append(dict(app, connection_app=connection_app,
+                                **(sap_connection if connection_app == names[0]
+                                   else no_connection)))
+        previous = app_name
+    return records
+
+
+def run_differential(cases: Iterator[List[Dict]],
+                     paths: Sequence[str]) -> Iterator[Tuple[int, str, List[str]]]:
+    """
+    Render each case through the reference path and the given paths.
+
+    :return: Iterator of (case index, path, differences) of the mismatching paths.
+    """
+    for index, records in enumerate(cases):
+        reference = RENDER_PATHS[REFERENCE_PATH](records)
+        for path in paths:
+            differences = compare_outputs(reference, RENDER_PATHS[path](records))
+            if differences:
+                yield index, path, differences
+
+
+def main():
+    """
+    Run the oracle on random cases, printing the mismatches and saving their records.
+    """
+    alternatives = [path for path in RENDER_PATHS if path != REFERENCE_PATH]
+    parser = argparse.ArgumentParser(description='Compare the diagram render paths.')
+    parser.add_argument('--cases', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-interfaces', type=int, default=12)
+    parser.add_argument('--paths', nargs='+', default=alternatives, choices=alternatives)
+    parser.add_argument('--save-dir', default=None,
+                        help='Directory where the records of the mismatches are saved.')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [random_records(rng, args.max_interfaces) for _ in range(args.cases)]
+
+    mismatches = 0
+    for index, path, differences in run_differential(iter(cases), args.paths):
+        mismatches += 1
+        print(f'case {index} ({path}): {len(differences)} differences')
+        for difference in differences[:5]:
+            print(f'    {difference}')
+        if args.save_dir:
+            with open(f'{args.save_dir}/case_{args.seed}_{index}.json', 'w',
+                      encoding='utf-8') as file:
+                json.dump(cases[index], file, indent=2)
+
+    print(f'{args.cases} cases, {len(args.paths)} paths, {mismatches} mismatches')
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
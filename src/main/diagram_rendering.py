@@ -0,0 +1,222 @@
+"""
+This module provides the rendering of diagram URLs from interface records.
+
+The records of several diagrams can be rendered in one call, on an executor, each
+diagram getting its URL or the error that prevented its rendering. The URLs are kept
+in an LRU cache keyed by the content of the records, so unchanged diagrams requested
+again, e.g. by a dashboard refresh, are not rendered twice.
+
+Besides the viewer URL, a diagram can be rendered as its mxfile XML, uncompressed or
+with the compressed diagram of the draw.io files, which skips the encoding of the URL.
+
+The module does not depend on pandas, so it can be shipped with the API Lambda.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.main.data_definitions import SourceStructure
+from src.main.interface_diagram import InterfaceDiagram
+from src.main.json_parser import JSONParser
+
+URL_CACHE_SIZE = 1024
+
+# Output formats of the diagrams
+FORMAT_URL = 'url'
+FORMAT_XML = 'xml'
+FORMAT_COMPRESSED = 'compressed'
+OUTPUT_FORMATS = (FORMAT_URL, FORMAT_XML, FORMAT_COMPRESSED)
+
+
+def render_diagram_url(data: List[Dict]) -> str:
+    """
+    Render the diagram URL of the records of a Json file.
+
+    Defined at module level so it can be used with a process pool executor.
+    """
+    interfaces = JSONParser.json_to_object(
+        [SourceStructure(**item) for item in data])
+    return InterfaceDiagram(interfaces).generate_diagram_url()
+
+
+def render_diagram(data: List[Dict], output_format: str = FORMAT_URL) -> str:
+    """
+    Render the records of a Json file in one of the OUTPUT_FORMATS.
+
+    Defined at module level so it can be used with a process pool executor.
+
+    :raises ValueError: When the output format is unknown.
+    """
+    if output_format == FORMAT_URL:
+        return render_diagram_url(data)
+
+    interfaces = JSONParser.json_to_object(
+        [SourceStructure(**item) for item in data])
+    if output_format == FORMAT_XML:
+        return InterfaceDiagram(interfaces).generate_diagram_xml().decode('utf-8')
+    if output_format == FORMAT_COMPRESSED:
+        return InterfaceDiagram(interfaces).generate_compressed_xml().decode('utf-8')
+    raise ValueError(f'Unknown output format: {output_format}')
+
+
+def create_render_executor(max_workers: Optional[int] = None) -> Executor:
+    """
+    Create a process pool to render the diagrams, or a thread pool where
+    multiprocessing is not available, e.g. on AWS Lambda which has no /dev/shm.
+    """
+    try:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    except (OSError, NotImplementedError):
+        return ThreadPoolExecutor(max_workers=max_workers)
+
+
+class URLCache:
+    """
+    Thread-safe LRU cache of the diagram URLs, keyed by the content of the records.
+    The other output formats are cached alike, under keys including the format.
+    """
+
+    def __init__(self, max_entries: int = URL_CACHE_SIZE) -> None:
+        """
+        :param max_entries: Number of URLs kept, the least recently used being evicted.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._urls: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    @staticmethod
+    def key(data: Any, output_format: str = FORMAT_URL) -> str:
+        """
+        Return the cache key of records: the SHA-256 digest of their canonical JSON,
+        prefixed by the output format for the formats other than the URL.
+        """
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+        return digest if output_format == FORMAT_URL else f'{output_format}:{digest}'
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached URL, or None.
+        """
+        with self._lock:
+            url = self._urls.get(key)
+            if url is None:
+                self.misses += 1
+                return None
+            self._urls.move_to_end(key)
+            self.hits += 1
+            return url
+
+    def put(self, key: str, url: str) -> None:
+        """
+        Cache a URL, evicting the least recently used one when the cache is full.
+        """
+        with self._lock:
+            self._urls[key] = url
+            self._urls.move_to_end(key)
+            while len(self._urls) > self.max_entries:
+                self._urls.popitem(last=False)
+
+
+class BatchRenderer:
+    """
+    Renders the URLs of named diagrams on an executor, through a URL cache.
+    """
+
+    def __init__(self, executor: Optional[Executor] = None,
+                 cache: Optional[URLCache] = None) -> None:
+        """
+        :param executor: Executor rendering the diagrams. When None, the diagrams are
+            rendered in the calling thread.
+        :param cache: URL cache, none by default.
+        """
+        self.executor = executor
+        self.cache = cache
+
+    def render(self, data: List[Dict], output_format: str = FORMAT_URL) -> str:
+        """
+        Render one diagram, its URL by default, on the executor if any, so concurrent
+        requests are rendered in parallel.
+        """
+        key, url = self._lookup(data, output_format)
+        if url is None:
+            url = self._submit(data, output_format).result()
+            self._store(key, url)
+        return url
+
+    def render_batch(self, diagrams: Dict[str, Any],
+                     output_format: str = FORMAT_URL) -> Dict[str, Dict[str, str]]:
+        """
+        Render several diagrams, their URLs by default.
+
+        :param diagrams: Dictionary mapping the diagram names to their records.
+        :param output_format: One of the OUTPUT_FORMATS.
+        :return: Dictionary mapping the diagram names to {output_format: rendering},
+            e.g. {'url': url}, or to {'error': message} when the records of the diagram
+            are not valid.
+        """
+        results: Dict[str, Dict[str, str]] = {}
+        pending = {}
+        # Renderings by cache key, so identical diagrams of a batch are rendered once
+        submitted: Dict[str, Future] = {}
+
+        for name, data in diagrams.items():
+            if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+                results[name] = {'error': 'Expected a list of interface records.'}
+                continue
+
+            key, url = self._lookup(data, output_format)
+            if url is not None:
+                results[name] = {output_format: url}
+            elif key is not None and key in submitted:
+                pending[name] = key, submitted[key]
+            else:
+                pending[name] = key, self._submit(data, output_format)
+                if key is not None:
+                    submitted[key] = pending[name][1]
+
+        for name, (key, future) in pending.items():
+            try:
+                url = future.result()
+            except (KeyError, TypeError, ValueError) as error:
+                results[name] = {'error': f'{type(error).__name__}: {error}'}
+                continue
+            self._store(key, url)
+            results[name] = {output_format: url}
+
+        return {name: results[name] for name in diagrams}
+
+    def _lookup(self, data: List[Dict],
+                output_format: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return the cache key of the records and their cached rendering, if any.
+        """
+        if self.cache is None:
+            return None, None
+        key = self.cache.key(data, output_format)
+        return key, self.cache.get(key)
+
+    def _store(self, key: Optional[str], url: str) -> None:
+        if key is not None:
+            self.cache.put(key, url)
+
+    def _submit(self, data: List[Dict], output_format: str) -> Future:
+        """
+        Render a diagram on the executor, or right away without executor.
+        """
+        if self.executor is not None:
+            return self.executor.submit(render_diagram, data, output_format)
+
+        future: Future = Future()
+        try:
+            future.set_result(render_diagram(data, output_format))
+        except (KeyError, TypeError, ValueError) as error:
+            future.set_exception(error)
+        return future
@@ -0,0 +1,182 @@
+"""
+This module provides a local HTTP server exposing the diagram API without AWS Lambda.
+
+The server answers the POST requests with lambda_api_function.lambda_handler, so it has
+the same contract as the API Gateway deployment: the same bodies, formats, content
+encodings and batches. Each connection is served by a thread and kept alive between
+requests, while the diagrams are rendered on a pool of worker processes, through the
+URL cache of the handler.
+
+Run as a module:
+    python -m src.main.diagram_server --port 8080 --workers 4
+"""
+import argparse
+import base64
+import json
+import logging
+from concurrent.futures import Executor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.main import lambda_api_function
+from src.main.diagram_rendering import URL_CACHE_SIZE, create_render_executor
+from src.main.lambda_api_function import lambda_handler
+from src.main.logging_utils import configure_logging
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+# Size of the request bodies as received, before their decompression
+MAX_REQUEST_BODY_SIZE = 10 * 1024 * 1024
+# Seconds an idle keep-alive connection is kept open
+KEEP_ALIVE_TIMEOUT = 30
+
+
+class DiagramRequestHandler(BaseHTTPRequestHandler):
+    """
+    Translates the HTTP requests into API Gateway proxy events for the Lambda handler.
+    """
+    # Keeps the connections alive between requests
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    server: 'DiagramServer'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Render the diagrams of the request body.
+        """
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            self._send_error(411, 'A Content-Length header is required.')
+            return
+        if int(length) > self.server.max_body_size:
+            # The body is not read, so the connection cannot be reused
+            self._send_error(
+                413, f'The request body exceeds {self.server.max_body_size} bytes.',
+                {'Connection': 'close'})
+            return
+
+        event = self._build_event(self.rfile.read(int(length)))
+        try:
+            result = lambda_handler(event, None)
+        except (KeyError, TypeError, ValueError) as error:
+            # Raised by invalid records, answered with a 502 by API Gateway
+            logging.error('Failed to render %s: %s', self.path, error)
+            self._send_error(500, f'{type(error).__name__}: {error}')
+            return
+        self._send_result(result)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Reject the methods other than POST, as API Gateway does.
+        """
+        self._send_error(405, 'Only POST requests are supported.', {'Allow': 'POST'})
+
+    def _build_event(self, body: bytes) -> Dict:
+        """
+        Build the API Gateway proxy event of the request.
+        """
+        url = urlsplit(self.path)
+        return {
+            'httpMethod': self.command,
+            'path': url.path,
+            'headers': dict(self.headers.items()),
+            'queryStringParameters': dict(parse_qsl(url.query)) or None,
+            # Compressed bodies are binary, so the body is passed as API Gateway does
+            # with its binary media types
+            'body': base64.b64encode(body).decode('ascii'),
+            'isBase64Encoded': True
+        }
+
+    def _send_result(self, result: Dict) -> None:
+        """
+        Send the API Gateway proxy response of the Lambda handler.
+        """
+        body = result.get('body') or ''
+        body = base64.b64decode(body) if result.get('isBase64Encoded') else body.encode('utf-8')
+        self._send(result['statusCode'], body, result.get('headers') or {})
+
+    def _send_error(self, status: int, message: str,
+                    headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps({'error': message}).encode('utf-8'),
+                   dict(headers or {}, **{'Content-Type': 'application/json'}))
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logging.info('%s - %s', self.address_string(), format % args)
+
+
+class DiagramServer(ThreadingHTTPServer):
+    """
+    HTTP server of the diagram API, rendering the diagrams on a worker pool.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], executor: Optional[Executor] = None,
+                 max_body_size: int = MAX_REQUEST_BODY_SIZE,
+                 cache_size: int = URL_CACHE_SIZE) -> None:
+        """
+        Bind the server and set up the renderer of the Lambda handler.
+
+        :param address: Host and port of the server, port 0 picking a free port.
+        :param executor: Executor rendering the diagrams. Defaults to a process pool
+            with one worker per CPU, shut down with the server.
+        :param max_body_size: Maximum size of the request bodies, in bytes.
+        :param cache_size: Number of rendered diagrams kept in the cache.
+        """
+        super().__init__(address, DiagramRequestHandler)
+        self.max_body_size = max_body_size
+        self.executor = executor or create_render_executor()
+        self._owns_executor = executor is None
+
+        lambda_api_function.RENDERER.executor = self.executor
+        lambda_api_function.URL_CACHE.max_entries = cache_size
+
+    def server_close(self):
+        super().server_close()
+        if lambda_api_function.RENDERER.executor is self.executor:
+            lambda_api_function.RENDERER.executor = None
+        if self._owns_executor:
+            self.executor.shutdown()
+
+
+def main():
+    """
+    Serve the diagram API until interrupted.
+    """
+    parser = argparse.ArgumentParser(description='Serve the diagram API over HTTP.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes rendering the diagrams, one per CPU by default.')
+    parser.add_argument('--max-body-size', type=int, default=MAX_REQUEST_BODY_SIZE,
+                        help='Maximum size of the request bodies, in bytes.')
+    parser.add_argument('--cache-size', type=int, default=URL_CACHE_SIZE,
+                        help='Number of rendered diagrams kept in the cache.')
+    parser.add_argument('--log-level', default='WARNING',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help='INFO logs each request.')
+    args = parser.parse_args()
+
+    configure_logging(getattr(logging, args.log_level))
+
+    with create_render_executor(args.workers) as executor, \
+            DiagramServer((args.host, args.port), executor,
+                          args.max_body_size, args.cache_size) as server:
+        host, port = server.server_address[:2]
+        print(f'Serving the diagram API on http://{host}:{port}/')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+This module provides the sources of file events used by the watch mode.
+
+On Linux, the files written or moved into a directory are reported by inotify, read
+through ctypes so no extra package is needed, and waiting for events costs nothing.
+Elsewhere, or when inotify is not available, the directory is polled and the files
+are compared by size and modification time.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from typing import Dict, Optional, Set, Tuple
+
+# inotify flags, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+def _scan(directory: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Return the size and modification time of the files of a directory.
+    """
+    with os.scandir(directory) as entries:
+        return {entry.name: (entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in entries if entry.is_file()}
+
+
+class PollingEvents:
+    """
+    Reports the new or modified files of a directory by polling it.
+    """
+
+    def __init__(self, directory: str, poll_interval: float = 1.0) -> None:
+        """
+        Initialize the event source, the existing files not being reported.
+
+        :param directory: Watched directory.
+        :param poll_interval: Seconds between two scans of the directory.
+        """
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._snapshot = _scan(directory)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Wait up to timeout seconds, or poll_interval when None, and return the names
+        of the files created or modified since the previous call.
+        """
+        select.select([], [], [], self.poll_interval if timeout is None
+                      else min(timeout, self.poll_interval))
+
+        snapshot = _scan(self.directory)
+        changed = {name for name, stat in snapshot.items()
+                   if self._snapshot.get(name) != stat}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        """
+        Release the event source.
+        """
+
+
+class InotifyEvents:
+    """
+    Reports the files written or moved into a directory with Linux inotify.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initialize the event source.
+
+        :param directory: Watched directory.
+        :raises OSError: When inotify is not available.
+        """
+        self.directory = directory
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory),
+                                  IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f'inotify_add_watch failed for {directory}')
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Wait up to timeout seconds, or until an event when None, and return the names
+        of the files written or moved into the directory.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        data = os.read(self._fd, _READ_SIZE)
+        offset = 0
+        while offset < len(data):
+            _, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, every file is reported
+                changed.update(_scan(self.directory))
+            elif name_length:
+                changed.add(os.fsdecode(data[offset:offset + name_length].rstrip(b'\0')))
+            offset += name_length
+        return changed
+
+    def close(self) -> None:
+        """
+        Release the inotify file descriptor.
+        """
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def open_directory_events(directory: str, poll_interval: float = 1.0,
+                          use_inotify: bool = True):
+    """
+    Return an inotify event source on Linux, or a polling one otherwise.
+    """
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            return InotifyEvents(directory)
+        except (OSError, AttributeError, TypeError):
+            # inotify is not available, e.g. on a filesystem without notifications
+            pass
+    return PollingEvents(directory, poll_interval)
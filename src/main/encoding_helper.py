@@ -2,8 +2,18 @@
 This module is used to provide encode functions on file conversion
 """
 import base64
+import os
 import zlib
-from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import quote, unquote
+
+# Data of at least this size is compressed in parallel chunks (see parallel_deflate_raw)
+PARALLEL_DEFLATE_THRESHOLD = 1024 * 1024
+PARALLEL_DEFLATE_CHUNK_SIZE = 256 * 1024
+
+# Size of the deflate window, the back-references reach up to 32 KiB back
+DEFLATE_WINDOW_SIZE = 32 * 1024
 
 
 class EncodingHelper:
@@ -11,6 +21,23 @@ class EncodingHelper:
     This class is used to provide encoding functions on file conversion
     """
 
+    def __init__(self, parallel_threshold: Optional[int] = PARALLEL_DEFLATE_THRESHOLD,
+                 chunk_size: int = PARALLEL_DEFLATE_CHUNK_SIZE,
+                 max_workers: Optional[int] = None) -> None:
+        """
+        Initialize the helper.
+
+        Args:
+            parallel_threshold (int): Size from which the data is compressed in parallel
+                chunks, or None to always use a single stream.
+            chunk_size (int): Size of the chunks compressed in parallel.
+            max_workers (int): Number of threads compressing the chunks, defaults to
+                the number of CPUs.
+        """
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+
     def js_btoa(self, data: bytes) -> bytes:
         """
         Simulates the JavaScript btoa function.
@@ -27,6 +54,7 @@ class EncodingHelper:
     def pako_deflate_raw(self, data: bytes) -> bytes:
         """
         Compresses data using zlib with specific parameters.
+        Data larger than the parallel threshold is compressed with parallel_deflate_raw.
 
         Args:
             data (bytes): Binary data to compress.
@@ -34,6 +62,10 @@ class EncodingHelper:
         Returns:
             bytes: Compressed binary data.
         """
+        if (self.parallel_threshold is not None and self.max_workers > 1
+                and len(data) >= self.parallel_threshold):
+            return self.parallel_deflate_raw(data)
+
         compress = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15, memLevel=8,
                                     strategy=zlib.Z_DEFAULT_STRATEGY)
 
@@ -41,6 +73,37 @@ class EncodingHelper:
         compressed_data += compress.flush()
         return compressed_data
 
+    def parallel_deflate_raw(self, data: bytes) -> bytes:
+        """
+        Compresses data in chunks on a thread pool into a single raw deflate stream.
+
+        Each chunk is compressed with the previous 32 KiB of data as its dictionary, so
+        it may reference the end of the previous chunk as in a single stream, and ends
+        with a sync flush on a byte boundary, so the compressed chunks can be
+        concatenated. Only the last chunk ends the stream.
+
+        Args:
+            data (bytes): Binary data to compress.
+
+        Returns:
+            bytes: Compressed binary data, inflated like the output of pako_deflate_raw.
+        """
+        starts = range(0, len(data), self.chunk_size)
+        last_start = starts[-1] if starts else 0
+
+        def compress_chunk(start: int) -> bytes:
+            dictionary = data[max(0, start - DEFLATE_WINDOW_SIZE):start]
+            options = {'zdict': dictionary} if dictionary else {}
+            compress = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15,
+                                        memLevel=8, strategy=zlib.Z_DEFAULT_STRATEGY,
+                                        **options)
+            compressed_chunk = compress.compress(data[start:start + self.chunk_size])
+            return compressed_chunk + compress.flush(
+                zlib.Z_FINISH if start == last_start else zlib.Z_SYNC_FLUSH)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return b''.join(executor.map(compress_chunk, starts or [0]))
+
     def encode_diagram_data(self, data: str) -> str:
         """
         Applies a series of encoding steps to the data, which is expected to be a string.
@@ -53,8 +116,64 @@ class EncodingHelper:
         Returns:
             str: Encoded string data.
         """
+        return quote(self.compress_diagram_data(data))
+
+    def compress_diagram_data(self, data: str) -> str:
+        """
+        URL-encodes, compresses and base64-encodes the data, as draw.io compresses the
+        diagrams of its files.
+
+        Args:
+            data (str): String data to compress.
+
+        Returns:
+            str: Base64 string of the compressed data.
+        """
         data = quote(data, safe='~()*!.\'')
         data = data.encode()
         data = self.pako_deflate_raw(data)
-        data = self.js_btoa(data)
-        return quote(data)
+        return self.js_btoa(data).decode('ascii')
+
+    def js_atob(self, data: bytes) -> bytes:
+        """
+        Simulates the JavaScript atob function, the inverse of js_btoa.
+
+        Args:
+            data (bytes): Base64-encoded data.
+
+        Returns:
+            bytes: Decoded binary data.
+        """
+        return base64.b64decode(data)
+
+    def pako_inflate_raw(self, data: bytes) -> bytes:
+        """
+        Decompresses raw deflate data, the inverse of pako_deflate_raw.
+
+        Args:
+            data (bytes): Compressed binary data.
+
+        Returns:
+            bytes: Decompressed binary data.
+        """
+        decompress = zlib.decompressobj(-15)
+        decompressed_data = decompress.decompress(data)
+        decompressed_data += decompress.flush()
+        return decompressed_data
+
+    def decode_diagram_data(self, data: str) -> str:
+        """
+        Reverses encode_diagram_data, as diagrams.net does when opening a URL.
+        URL-decodes the data, base64-decodes it, decompresses it,
+        and then URL-decodes the result again.
+
+        Args:
+            data (str): Encoded string data.
+
+        Returns:
+            str: Decoded string data.
+        """
+        data = unquote(data).encode()
+        data = self.js_atob(data)
+        data = self.pako_inflate_raw(data)
+        return unquote(data.decode())
@@ -0,0 +1,117 @@
+"""
+This module provides the content encodings of the HTTP requests and responses.
+
+Request bodies may be compressed with gzip or deflate, as stated by their
+Content-Encoding header, and responses are compressed with the best encoding accepted
+by the client in its Accept-Encoding header. The decompressed size is bounded, so a
+small compressed body cannot expand without limit.
+"""
+import gzip
+import zlib
+from typing import Dict, Optional
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+IDENTITY = 'identity'
+
+# Encodings of the responses, by order of preference
+RESPONSE_ENCODINGS = (GZIP, DEFLATE)
+
+MAX_DECODED_BODY_SIZE = 50 * 1024 * 1024
+# Responses smaller than this are not worth compressing
+MIN_COMPRESSED_SIZE = 1024
+COMPRESS_LEVEL = 6
+
+
+class UnsupportedEncodingError(ValueError):
+    """ Raised when a request body has an unknown content encoding. """
+
+
+class BodyTooLargeError(ValueError):
+    """ Raised when a decompressed request body exceeds the size limit. """
+
+
+def get_header(headers: Optional[Dict[str, str]], name: str) -> str:
+    """
+    Return the value of a header, matching its name case-insensitively, or ''.
+    """
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value or ''
+    return ''
+
+
+def decode_body(body: bytes, content_encoding: str,
+                max_size: int = MAX_DECODED_BODY_SIZE) -> bytes:
+    """
+    Decompress a request body according to its Content-Encoding.
+
+    :raises UnsupportedEncodingError: When the encoding is not gzip, deflate or identity.
+    :raises BodyTooLargeError: When the decompressed body exceeds max_size bytes.
+    :raises zlib.error: When the body is not valid compressed data.
+    """
+    encoding = content_encoding.strip().lower()
+    if encoding in ('', IDENTITY):
+        return body
+    if encoding in (GZIP, 'x-gzip'):
+        return _decompress(body, zlib.MAX_WBITS | 16, max_size)
+    if encoding == DEFLATE:
+        # "deflate" is the zlib format, but some clients send raw deflate data
+        if _has_zlib_header(body):
+            return _decompress(body, zlib.MAX_WBITS, max_size)
+        return _decompress(body, -zlib.MAX_WBITS, max_size)
+    raise UnsupportedEncodingError(f'Unsupported Content-Encoding: {content_encoding}')
+
+
+def _has_zlib_header(body: bytes) -> bool:
+    """
+    Check whether data starts with a zlib header (RFC 1950).
+    """
+    return (len(body) >= 2 and body[0] & 0x0f == zlib.DEFLATED
+            and (body[0] << 8 | body[1]) % 31 == 0)
+
+
+def _decompress(body: bytes, wbits: int, max_size: int) -> bytes:
+    decompressor = zlib.decompressobj(wbits)
+    data = decompressor.decompress(body, max_size + 1)
+    if len(data) > max_size:
+        raise BodyTooLargeError(f'The decompressed body exceeds {max_size} bytes.')
+    if not decompressor.eof:
+        raise zlib.error('Incomplete compressed body.')
+    return data
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Return the preferred response encoding accepted by the client, or None.
+    """
+    accepted = {}
+    for part in accept_encoding.lower().split(','):
+        coding, _, parameters = part.strip().partition(';')
+        quality = 1.0
+        parameter = parameters.strip()
+        if parameter.startswith('q='):
+            try:
+                quality = float(parameter[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+
+    best_encoding, best_quality = None, 0.0
+    for encoding in RESPONSE_ENCODINGS:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def encode_body(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a response body with gzip or deflate (zlib format).
+    """
+    if encoding == GZIP:
+        return gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+    if encoding == DEFLATE:
+        return zlib.compress(body, COMPRESS_LEVEL)
+    raise UnsupportedEncodingError(f'Unsupported encoding: {encoding}')
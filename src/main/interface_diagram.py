@@ -4,32 +4,177 @@ from some input data.
 """
 import logging
 import xml.etree.ElementTree as ET
-from typing import List, Dict, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 
 from src.main import config
 from src.main.logging_utils import debug_logging
+from src.main.profiling import profiled
 from src.main.encoding_helper import EncodingHelper
 from src.main.data_definitions import (
-    ConnectionConfig, DetailConfig, InterfaceStructure, LinkConfig, ProtocolConfig)
+    ConnectionConfig, DetailConfig, InterfaceStructure, LinkConfig, PagingOptions,
+    ProtocolConfig)
 
 from src.main.data_definitions import SizeParameters
+from src.main.render_profile import app_style, get_render_profile
 
+BASE36_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
 
-class InterfaceDiagram:
+
+def to_base36(number: int) -> str:
+    """
+    Convert a non-negative integer to its base-36 representation.
+
+    :param number: Integer to be converted.
+    :return: Base-36 string, using digits and lowercase letters.
+    """
+    digits = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = BASE36_DIGITS[remainder] + digits
+        if not number:
+            return digits
+
+
+def count_rows(interfaces: List[InterfaceStructure]) -> int:
+    """
+    Count the rows of the diagram, a new row starting at each change of code ID.
+
+    :param interfaces: List of interfaces.
+    :return: Number of rows.
+    """
+    rows = 0
+    current_code_id = None
+    for interface in interfaces:
+        if interface.code_id != current_code_id:
+            rows += 1
+            current_code_id = interface.code_id
+    return rows
+
+
+def split_rows(interfaces: List[InterfaceStructure]) -> Iterator[List[InterfaceStructure]]:
+    """
+    Split the interfaces into the rows of the diagram, as count_rows counts them.
+
+    :param interfaces: List of interfaces.
+    :return: Iterator of the interfaces of each row.
+    """
+    row: List[InterfaceStructure] = []
+    for interface in interfaces:
+        if row and interface.code_id != row[-1].code_id:
+            yield row
+            row = []
+        row.append(interface)
+    if row:
+        yield row
+
+
+def estimate_cells(interfaces: List[InterfaceStructure]) -> int:
+    """
+    Estimate the cells of the interfaces, without their applications: a protocol
+    per direction of an application, and a connection, a detail and a link per
+    connected application. The cells drawn once per row are counted each time.
+
+    :param interfaces: List of interfaces.
+    :return: Upper bound of the cells.
+    """
+    cells = 0
+    for interface in interfaces:
+        for app in interface.apps:
+            cells += 1 if app.app_type in ('sap_app', 'connected_app') else 2
+            if app.connection.app:
+                cells += 1 + bool(app.connection.detail) + bool(app.interface)
+    return cells
+
+
+def split_pages(interfaces: List[InterfaceStructure],
+                paging: PagingOptions) -> List[List[InterfaceStructure]]:
+    """
+    Split the rows into pages, each page taking the next rows while they fit in the
+    budget of rows and cells of the paging options. A row is never split, so a row
+    exceeding the budget has its own page.
+
+    :param interfaces: List of interfaces.
+    :param paging: Budget of the pages.
+    :return: List of the interfaces of each page.
+    """
+    max_rows = paging.max_rows
+    max_cells = paging.max_cells
+    pages: List[List[InterfaceStructure]] = []
+    page: List[InterfaceStructure] = []
+    rows = cells = 0
+    apps = set()
+
+    for row in split_rows(interfaces):
+        row_apps = {app.app_name for interface in row for app in interface.apps
+                    if app.app_name}
+        row_cells = estimate_cells(row)
+        if page and ((max_rows and rows >= max_rows) or
+                     (max_cells and cells + row_cells + len(row_apps - apps) > max_cells)):
+            pages.append(page)
+            page, rows, cells, apps = [], 0, 0, set()
+        page.extend(row)
+        rows += 1
+        cells += row_cells + len(row_apps - apps)
+        apps |= row_apps
+
+    if page:
+        pages.append(page)
+    return pages
+
+
+def build_page(interfaces: List[InterfaceStructure], id_strategy: str,
+               serialization: str) -> bytes:
+    """
+    Build the diagram element of a page, run by the executors building the pages.
+
+    :param interfaces: Interfaces of the rows of the page.
+    :return: The serialized diagram element.
+    """
+    page = InterfaceDiagram(interfaces, id_strategy, serialization, PagingOptions())
+    page.build_xml_file()
+    return ET.tostring(page.xml_content['mxfile'].find('diagram'))
+
+
+class InterfaceDiagram:  # pylint: disable=too-many-instance-attributes
     """
     Class to represent and generate an Interface Diagram.
     """
 
     @debug_logging
-    def __init__(self, interfaces: List[InterfaceStructure]) -> None:
+    def __init__(self, interfaces: List[InterfaceStructure],
+                 id_strategy: str = config.ID_STRATEGY_NAME,
+                 serialization: str = config.SERIALIZATION_FULL,
+                 paging: Optional[PagingOptions] = None) -> None:
         """
         Initialize the InterfaceDiagram class.
 
         :param interfaces: List of interfaces to be represented in the diagram.
+        :param id_strategy: Strategy of the mxCell ids. 'name' builds readable ids from
+            the app names, 'short' assigns compact base-36 ids (see cell_id).
+        :param serialization: 'full' writes the attributes of the diagrams.net editor,
+            'compact' omits the editor metadata, the scroll position and the empty or
+            redundant cell attributes, which diagrams.net does not need.
+        :param paging: Budget of rows and estimated cells of a page, the rows being
+            split into pages beyond it. Defaults to config.MAX_ROWS_PER_PAGE and
+            config.MAX_CELLS_PER_PAGE.
         """
+        if id_strategy not in config.ID_STRATEGIES:
+            raise ValueError(f'Unknown id strategy: {id_strategy}')
+        if serialization not in config.SERIALIZATIONS:
+            raise ValueError(f'Unknown serialization: {serialization}')
+
         # Configuration parameters
         self.interfaces = interfaces
-        self.list_of_ids = []  # list_of_ids is used to control
+        self.id_strategy = id_strategy
+        self.serialization = serialization
+        self.paging = paging or PagingOptions(config.MAX_ROWS_PER_PAGE,
+                                              config.MAX_CELLS_PER_PAGE)
+        self.compact = serialization == config.SERIALIZATION_COMPACT
+        self.list_of_ids = set()  # list_of_ids is used to control
+
+        # Short ids by interned key, and the name id of each short id for debugging
+        self.interned_ids: Dict[Tuple, str] = {}
+        self.id_map: Dict[str, str] = {}
 
         # Initialize application lists and orders
         self.app_lists = self.populate_app_lists(interfaces)
@@ -38,12 +183,47 @@ class InterfaceDiagram:
         # Initialize size parameters
         self.size_parameters = self.calculate_size_parameters()
 
+        # Styles and offsets shared by the cells, computed once
+        self.profile = get_render_profile()
+        self.column_x = {app: order * self.profile.column_width
+                         for app, order in self.app_order.items()}
+        self.row_y = [self.size_parameters.y_protocol_start + self.profile.row_height * row
+                      for row in range(count_rows(interfaces))]
+
         # Initialize XML content
         self.xml_content = {
             'mxfile': None,
             'root': None
         }
 
+    def cell_id(self, kind: str, *parts) -> str:
+        """
+        Return the mxCell id of a shape.
+
+        With the 'name' strategy, the id is the app name for the applications and
+        '{kind}_{parts}' otherwise, e.g. 'conn_{source}_{target}_{row}'. With the
+        'short' strategy, the (kind, app index, row) key is interned and assigned the
+        next base-36 id after the reserved root ids, and id_map keeps the name id.
+
+        :param kind: Kind of shape: 'app', 'in', 'out', 'conn', 'detail' or 'ricefw'.
+        :param parts: App names and row identifying the shape.
+        :return: The mxCell id.
+        """
+        name_id = str(parts[0]) if kind == 'app' else '_'.join(
+            [kind, *(str(part) for part in parts)])
+
+        if self.id_strategy == config.ID_STRATEGY_NAME:
+            return name_id
+
+        key = (kind, *(self.app_order.get(part, part) if isinstance(part, str) else part
+                       for part in parts))
+        short_id = self.interned_ids.get(key)
+        if short_id is None:
+            short_id = to_base36(len(self.interned_ids) + config.RESERVED_CELL_IDS)
+            self.interned_ids[key] = short_id
+            self.id_map[short_id] = name_id
+        return short_id
+
     def calculate_size_parameters(self) -> SizeParameters:
         """
         Calculate and return the size parameters for the diagram.
@@ -120,12 +300,13 @@ class InterfaceDiagram:
         mxfile, diagram, mxGraphModel, root, mxCell(0), mxCell(1)
         """
         self.xml_content['mxfile'] = ET.Element(
-            'mxfile', config.MXFILE_PARAMETERS)
+            'mxfile',
+            config.COMPACT_MXFILE_PARAMETERS if self.compact else config.MXFILE_PARAMETERS)
 
         diagram = ET.SubElement(self.xml_content['mxfile'], 'diagram',
                                 config.DIAGRAM_PARAMETERS)
 
-        mx_graph_model = ET.SubElement(diagram, 'mxGraphModel', {
+        graph_parameters = {
             'dx': '1182',
             'dy': '916',
             'grid': '1',
@@ -141,7 +322,12 @@ class InterfaceDiagram:
             'pageHeight': f'{self.size_parameters.app_height}',
             'math': '0',
             'shadow': '0'
-        })
+        }
+        if self.compact:
+            for parameter in config.COMPACT_OMITTED_GRAPH_PARAMETERS:
+                del graph_parameters[parameter]
+
+        mx_graph_model = ET.SubElement(diagram, 'mxGraphModel', graph_parameters)
 
         self.xml_content['root'] = ET.SubElement(mx_graph_model, 'root')
         ET.SubElement(self.xml_content['root'], 'mxCell', {'id': '0'})
@@ -162,43 +348,35 @@ class InterfaceDiagram:
             logging.error('App name %s is not in the app order.', app_name)
             return
 
-        object_id = app_name
+        self._emit_app(app_name, app_style(fill_color, stroke_color))
+
+    def _emit_app(self, app_name: str, style: str) -> None:
+        """
+        Create the 'mxCell' XML element of an application shape with the given style.
+        """
+        object_id = self.cell_id('app', app_name)
         # Ensure that each ID is unique
         if object_id in self.list_of_ids:
             logging.info('Object ID %s is already used.', object_id)
             return
 
-        self.list_of_ids.append(object_id)
-
-        # Create style string
-        style = (f'rounded=1;whiteSpace=wrap;html=1;fillColor={fill_color};'
-                 f'strokeColor={stroke_color};verticalAlign=top;')
+        self.list_of_ids.add(object_id)
 
         # Create an 'mxCell' XML element for the application shape
         mx_cell = ET.SubElement(
             self.xml_content['root'],
             'mxCell',
-            {
-                'id': object_id,
-                'value': app_name,
-                'style': style,
-                'parent': config.DEFAULT_PARENT_ID,
-                'vertex': config.DEFAULT_VERTEX
-            }
+            {'id': object_id, 'value': app_name, 'style': style, **self.profile.vertex_attrs}
         )
 
-        x_value = f'{config.APP_WIDTH * config.APP_SIZE_SPACE * self.app_order[app_name]}'
-        width_value = f'{config.APP_WIDTH}'
-        height_value = str(self.size_parameters.app_height)
-
         ET.SubElement(
             mx_cell,
             'mxGeometry',
             {
-                'x': x_value,
+                'x': f'{self.column_x[app_name]}',
                 'y': '0',
-                'width': width_value,
-                'height': height_value,
+                'width': self.profile.app_width,
+                'height': str(self.size_parameters.app_height),
                 'as': config.APP_GEOMETRY
             }
         )
@@ -219,38 +397,27 @@ class InterfaceDiagram:
             logging.error('App name %s is not in the app order.', app_name)
             return
 
-        object_id = f'{direction}_{app_name}_{row}'
+        object_id = self.cell_id(direction, app_name, row)
 
         # Ensure that each ID is unique
         if object_id in self.list_of_ids:
             logging.info('Object ID %s is already used.', object_id)
             return
 
-        self.list_of_ids.append(object_id)
+        self.list_of_ids.add(object_id)
 
         # Create an 'mxCell' XML element for the protocol shape
-        style = (f'shape=delay;whiteSpace=wrap;html=1;fillColor={config.PROTOCOL_FILL_COLOR};'
-                 f'strokeColor={config.PROTOCOL_STROKE_COLOR};rotation=0;fontSize=10;')
-
         mx_cell = ET.SubElement(self.xml_content['root'], 'mxCell', {
             'id': object_id,
-            'value': app_format,
-            'style': style,
-            'parent': config.DEFAULT_PARENT_ID,
-            'vertex': config.DEFAULT_VERTEX
+            **self._value_attrs(app_format),
+            'style': self.profile.protocol_style,
+            **self.profile.vertex_attrs
         })
 
-        app_order_factor = self.app_order[app_name]
-
-        x_position = position + \
-            (config.APP_WIDTH * config.APP_SIZE_SPACE * app_order_factor)
-
         ET.SubElement(mx_cell, 'mxGeometry', {
-            'x': f'{x_position}',
+            'x': f'{position + self.column_x[app_name]}',
             'y': f'{self.size_parameters.y_protocol}',
-            'width': f'{config.PROTOCOL_WIDTH}',
-            'height': f'{config.PROTOCOL_HEIGHT}',
-            'as': config.APP_GEOMETRY
+            **self.profile.protocol_size_attrs
         })
 
     @debug_logging
@@ -264,54 +431,34 @@ class InterfaceDiagram:
         direction = connection_config.direction
         row = connection_config.row
 
-        object_id = f'conn_{source}_{target}_{row}'
+        object_id = self.cell_id('conn', source, target, row)
 
         # Ensure that each ID is unique
         if object_id in self.list_of_ids:
             logging.info('Object ID %s is already used.', object_id)
             return
 
-        self.list_of_ids.append(object_id)
+        self.list_of_ids.add(object_id)
 
         # Define parameters based on the direction (Outbound/Inbound)
-        fill_color = (config.CONNECTION_OUT_FILL_COLOR if direction == config.OUTBOUND
-                      else config.CONNECTION_IN_FILL_COLOR)
-        stroke_color = (config.CONNECTION_OUT_STROKE_COLOR if direction == config.OUTBOUND
-                        else config.CONNECTION_IN_STROKE_COLOR)
-        source_connection = (f'out_{source}_{row}' if direction == config.OUTBOUND
-                             else f'in_{target}_{row}')
-        target_connection = (f'in_{target}_{row}' if direction == config.OUTBOUND
-                             else f'out_{source}_{row}')
-
-        # Styles for the 'mxCell' XML element
-        style = (f'edgeStyle=orthogonalEdgeStyle;rounded=0;fillColor={fill_color};'
-                 f'strokeColor={stroke_color};orthogonalLoop=1;jettySize=auto;'
-                 'html=1;strokeWidth=3')
-
-        # Attributes for the 'mxCell' XML element
-        mx_cell_attrs = {
-            'id': object_id,
-            'value': '',
-            'invert': 'true',
-            'style': style,
-            'parent': config.DEFAULT_PARENT_ID,
-            'edge': config.DEFAULT_EDGE,
-            'source': f'{source_connection}',
-            'target': f'{target_connection}'
-        }
+        source_connection = (self.cell_id('out', source, row) if direction == config.OUTBOUND
+                             else self.cell_id('in', target, row))
+        target_connection = (self.cell_id('in', target, row) if direction == config.OUTBOUND
+                             else self.cell_id('out', source, row))
 
         # Create an 'mxCell' XML element for the connections
-        mx_cell = ET.SubElement(
-            self.xml_content['root'], 'mxCell', mx_cell_attrs)
-
-        # Attributes for the 'mxGeometry' XML element
-        mx_geometry_attrs = {
-            'relative': '1',
-            'as': config.APP_GEOMETRY
-        }
+        mx_cell = ET.SubElement(self.xml_content['root'], 'mxCell', {
+            'id': object_id,
+            **({} if self.compact else self.profile.edge_value_attrs),
+            'style': self.profile.connection_styles.get(
+                direction, self.profile.connection_styles[config.INBOUND]),
+            **self.profile.edge_attrs,
+            'source': source_connection,
+            'target': target_connection
+        })
 
         # Create an 'mxGeometry' XML element for the connections
-        ET.SubElement(mx_cell, 'mxGeometry', mx_geometry_attrs)
+        ET.SubElement(mx_cell, 'mxGeometry', self.profile.edge_geometry_attrs)
 
     @debug_logging
     def create_detail(self, detail_config: DetailConfig) -> None:
@@ -326,43 +473,40 @@ class InterfaceDiagram:
         row = detail_config.row
         text = detail_config.text
 
-        object_id = f'detail_{source}_{target}_{row}'
+        object_id = self.cell_id('detail', source, target, row)
 
         # Ensure that each ID is unique
         if object_id in self.list_of_ids:
             logging.info('Object ID %s is already used.', object_id)
             return
 
-        self.list_of_ids.append(object_id)
+        self.list_of_ids.add(object_id)
 
-        style = 'text;html=1;strokeColor=none;fillColor=none;align=center;'\
-                'verticalAlign=middle;whiteSpace=wrap;rounded=0'
-
-        x_position = config.X_DETAIL_INITIAL + (config.APP_WIDTH *
-                                                config.APP_SIZE_SPACE) * self.app_order[source]
+        x_position = config.X_DETAIL_INITIAL + self.column_x[source]
 
         # Create an 'mxCell' XML element for the text shape related to the detail
-        mx_cell_attrs = {
+        mx_cell = ET.SubElement(self.xml_content['root'], 'mxCell', {
             'id': object_id,
-            'value': text,
-            'style': style,
-            'parent': config.DEFAULT_PARENT_ID,
-            'vertex': config.DEFAULT_VERTEX
-        }
-
-        mx_cell = ET.SubElement(
-            self.xml_content['root'], 'mxCell', mx_cell_attrs)
+            **self._value_attrs(text),
+            'style': self.profile.detail_style,
+            **self.profile.vertex_attrs
+        })
 
         # Create an 'mxGeometry' XML element for the connections
-        mx_geometry_attrs = {
+        ET.SubElement(mx_cell, 'mxGeometry', {
             'x': str(x_position),
             'y': str(self.size_parameters.y_protocol - config.DETAIL_SUB_SPACING),
-            'width': str(config.DETAIL_WIDTH),
-            'height': str(config.DETAIL_HEIGHT),
-            'as': config.APP_GEOMETRY
-        }
+            **self.profile.detail_size_attrs
+        })
 
-        ET.SubElement(mx_cell, 'mxGeometry', mx_geometry_attrs)
+    def _value_attrs(self, value: str) -> Dict[str, str]:
+        """
+        Return the value attribute of a cell, omitted when empty in the compact
+        serialization.
+        """
+        if self.compact and not value:
+            return {}
+        return {'value': value}
 
     @debug_logging
     def create_detail_links(self, link_config: LinkConfig) -> None:
@@ -377,45 +521,31 @@ class InterfaceDiagram:
         text = link_config.text
         url = link_config.url
 
-        object_id = f'ricefw_{source}_{target}_{row}'
+        object_id = self.cell_id('ricefw', source, target, row)
 
         # Ensure that each ID is unique
         if object_id in self.list_of_ids:
             logging.info('Object ID %s is already used.', object_id)
             return
 
-        self.list_of_ids.append(object_id)
+        self.list_of_ids.add(object_id)
 
-        value = f'<a href={url}>{text}</a>'
-        style = 'text;html=1;strokeColor=none;fillColor=none;align=center;'\
-                'verticalAlign=middle;whiteSpace=wrap;rounded=0;fontSize=9'
-
-        x_position = config.X_DETAIL_INITIAL + \
-            (config.APP_WIDTH * config.APP_SIZE_SPACE) * \
-            self.app_order[source]
+        x_position = config.X_DETAIL_INITIAL + self.column_x[source]
 
         # Create an 'mxCell' XML element for the URL link of the RICEFW ID
-        mx_cell_attrs = {
+        mx_cell = ET.SubElement(self.xml_content['root'], 'mxCell', {
             'id': object_id,
-            'value': value,
-            'style': style,
-            'parent': config.DEFAULT_PARENT_ID,
-            'vertex': config.DEFAULT_VERTEX
-        }
-
-        mx_cell = ET.SubElement(
-            self.xml_content['root'], 'mxCell', mx_cell_attrs)
+            'value': f'<a href={url}>{text}</a>',
+            'style': self.profile.link_style,
+            **self.profile.vertex_attrs
+        })
 
         # Create an 'mxGeometry' XML element for the connections
-        mx_geometry_attrs = {
+        ET.SubElement(mx_cell, 'mxGeometry', {
             'x': str(x_position),
             'y': str(self.size_parameters.y_protocol + 10),
-            'width': str(config.DETAIL_WIDTH),
-            'height': str(config.DETAIL_HEIGHT),
-            'as': config.APP_GEOMETRY
-        }
-
-        ET.SubElement(mx_cell, 'mxGeometry', mx_geometry_attrs)
+            **self.profile.detail_size_attrs
+        })
 
     @debug_logging
     def create_instancies(self, interfaces) -> None:
@@ -442,10 +572,7 @@ class InterfaceDiagram:
     def _update_row_and_protocol(self, interface, current_code_id, row):
         if interface.code_id != current_code_id:
             row += 1
-            self.size_parameters.y_protocol = (
-                self.size_parameters.y_protocol_start +
-                (config.PROTOCOL_HEIGHT + config.Y_OFFSET) * row
-            )
+            self.size_parameters.y_protocol = self.row_y[row]
         return row
 
     def _create_app_and_protocol(self, app, row):
@@ -454,27 +581,23 @@ class InterfaceDiagram:
         app_name = app.app_name
         format_value = app.format
 
-        fill_color, stroke_color = config.COLOR_MAP.get(
-            app_type, (config.APP_DEFAULT_FILL_COLOR, config.APP_DEFAULT_STROKE_COLOR))
-
-        self.create_app(app_name, fill_color, stroke_color)
+        if app_name not in self.app_order:
+            logging.error('App name %s is not in the app order.', app_name)
+        else:
+            self._emit_app(app_name, self.profile.app_styles.get(
+                app_type, self.profile.default_app_style))
 
         # Define the necessaries in or out protocols to be created
         directions = self._get_directions(app_type)
 
         for direction in directions:
 
-            if direction == "out":
-                position = config.PROTOCOL_OUT_POSITION
-            else:
-                position = config.PROTOCOL_IN_POSITION
-
             self.create_protocol(ProtocolConfig(
                 app_name=app_name,
                 direction=direction,
                 row=row,
                 app_format=format_value if format_value is not None else "",
-                position=position
+                position=self.profile.protocol_positions[direction]
             ))
 
     def _get_directions(self, app_type):
@@ -497,8 +620,7 @@ class InterfaceDiagram:
                 row += 1
                 current_code_id = interface.code_id
 
-            self.size_parameters.y_protocol = (self.size_parameters.y_protocol_start +
-                                               (config.PROTOCOL_HEIGHT + config.Y_OFFSET) * row)
+            self.size_parameters.y_protocol = self.row_y[row]
 
             for app in interface.apps:
 
@@ -545,8 +667,14 @@ class InterfaceDiagram:
     @debug_logging
     def build_xml_file(self) -> None:
         """
-        Create the whole structure of the XML file readable by Draw.io.
+        Create the whole structure of the XML file readable by Draw.io, with a page per
+        split of the rows when they exceed the budget of the paging options.
         """
+        pages = split_pages(self.interfaces, self.paging)
+        if len(pages) > 1:
+            self.build_pages(pages)
+            return
+
         # Initialize the basic XML structure for the Draw.io file
         self.initialize_xml_structure()
 
@@ -557,15 +685,47 @@ class InterfaceDiagram:
         self.create_instancies_connections(self.interfaces)
 
     @debug_logging
-    def generate_diagram_url(self):
+    def build_pages(self, pages: List[List[InterfaceStructure]]) -> None:
         """
-        Build the XML file and generate a dynamic URL to access the diagram.
+        Build each page independently, as a diagram of its rows with its own columns and
+        height, on the executor of the paging options when set, and add them to the
+        mxfile. The root of the first page is kept in xml_content.
 
-        :param encoder: An instance of EncodingHelper to encode the diagram data.
-        :return: Draw.io diagram URL
+        :param pages: List of the interfaces of each page.
         """
-        encoder = EncodingHelper()
+        self.xml_content['mxfile'] = ET.Element(
+            'mxfile',
+            config.COMPACT_MXFILE_PARAMETERS if self.compact else config.MXFILE_PARAMETERS)
+
+        if self.paging.executor is not None:
+            futures = [self.paging.executor.submit(
+                build_page, page, self.id_strategy, self.serialization) for page in pages]
+            diagrams = [ET.fromstring(future.result()) for future in futures]
+        else:
+            diagrams = []
+            for page in pages:
+                builder = InterfaceDiagram(page, self.id_strategy, self.serialization,
+                                           PagingOptions())
+                builder.build_xml_file()
+                diagrams.append(builder.xml_content['mxfile'].find('diagram'))
+
+        for number, diagram in enumerate(diagrams, 1):
+            # The first page keeps the parameters of a single page diagram
+            if number > 1:
+                diagram.set('name', f'Page-{number}')
+                diagram.set('id', f"{config.DIAGRAM_PARAMETERS['id']}-{number}")
+            self.xml_content['mxfile'].append(diagram)
+
+        self.xml_content['root'] = diagrams[0].find('mxGraphModel/root')
 
+    @debug_logging
+    @profiled
+    def generate_diagram_xml(self) -> bytes:
+        """
+        Build the XML file and return the uncompressed mxfile, as saved by draw.io.
+
+        :return: mxfile XML document
+        """
         # Build the XML file for the diagram
         self.build_xml_file()
 
@@ -574,10 +734,40 @@ class InterfaceDiagram:
             raise ValueError("The 'mxfile' key must exist in 'xml_content'.")
 
         # Convert the XML content to a string
-        data = ET.tostring(self.xml_content['mxfile'])
+        return ET.tostring(self.xml_content['mxfile'])
+
+    @debug_logging
+    @profiled
+    def generate_compressed_xml(self) -> bytes:
+        """
+        Build the XML file and return the mxfile with a compressed diagram, the format
+        of the draw.io files saved with compression: each diagram element holds its
+        mxGraphModel URL-encoded, deflated and base64 encoded.
+
+        :return: mxfile XML document
+        """
+        self.build_xml_file()
+
+        encoder = EncodingHelper()
+        for diagram in self.xml_content['mxfile'].iter('diagram'):
+            mx_graph_model = diagram.find('mxGraphModel')
+            diagram.remove(mx_graph_model)
+            diagram.text = encoder.compress_diagram_data(ET.tostring(mx_graph_model))
+
+        return ET.tostring(self.xml_content['mxfile'])
+
+    @debug_logging
+    @profiled
+    def generate_diagram_url(self):
+        """
+        Build the XML file and generate a dynamic URL to access the diagram.
+
+        :return: Draw.io diagram URL
+        """
+        encoder = EncodingHelper()
 
         # Encode the data
-        data = encoder.encode_diagram_data(data)
+        data = encoder.encode_diagram_data(self.generate_diagram_xml())
 
         # Generate the URL
         return 'https://viewer.diagrams.net/?#R' + data
@@ -0,0 +1,606 @@
+"""
+Module to update the Interface Diagram URL Excel file.
+
+This module contains the class that reads JSON files from a source storage, generates
+the diagram URL of each file, moves the processed files to the backup directory and
+saves the results in an Excel file. The storage backends (local filesystem, memory or
+S3) provide the I/O, so the processing flow is shared by every kind of source.
+If no JSON files are found, a blank record is created in the Excel file.
+"""
+import hashlib
+import io
+import json
+import logging
+import time
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from src.main.json_parser import JSONParser
+from src.main.interface_diagram import InterfaceDiagram
+
+from src.main.data_definitions import GetterOptions, SourceStructure
+
+from src.main.batch_operations import BatchOperations
+from src.main.csv_ingestion import iter_csv_partitions
+from src.main.diagram_rendering import render_diagram_url
+from src.main.excel_utils import create_excel_table
+from src.main.json_stream import RecordStream
+from src.main.manifest import (STATUS_DONE, STATUS_ERROR, STATUS_UNCHANGED, Manifest,
+                               ManifestRun, url_hash)
+from src.main.profiling import profiled
+from src.main.result_collector import ResultCollector
+from src.main.storage import (ObjectInfo, ObjectNotFoundError, PreconditionFailedError,
+                              Storage)
+from src.main.time_budget import TimeBudget
+
+from src.main.logging_utils import debug_logging
+
+BACKUP_PREFIX = 'backup/'
+ERROR_PREFIX = 'error/'
+MERGE_RETRIES = 5
+
+# Continuation checkpoint of a run stopped by its time budget, in the source storage
+CHECKPOINT_KEY = 'checkpoint/continuation.json'
+
+# Files processed in the source directory: JSON record files and CSV exports
+SOURCE_EXTENSIONS = ('.json', '.csv')
+
+# Errors of an invalid file, which is moved to the error directory
+PROCESSING_ERRORS = (KeyError, TypeError, ValueError)
+
+
+class InterfaceURLGetter:  # pylint: disable=too-many-instance-attributes
+    """
+    Class to update the Interface Diagram URL Excel file from the JSON files of a
+    storage.
+    """
+
+    @debug_logging
+    def __init__(self, source_storage: Storage, output_storage: Storage, excel_key: str,
+                 options: Optional[GetterOptions] = None):
+        """
+        Initializes the getter with its storages and an empty result collector.
+
+        :param source_storage: Storage holding the JSON files, rooted at the source
+            directory. The backup and error directories are 'backup/' and 'error/'.
+        :param output_storage: Storage where the Excel file is saved.
+        :param excel_key: Key of the Excel file in the output storage.
+        :param options: Options of the getter. When store_body is False, the results
+            hold a hash of each JSON body and the location of its backup file instead
+            of the body itself (see load_body). When stream_records is True, the files
+            are parsed incrementally as they are read (see _process_file_stream). When
+            manifest_path is set, the processed files are recorded in a manifest and
+            the files already processed are skipped without reading their backup.
+        """
+        self.source = source_storage
+        self.output = output_storage
+        self.excel_key = excel_key
+        self.options = options or GetterOptions()
+
+        self.results = ResultCollector(
+            chunk_size=self.options.chunk_size, store_body=self.options.store_body)
+
+        self.interfaces = None
+
+        # Moves and deletions are queued and flushed in batches at the end of the run
+        self.batch_operations = BatchOperations(source_storage)
+
+        self.manifest_run = None
+        if self.options.manifest_path:
+            self.manifest_run = ManifestRun(Manifest(self.options.manifest_path))
+
+        # Files left unprocessed when the time budget runs out (see set_time_budget)
+        self.time_budget: Optional[TimeBudget] = None
+        self.remaining = 0
+
+    @property
+    def data_frame(self):
+        """
+        DataFrame with the rows collected so far.
+        """
+        return self.results.to_data_frame()
+
+    @debug_logging
+    def process_json_files(self):
+        """
+        Processes the JSON files of the source storage and updates the results.
+        """
+        json_files_found = False
+
+        for info in self.source.list():
+            if info.key.endswith(SOURCE_EXTENSIONS):
+                json_files_found = True
+                self._process_within_budget(info.key)
+
+        if not json_files_found:
+            # Create one empty row
+            self.results.append_empty_row()
+
+        self.flush_operations()
+        self.finish_run()
+
+    @debug_logging
+    def process_keys(self, keys: Iterable[str]) -> int:
+        """
+        Processes only the given keys of the source storage instead of listing it.
+        Keys in sub directories, like the backup and error directories, and keys that
+        no longer exist are skipped.
+
+        :return: Number of records added to the results.
+        """
+        return self.process_source_keys(keys)
+
+    @debug_logging
+    def process_source_keys(self, keys: Iterable[str]) -> int:
+        """
+        Processes the given keys, relative to the source storage. Subclasses receiving
+        keys of another form in process_keys, like S3 object keys, convert them and
+        call this method.
+
+        :return: Number of records added to the results.
+        """
+        results_before = len(self.results)
+
+        for key in keys:
+            if '/' in key or not key.endswith(SOURCE_EXTENSIONS):
+                continue
+            try:
+                self._process_within_budget(key)
+            except ObjectNotFoundError:
+                print(f'File {key} no longer exists. Skipping.')
+
+        self.flush_operations()
+        return len(self.results) - results_before
+
+    @debug_logging
+    def list_pending(self) -> List[ObjectInfo]:
+        """
+        Lists the JSON and CSV files waiting in the source storage.
+        """
+        return [info for info in self.source.list() if info.key.endswith(SOURCE_EXTENSIONS)]
+
+    @debug_logging
+    def process_single_file(self, filename: str):
+        """
+        Processes a single JSON file and runs its move to the backup directory.
+        """
+        self._process_file(filename)
+        self.flush_operations()
+
+    def set_time_budget(self, seconds: Optional[float]):
+        """
+        Limits the time spent processing files. Once the budget runs low, the next
+        files are not processed but counted in the remaining attribute, so the results
+        can still be saved and the run continued later (see save_checkpoint).
+
+        :param seconds: Seconds available to process files, or None for no limit.
+        """
+        self.time_budget = None if seconds is None else TimeBudget(seconds)
+
+    def _process_within_budget(self, filename: str):
+        """
+        Processes a file if the time budget allows it, otherwise counts it as remaining.
+        """
+        if self.time_budget is None:
+            self._process_file(filename)
+            return
+
+        if not self.time_budget.has_time_for_item():
+            self.remaining += 1
+            return
+
+        self.time_budget.start_item()
+        try:
+            self._process_file(filename)
+        finally:
+            self.time_budget.finish_item()
+
+    @debug_logging
+    def read_checkpoint(self) -> Optional[Dict]:
+        """
+        Reads the continuation checkpoint, returning None when there is no run to
+        continue.
+        """
+        try:
+            return json.loads(self.source.get(CHECKPOINT_KEY))
+        except ObjectNotFoundError:
+            return None
+
+    @debug_logging
+    def save_checkpoint(self):
+        """
+        Persists the continuation checkpoint of a run stopped by its time budget, with
+        the number of files remaining. The start time of the first run is kept.
+        """
+        now = time.time()
+        checkpoint = self.read_checkpoint() or {'started_at': now}
+        checkpoint.update(remaining=self.remaining, updated_at=now)
+        self.source.put(CHECKPOINT_KEY, json.dumps(checkpoint).encode('utf-8'))
+
+    @debug_logging
+    def clear_checkpoint(self):
+        """
+        Removes the continuation checkpoint once every file was processed.
+        """
+        self.source.delete(CHECKPOINT_KEY)
+
+    @debug_logging
+    def flush_operations(self):
+        """
+        Runs the queued moves and deletions of the source storage, then records the
+        outcome of the files in the manifest. Files whose move or deletion failed stay
+        in the 'processing' status.
+        """
+        report = self.batch_operations.flush()
+
+        if self.manifest_run is not None:
+            self.manifest_run.commit(key for key, _ in report['failed'])
+
+        return report
+
+    @debug_logging
+    def finish_run(self):
+        """
+        Records the end of the run in the manifest, if any. Called once per run by the
+        top-level callers: process_json_files, the Lambda handler or the watch.
+        """
+        if self.manifest_run is not None:
+            self.manifest_run.finish()
+
+    @profiled
+    def _process_file(self, filename: str):
+        """
+        Processes a single JSON file, queueing its move or deletion.
+        """
+        clean_file_name = filename.split('/')[-1]
+
+        if not self._begin_file(clean_file_name):
+            return
+
+        if clean_file_name.endswith('.csv'):
+            self._process_csv_file(clean_file_name)
+            return
+
+        if self.options.stream_records:
+            self._process_file_stream(clean_file_name)
+            return
+
+        try:
+            data = self._load_new_records(clean_file_name, self.source.get(clean_file_name),
+                                          self._read_backup(clean_file_name))
+            if data is None:
+                return
+
+            app_name = self.get_connected_app_name(data)
+            url = self._render_url(data)
+        except PROCESSING_ERRORS as error:
+            self._move_to_error(clean_file_name, error)
+            return
+
+        self._record_result(clean_file_name, app_name, data, url)
+
+    def _render_url(self, data) -> str:
+        """
+        Render the diagram URL of the records of a JSON file.
+        """
+        self.interfaces = JSONParser.json_to_object(
+            [SourceStructure(**item) for item in data])
+
+        diagram = InterfaceDiagram(self.interfaces)
+        return diagram.generate_diagram_url()
+
+    def _process_file_stream(self, clean_file_name: str):
+        """
+        Processes a single JSON file parsed record by record while it is read, so that
+        only the diagram objects are held in memory and not the content of the file.
+        The file is compared with its backup by size and content hash.
+        """
+        backup_key = f'{BACKUP_PREFIX}{clean_file_name}'
+
+        if self._is_same_object(clean_file_name, backup_key):
+            # If they are identical, queue the deletion of the source file
+            self.batch_operations.queue_delete(clean_file_name)
+            return
+
+        try:
+            with closing(self.source.open(clean_file_name)) as stream:
+                records = RecordStream(stream, keep_body=self.options.store_body)
+                self.interfaces = JSONParser.json_to_object(records)
+
+            diagram = InterfaceDiagram(self.interfaces)
+            url = diagram.generate_diagram_url()
+
+        except PROCESSING_ERRORS as error:
+            self._move_to_error(clean_file_name, error)
+            return
+
+        if self.options.store_body:
+            self.results.append(records.connected_app or '', records.body, clean_file_name, url)
+        else:
+            self.results.append_reference(records.connected_app or '', records.body_hash,
+                                          self.source.uri(backup_key), clean_file_name, url)
+        self._track(clean_file_name, status=STATUS_DONE, url_hash=url_hash(url))
+        self.batch_operations.queue_move(clean_file_name, backup_key)
+
+    def _process_csv_file(self, clean_file_name: str):
+        """
+        Processes a CSV export, read once and partitioned into one diagram per
+        connected app (or per options.partition_key). Each partition gets its own
+        record, named '{file name}#{partition}'. An invalid export, e.g. with a missing
+        column, or an export without any valid partition is moved to the error
+        directory.
+        """
+        backup_key = f'{BACKUP_PREFIX}{clean_file_name}'
+
+        if self._is_same_object(clean_file_name, backup_key):
+            # If they are identical, queue the deletion of the source file
+            self.batch_operations.queue_delete(clean_file_name)
+            return
+
+        urls = []
+        last_error = ValueError('no records')
+        try:
+            with closing(self.source.open(clean_file_name)) as stream:
+                csv_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+                # The export is read and checked before the first partition is yielded
+                for partition, data in iter_csv_partitions(
+                        csv_stream, self.options.partition_key,
+                        self.options.max_buffered_rows):
+                    partition_name = f'{clean_file_name}#{partition}'
+                    try:
+                        app_name = self.get_connected_app_name(data)
+                        url = render_diagram_url(data)
+                    except PROCESSING_ERRORS as error:
+                        logging.error('Error processing partition %s. Skipping due to '
+                                      '%s: %s', partition_name, type(error).__name__, error)
+                        last_error = error
+                        continue
+
+                    self.append_to_data_frame(app_name, data, partition_name, url,
+                                              f'{self.source.uri(backup_key)}#{partition}')
+                    urls.append(url)
+        except PROCESSING_ERRORS as error:
+            self._move_to_error(clean_file_name, error)
+            return
+
+        if not urls:
+            self._move_to_error(clean_file_name, last_error)
+            return
+
+        self._track(clean_file_name, status=STATUS_DONE, url_hash=url_hash('\n'.join(urls)))
+        self.batch_operations.queue_move(clean_file_name, backup_key)
+
+    def _is_same_object(self, source_key: str, backup_key: str) -> bool:
+        """
+        Checks if a source object has the same size and content as its backup, without
+        reading them in memory. A file the manifest knows is not compared.
+        """
+        if self._is_known(source_key):
+            return False
+
+        try:
+            backup_size = self.source.head(backup_key).size
+        except ObjectNotFoundError:
+            return False
+
+        if self.source.head(source_key).size != backup_size:
+            return False
+
+        content_hash = self.source.digest(source_key)
+        self._track(source_key, content_hash=content_hash)
+        if content_hash != self.source.digest(backup_key):
+            return False
+
+        self._track(source_key, status=STATUS_UNCHANGED)
+        return True
+
+    def _begin_file(self, clean_file_name: str) -> bool:
+        """
+        Look up a file in the manifest, if any. A file recorded as processed with the
+        same size and ETag, or the same content, is not processed again: its deletion
+        is queued and False is returned. Otherwise the file is recorded as being
+        processed by this run.
+        """
+        if self.manifest_run is None:
+            return True
+
+        if self.manifest_run.begin(clean_file_name, self.source.head(clean_file_name),
+                                   lambda: self.source.digest(clean_file_name)):
+            return True
+
+        self.batch_operations.queue_delete(clean_file_name)
+        return False
+
+    def _is_known(self, clean_file_name: str) -> bool:
+        """
+        Check whether a file being processed has a previous record in the manifest, in
+        which case it changed since it was processed and its backup is not read.
+        """
+        return self.manifest_run is not None and self.manifest_run.is_known(clean_file_name)
+
+    def _track(self, clean_file_name: str, **update) -> None:
+        """
+        Buffer the manifest update of a file, recorded when the operations are flushed.
+        """
+        if self.manifest_run is not None:
+            self.manifest_run.track(clean_file_name, **update)
+
+    def _load_new_records(self, clean_file_name: str, source_content: bytes,
+                          backup_content: Optional[bytes]):
+        """
+        Parse the records of a file, or queue its deletion and return None when it is
+        identical to its backup.
+        """
+        self._track(clean_file_name, content_hash=hashlib.sha256(source_content).hexdigest())
+
+        if backup_content is not None and self._is_same_content(source_content,
+                                                                 backup_content):
+            # If they are identical, queue the deletion of the source file
+            self._track(clean_file_name, status=STATUS_UNCHANGED)
+            self.batch_operations.queue_delete(clean_file_name)
+            return None
+
+        return json.loads(source_content)
+
+    def _read_backup(self, clean_file_name: str) -> Optional[bytes]:
+        """
+        Read the backup of a file, returning None when there is no backup or when the
+        manifest knows the file.
+        """
+        if self._is_known(clean_file_name):
+            return None
+        try:
+            return self.source.get(f'{BACKUP_PREFIX}{clean_file_name}')
+        except ObjectNotFoundError:
+            return None
+
+    @staticmethod
+    def _is_same_content(source_content: bytes, backup_content: bytes) -> bool:
+        """
+        Checks if the content of a source file is identical to its backup.
+        """
+        if source_content == backup_content:
+            return True
+        try:
+            return json.loads(source_content) == json.loads(backup_content)
+        except ValueError:
+            return False
+
+    def _record_result(self, clean_file_name: str, app_name: str, data, url: str):
+        """
+        Append the result of a file and queue its move to the backup directory.
+        """
+        backup_key = f'{BACKUP_PREFIX}{clean_file_name}'
+        self.append_to_data_frame(
+            app_name, data, clean_file_name, url, self.source.uri(backup_key))
+        self._track(clean_file_name, status=STATUS_DONE, url_hash=url_hash(url))
+        self.batch_operations.queue_move(clean_file_name, backup_key)
+
+    @debug_logging
+    def _move_to_error(self, clean_file_name: str, error: Exception):
+        """
+        Report a file that could not be processed and queue its move to the error
+        directory.
+        """
+        print(f'Error processing file {clean_file_name}. '
+              f'Skipping due to {type(error).__name__}: {error}')
+
+        self._track(clean_file_name, status=STATUS_ERROR)
+        self.batch_operations.queue_move(
+            clean_file_name, f'{ERROR_PREFIX}{clean_file_name}')
+
+    @debug_logging
+    def get_connected_app_name(self, data: Dict) -> str:
+        """
+        Extracts the connected app name from the data.
+        """
+        for item in data:
+            if item['app_type'] == 'connected_app':
+                return item['app_name']
+        return ''
+
+    @debug_logging
+    def append_to_data_frame(self, app_name: str, data: Dict, filename: str, url: str,
+                             backup_path: str = ''):
+        """
+        Appends a new row to the result collector.
+        """
+        self.results.append_result(app_name, data, filename, url, backup_path)
+
+    @debug_logging
+    def load_body(self, body_ref: str):
+        """
+        Loads the full JSON body referenced by the body_ref column. The body of a
+        partition of a CSV export is read back from the backup of the export.
+        """
+        body_ref, _, partition = body_ref.partition('#')
+        if partition:
+            with closing(self.source.open(self.source.key_from_uri(body_ref))) as stream:
+                csv_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+                return next(data for name, data in iter_csv_partitions(
+                    csv_stream, self.options.partition_key, self.options.max_buffered_rows)
+                    if name == partition)
+
+        return json.loads(self.source.get(self.source.key_from_uri(body_ref)))
+
+    @debug_logging
+    def save_results(self, merge: bool = False):
+        """
+        Saves the new records to the Excel file of the output storage.
+
+        When merge is True, the new records are merged into the existing Excel file,
+        replacing the records of the same files. The file is written with a conditional
+        request, and the merge is retried when the file was updated in the meantime.
+        """
+        if not merge:
+            self.output.put(self.excel_key, self._excel_bytes(self.data_frame))
+            return
+
+        for _ in range(MERGE_RETRIES):
+            existing, etag = self._read_excel()
+            try:
+                self.output.put(self.excel_key,
+                                self._excel_bytes(self._merge_results(existing, self.data_frame)),
+                                if_match=etag, if_none_match=etag is None)
+                return
+            except PreconditionFailedError:
+                continue
+
+        raise RuntimeError(
+            f'Could not merge the results into {self.output.uri(self.excel_key)}.')
+
+    @debug_logging
+    def _read_excel(self):
+        """
+        Read the Excel file, returning the data frame and its ETag, or (None, None)
+        when the file does not exist
+        """
+        try:
+            content, info = self.output.get_with_info(self.excel_key)
+        except ObjectNotFoundError:
+            return None, None
+
+        return pd.read_excel(io.BytesIO(content), engine='openpyxl'), info.etag
+
+    @staticmethod
+    def _merge_results(existing, data_frame):
+        """
+        Merge new records into existing ones, replacing the records of the same files
+        and dropping blank records. The blank record of a run without files is only
+        kept when there is no other record.
+        """
+        if existing is None:
+            return data_frame
+
+        existing = existing[existing['file_name'].notna()]
+        new_records = data_frame[data_frame['file_name'].notna()]
+        existing = existing[~existing['file_name'].isin(new_records['file_name'])]
+        merged = pd.concat([existing, new_records], ignore_index=True)
+        return merged if len(merged) else data_frame
+
+    @staticmethod
+    def _excel_bytes(data_frame) -> bytes:
+        """
+        Write the data frame to an Excel file with a table, in memory
+        """
+        excel_buffer = io.BytesIO()
+
+        # Save the DataFrame to the BytesIO object as an Excel file
+        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:  # pylint: disable=abstract-class-instantiated
+            data_frame.to_excel(writer, index=False)
+
+        # Reset the buffer's position to the beginning
+        excel_buffer.seek(0)
+
+        work_book = load_workbook(excel_buffer)
+        create_excel_table(work_book)
+
+        # Save the Excel file with the table to a new buffer
+        table_buffer = io.BytesIO()
+        work_book.save(table_buffer)
+        work_book.close()
+
+        return table_buffer.getvalue()
@@ -1,7 +1,7 @@
 """
 This module provides functionalities to parse JSON data.
 """
-from typing import List
+from typing import Iterable, List
 
 from src.main.data_definitions import (
     SourceStructure, Connection, Interface,
@@ -20,11 +20,12 @@ class JSONParser:
 
     @staticmethod
     @debug_logging
-    def json_to_object(data: List[SourceStructure]) -> List[InterfaceStructure]:
+    def json_to_object(data: Iterable[SourceStructure]) -> List[InterfaceStructure]:
         """
         Transform JSON to a formatted object.
 
-        :param data: List of dictionaries representing the JSON data.
+        :param data: Records of the JSON data, which may be consumed lazily (e.g. a
+            RecordStream).
         :return: List of dictionaries representing the transformed data.
         """
         transformed_data = []
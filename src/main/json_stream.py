@@ -0,0 +1,171 @@
+"""
+This module provides an incremental reader of JSON array files.
+
+The items of the top-level array are decoded one at a time from a binary stream (a
+local file or an S3 streaming body) read in chunks, so a file is never held in memory
+as a whole and the parsing overlaps with the download of the next chunks.
+"""
+import codecs
+import hashlib
+import json
+from typing import Any, BinaryIO, Iterator, List, Optional
+
+from src.main.data_definitions import SourceStructure
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+
+class _StreamBuffer:
+    """
+    Text buffer over a binary stream, refilled chunk by chunk.
+    """
+
+    def __init__(self, stream: BinaryIO, chunk_size: int) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.text = ''
+        self.position = 0
+        self.eof = False
+
+    def read_more(self) -> bool:
+        """
+        Append the next chunk to the buffer, dropping the consumed text.
+        Returns False at the end of the stream.
+        """
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        self.eof = not chunk
+        self.text = self.text[self.position:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.position = 0
+        return True
+
+    def next_char(self) -> str:
+        """
+        Skip the whitespace and return the next character, without consuming it.
+        """
+        while True:
+            while self.position < len(self.text) and self.text[self.position] in _WHITESPACE:
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if not self.read_more():
+                raise ValueError('Unexpected end of the JSON array.')
+
+
+def iter_json_array(stream: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield the items of the JSON array of a binary stream, one at a time.
+
+    :param stream: Binary stream holding a UTF-8 encoded JSON array.
+    :param chunk_size: Number of bytes read from the stream at a time.
+    :raises ValueError: When the content is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = _StreamBuffer(stream, chunk_size)
+
+    if buffer.next_char() != '[':
+        raise ValueError('The JSON content is not an array.')
+    buffer.position += 1
+
+    if buffer.next_char() == ']':
+        return
+
+    while True:
+        buffer.next_char()
+        try:
+            item, end = decoder.raw_decode(buffer.text, buffer.position)
+        except json.JSONDecodeError:
+            # The item may continue in the next chunk
+            if buffer.read_more():
+                continue
+            raise
+
+        if (end == len(buffer.text) or buffer.text[end] not in _DELIMITERS) \
+                and buffer.read_more():
+            # A number cut by the end of the chunk may continue in the next chunk
+            continue
+
+        buffer.position = end
+        yield item
+
+        char = buffer.next_char()
+        buffer.position += 1
+        if char == ']':
+            return
+        if char != ',':
+            raise ValueError(f'Expected "," in the JSON array, got "{char}".')
+
+
+class RecordStream:
+    """
+    Iterates over the SourceStructure records of a JSON file stream.
+
+    While iterating, the name of the connected app is extracted and the SHA-256 hash of
+    the body, serialized as json.dumps would, is computed, so the result of a file can
+    be stored without keeping its records. The serialized body itself is only kept
+    when keep_body is True.
+    """
+
+    def __init__(self, stream: BinaryIO, keep_body: bool = False,
+                 chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+        """
+        Initialize the record stream.
+
+        :param stream: Binary stream holding the JSON array of the records.
+        :param keep_body: Whether to keep the serialized body (see body).
+        :param chunk_size: Number of bytes read from the stream at a time.
+        """
+        self._items = iter_json_array(stream, chunk_size)
+        self.keep_body = keep_body
+
+        self.connected_app: Optional[str] = None
+        self.record_count = 0
+        self._hash = hashlib.sha256(b'[')
+        self._body_parts: List[str] = ['['] if keep_body else []
+        self._finished = False
+
+    def __iter__(self) -> Iterator[SourceStructure]:
+        for item in self._items:
+            if self.connected_app is None and item['app_type'] == 'connected_app':
+                self.connected_app = item['app_name']
+
+            serialized = json.dumps(item)
+            if self.record_count:
+                serialized = ', ' + serialized
+            self._hash.update(serialized.encode('utf-8'))
+            if self.keep_body:
+                self._body_parts.append(serialized)
+
+            self.record_count += 1
+            yield SourceStructure(**item)
+
+        self._hash.update(b']')
+        self._body_parts.append(']')
+        self._finished = True
+
+    @property
+    def body_hash(self) -> str:
+        """
+        SHA-256 hex digest of the serialized body, once the stream is consumed.
+        """
+        self._check_finished()
+        return self._hash.hexdigest()
+
+    @property
+    def body(self) -> str:
+        """
+        Serialized body, equal to json.dumps of the records, once the stream is consumed.
+        """
+        self._check_finished()
+        if not self.keep_body:
+            raise ValueError('The body is only kept when keep_body is True.')
+        return ''.join(self._body_parts)
+
+    def _check_finished(self) -> None:
+        if not self._finished:
+            raise ValueError('The record stream has not been consumed.')
@@ -3,39 +3,219 @@ AWS Lambda Function: InterfaceDiagram
 
 This Lambda function handles the generation of an interface diagram URL based on
 the input JSON data.
+
+The body is either the list of interface records of one diagram, answered with the
+diagram URL, or a batch of named diagrams:
+    {"diagrams": {"<name>": [<interface records>], ...}}
+answered with a JSON map of the results, each being {"url": ...} or {"error": ...}.
+The diagrams of a batch are rendered in parallel, and the URLs of the diagrams already
+rendered by a warm container are reused.
+
+Request bodies may be compressed with gzip or deflate (Content-Encoding header, the body
+being base64 encoded by API Gateway), and responses are compressed when the client
+accepts it (Accept-Encoding header). API Gateway must list the compressed types in
+its binary media types for the compressed bodies to be passed through.
+
+The response mode is selected by the "format" query string parameter, or by the
+X-Diagram-Format header:
+    url         the viewer URL, as text (default)
+    xml         the uncompressed mxfile XML
+    compressed  the mxfile XML with the compressed diagram of the draw.io files
+    drawio      the uncompressed mxfile, as a diagram.drawio attachment
+    redirect    a 302 redirection to the viewer URL
+Only the URL and redirect modes encode the diagram into a URL. Batches support the
+url, xml and compressed modes.
+
+When DIAGRAM_PROFILE is 'request', the requests with the "profile" query string
+parameter or the X-Diagram-Profile header set to 1 are profiled (see profiling). They
+are rendered in the calling thread, without the URL cache.
 """
+import base64
+import binascii
 import json
-from src.main.data_definitions import SourceStructure
-from src.main.json_parser import JSONParser
+import os
+import zlib
+from typing import Dict, Optional
+
+from src.main.diagram_rendering import (FORMAT_COMPRESSED, FORMAT_URL, FORMAT_XML,
+                                        BatchRenderer, URLCache, create_render_executor)
+from src.main.http_encoding import (MIN_COMPRESSED_SIZE, BodyTooLargeError,
+                                    UnsupportedEncodingError, choose_encoding, decode_body,
+                                    encode_body, get_header)
+from src.main.profiling import profile_invocation, profiling_requested
+from src.main import shared_resources
+
+# Maximum number of diagrams in a batch request
+MAX_BATCH_SIZE = 500
+
+# Number of workers rendering the diagrams of a batch
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', os.cpu_count() or 1))
+
+# Response modes other than the output formats of the renderer
+MODE_DRAWIO = 'drawio'
+MODE_REDIRECT = 'redirect'
+
+# Output format and content type of each response mode
+RESPONSE_MODES = {
+    # The content type the URL was answered with before the modes, kept for the clients
+    FORMAT_URL: (FORMAT_URL, 'application/json'),
+    FORMAT_XML: (FORMAT_XML, 'application/xml'),
+    FORMAT_COMPRESSED: (FORMAT_COMPRESSED, 'application/xml'),
+    MODE_DRAWIO: (FORMAT_XML, 'application/vnd.jgraph.mxfile'),
+    MODE_REDIRECT: (FORMAT_URL, 'text/plain'),
+}
+BATCH_MODES = (FORMAT_URL, FORMAT_XML, FORMAT_COMPRESSED)
+DRAWIO_FILE_NAME = 'diagram.drawio'
+
+# Shared by the invocations of a warm container
+URL_CACHE = URLCache()
+RENDERER = BatchRenderer(cache=URL_CACHE)
+
+
+def get_renderer() -> BatchRenderer:
+    """
+    Return the shared renderer, creating its executor on the first batch request.
+    """
+    if RENDERER.executor is None:
+        RENDERER.executor = create_render_executor(RENDER_WORKERS)
+    return RENDERER
 
-from src.main.interface_diagram import InterfaceDiagram
-from src.main.logging_utils import configure_logging
+
+def response(status_code: int, body: str, content_type: str = 'application/json'):
+    """
+    Build an API Gateway proxy response.
+    """
+    return {
+        "isBase64Encoded": False,
+        "statusCode": status_code,
+        "headers": {'Content-Type': content_type},
+        "body": body
+    }
+
+
+def read_body(event: Dict) -> bytes:
+    """
+    Return the request body, decoded from base64 and decompressed as needed.
+    """
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body, validate=True)
+    elif isinstance(body, str):
+        body = body.encode('utf-8')
+    return decode_body(body, get_header(event.get('headers'), 'Content-Encoding'))
+
+
+def compress_response(result: Dict, event: Dict) -> Dict:
+    """
+    Compress the body of a response with the encoding accepted by the client, if any.
+    """
+    encoding = choose_encoding(get_header(event.get('headers'), 'Accept-Encoding'))
+    body = result['body'].encode('utf-8')
+    result['headers']['Vary'] = 'Accept-Encoding'
+    if encoding is None or len(body) < MIN_COMPRESSED_SIZE:
+        return result
+
+    result['headers']['Content-Encoding'] = encoding
+    result['body'] = base64.b64encode(encode_body(body, encoding)).decode('ascii')
+    result['isBase64Encoded'] = True
+    return result
+
+
+def get_response_mode(event: Dict) -> str:
+    """
+    Return the response mode requested by the query string or the X-Diagram-Format
+    header, url by default.
+    """
+    mode = (event.get('queryStringParameters') or {}).get('format') \
+        or get_header(event.get('headers'), 'X-Diagram-Format')
+    return (mode or FORMAT_URL).strip().lower()
+
+
+def diagram_response(rendering: str, mode: str) -> Dict:
+    """
+    Build the response of a single diagram in the given response mode.
+    """
+    content_type = RESPONSE_MODES[mode][1]
+    if mode == MODE_REDIRECT:
+        result = response(302, '', content_type)
+        result['headers']['Location'] = rendering
+        return result
+
+    result = response(200, rendering, content_type)
+    if mode == MODE_DRAWIO:
+        result['headers']['Content-Disposition'] = \
+            f'attachment; filename="{DRAWIO_FILE_NAME}"'
+    return result
+
+
+def profile_requested(event: Dict) -> bool:
+    """
+    Check whether the request asks for profiling, with the "profile" query string
+    parameter or the X-Diagram-Profile header.
+    """
+    flag = (event.get('queryStringParameters') or {}).get('profile') \
+        or get_header(event.get('headers'), 'X-Diagram-Profile')
+    return (flag or '').strip().lower() in ('1', 'true', 'yes')
+
+
+def mode_error(mode: str, batch: bool) -> Optional[str]:
+    """
+    Return the error of an unknown response mode, or of a mode not supported by
+    batches, or None.
+    """
+    if mode not in RESPONSE_MODES:
+        return f'Unknown format {mode!r}, expected one of {", ".join(RESPONSE_MODES)}.'
+    if batch and mode not in BATCH_MODES:
+        return f'The {mode} format is not supported by batches.'
+    return None
+
+
+def batch_error(data) -> Optional[str]:
+    """
+    Return the error of a malformed batch request, or None.
+    """
+    diagrams = data.get('diagrams')
+    if not isinstance(diagrams, dict):
+        return 'Expected a "diagrams" object mapping names to interface records.'
+    if len(diagrams) > MAX_BATCH_SIZE:
+        return f'A batch is limited to {MAX_BATCH_SIZE} diagrams, got {len(diagrams)}.'
+    return None
 
 
 def lambda_handler(event, _):
     """
-    AWS Lambda Handler function to generate a diagram URL.
+    AWS Lambda Handler function to generate a diagram URL, or the URLs of a batch.
 
     :param event: AWS Lambda event object containing the request details.
     :param _: Context parameter (unused).
     :return: Dictionary containing the response, including the diagram URL.
     """
 
-    configure_logging()
-
-    data = json.loads(event['body'])
+    shared_resources.initialize()
 
-    interfaces = JSONParser.json_to_object(
-        [SourceStructure(**item) for item in data])
+    try:
+        data = json.loads(read_body(event))
+    except UnsupportedEncodingError as error:
+        return response(415, json.dumps({'error': str(error)}))
+    except BodyTooLargeError as error:
+        return response(413, json.dumps({'error': str(error)}))
+    except (binascii.Error, zlib.error) as error:
+        return response(400, json.dumps({'error': f'Invalid body encoding: {error}'}))
 
-    diagram = InterfaceDiagram(interfaces)
-    url = diagram.generate_diagram_url()
+    mode = get_response_mode(event)
+    error = mode_error(mode, isinstance(data, dict))
+    if error is None and isinstance(data, dict):
+        error = batch_error(data)
+    if error is not None:
+        return response(400, json.dumps({'error': error}))
 
-    result = {
-        "isBase64Encoded": False,
-        "statusCode": 200,
-        "headers": {'Content-Type': 'application/json'},
-        "body": url
-    }
+    with profile_invocation(profiling_requested(profile_requested(event))) as session:
+        if isinstance(data, dict):
+            renderer = get_renderer() if session is None else BatchRenderer()
+            results = renderer.render_batch(data['diagrams'], mode)
+            result = response(200, json.dumps({'results': results}))
+        else:
+            renderer = RENDERER if session is None else BatchRenderer()
+            result = diagram_response(renderer.render(data, RESPONSE_MODES[mode][0]), mode)
 
-    return result
+    return compress_response(result, event)
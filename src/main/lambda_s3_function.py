@@ -3,39 +3,179 @@ AWS Lambda Function for Interface URL Getting
 
 This Lambda function processes JSON files from an S3 bucket, generates interface diagram URLs,
 and saves the results in an Excel file.
+
+When invoked by S3 event notifications, only the objects of the event records are
+processed. Any other event (e.g. the scheduled trigger) processes the whole source
+directory. In both cases the results are merged into the Excel file, replacing the
+rows of the same files, so a full scan keeps the rows merged by the event invocations.
+
+The files are processed within the remaining time of the invocation, minus the time
+kept to save the results. When the time runs out, the partial results are saved, a
+continuation checkpoint is written and the number of remaining files is reported; the
+next full scan continues the run.
+
+With {"mode": "coordinator"}, the pending files are partitioned into shards, each
+processed by a synchronous invocation of this function with {"mode": "shard"}, and
+the results of every shard are saved at once by the coordinator. The shards get a
+deadline from the remaining time of the coordinator, minus the time kept by the
+workers to save their results, so they return before the coordinator times out. The
+coordinator mode requires the Lambda context, which names the function invoked for the
+shards; without it the event is rejected with a 400 response.
+
+The boto3 clients and the logging configuration are shared by the invocations of a warm
+container (see shared_resources).
+
+When DIAGRAM_PROFILE is 'request', the events with {"profile": true} are profiled: the
+processing of each file is written to DIAGRAM_PROFILE_DESTINATION (see profiling).
 """
 import json
+import time
+from typing import Dict, List, Optional
+from urllib.parse import unquote_plus
+
+from src.main import shared_resources
+from src.main.profiling import profile_invocation, profiling_requested
 from src.main.s3_interface_url_getter import S3InterfaceURLGetter
-from src.main.logging_utils import configure_logging
+from src.main.sharding import (COORDINATOR_MODE, SHARD_MODE, LambdaShardDispatcher,
+                               ShardCoordinator, run_shard)
+
+# Define source directory and Excel file paths
+BUCKET = 'interface-diagram-files'
+SOURCE_DIR = f's3://{BUCKET}/in/'
+EXCEL_FILE = f's3://{BUCKET}/out/interfaces_diagrams_urls.xlsx'
+
+FULL_SCAN_MODE = 'full_scan'
+
+# Seconds of the invocation kept to flush the moves and save the Excel file
+SAVE_MARGIN_SECONDS = 30
+
+
+def get_time_budget(context) -> Optional[float]:
+    """
+    Return the seconds available to process files, from the remaining time of the
+    invocation, or None without a Lambda context.
+    """
+    if context is None:
+        return None
+    return max(context.get_remaining_time_in_millis() / 1000 - SAVE_MARGIN_SECONDS, 0.0)
+
+
+def get_shard_deadline(context) -> Optional[float]:
+    """
+    Return the wall clock time before which the workers of a coordinator return, so
+    the coordinator still has the time to save the results, or None without a Lambda
+    context.
+    """
+    budget = get_time_budget(context)
+    if budget is None:
+        return None
+    return time.time() + max(budget - SAVE_MARGIN_SECONDS, 0.0)
+
+
+def get_event_keys(event: Dict, bucket: str) -> Optional[List[str]]:
+    """
+    Extract the object keys of the given bucket from the S3 event records.
 
+    :param event: AWS Lambda event object.
+    :param bucket: Name of the bucket whose keys are returned.
+    :return: List of object keys, or None when the event is not an S3 event or a full
+        scan is requested with {"mode": "full_scan"}.
+    """
+    records = event.get('Records')
+    if event.get('mode') == FULL_SCAN_MODE or not records:
+        return None
+
+    keys = []
+    for record in records:
+        if record.get('eventSource') != 'aws:s3':
+            continue
+        s3_entity = record['s3']
+        if s3_entity['bucket']['name'] != bucket:
+            continue
+        # Object keys are URL encoded in the event notifications
+        key = unquote_plus(s3_entity['object']['key'])
+        if key not in keys:
+            keys.append(key)
+    return keys
 
-def lambda_handler(event, _):
+
+def lambda_handler(event, context):
     """
     AWS Lambda Handler function to process JSON files and save results.
 
     :param event: AWS Lambda event object containing the request details.
-    :param _: Context parameter (unused).
-    :return: Dictionary containing the response.
+    :param context: AWS Lambda context object, giving the remaining time.
+    :return: Dictionary containing the response, with the number of remaining files.
     """
 
-    configure_logging()
+    shared_resources.initialize()
 
     # Log the event object to CloudWatch Logs
     print("Received event: " + json.dumps(event, indent=2))
 
-    # Define source directory and Excel file paths
-    source_dir = 's3://interface-diagram-files/in/'
-    excel_file = 's3://interface-diagram-files/out/interfaces_diagrams_urls.xlsx'
+    with profile_invocation(profiling_requested(bool(event.get('profile')))):
+        return handle_event(event, context)
+
+
+def handle_event(event, context):
+    """
+    Process the files of an event and save the results.
+
+    :param event: AWS Lambda event object containing the request details.
+    :param context: AWS Lambda context object, giving the remaining time.
+    :return: Dictionary containing the response, with the number of remaining files.
+    """
+    if event.get('mode') == COORDINATOR_MODE and context is None:
+        # The shards are invocations of the function named by the context
+        return {
+            'statusCode': 400,
+            'body': json.dumps('Coordinator mode requires a Lambda context.')
+        }
 
     # Initialize the S3InterfaceURLGetter class
-    getter = S3InterfaceURLGetter(source_dir, excel_file)
+    getter = S3InterfaceURLGetter(SOURCE_DIR, EXCEL_FILE)
+    getter.set_time_budget(get_time_budget(context))
+
+    if event.get('mode') == SHARD_MODE:
+        # Worker of a coordinator: the results are returned, not saved
+        return run_shard(getter, event['keys'], event['result_key'], event.get('deadline'))
+
+    keys = get_event_keys(event, BUCKET)
+
+    if keys is None:
+        # Process all the JSON files and merge the results into the Excel file, which
+        # holds the rows of the event invocations and of the runs stopped by their
+        # time budget
+        checkpoint = getter.read_checkpoint()
+        if event.get('mode') == COORDINATOR_MODE:
+            ShardCoordinator(getter, LambdaShardDispatcher(
+                shared_resources.get_lambda_client(), context.function_name)).run(
+                    deadline=get_shard_deadline(context))
+            getter.finish_run()
+        else:
+            getter.process_json_files()
+        getter.save_results(merge=True)
+        if getter.remaining:
+            getter.save_checkpoint()
+        elif checkpoint is not None:
+            getter.clear_checkpoint()
+    else:
+        records = getter.process_keys(keys)
+        getter.finish_run()
+        if records:
+            # Merge the results of the event objects into the Excel file
+            getter.save_results(merge=True)
+        if getter.remaining:
+            # The remaining objects are left for the next full scan
+            getter.save_checkpoint()
 
-    # Process the JSON files and save the results
-    getter.process_json_files()
-    getter.save_results()
+    message = 'Successfully processed files.'
+    if getter.remaining:
+        message = f'Time budget exhausted, {getter.remaining} files remaining.'
 
     # Prepare the Lambda function response
     return {
         'statusCode': 200,
-        'body': json.dumps('Successfully processed files.')
+        'body': json.dumps(message),
+        'remaining': getter.remaining
     }
@@ -0,0 +1,185 @@
+"""
+This module provides a local filesystem-backed stand-in for the boto3 S3 client.
+
+It implements the subset of the S3 client API used by the URL getters, storing each
+bucket as a directory under a root path, so that the S3 code paths can be exercised
+offline.
+"""
+import hashlib
+import io
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from botocore.exceptions import ClientError
+
+# The keyword arguments follow the boto3 S3 client naming
+# pylint: disable=invalid-name
+
+
+class NoSuchKeyError(Exception):
+    """ Raised when an object does not exist, like botocore's NoSuchKey. """
+
+
+class LocalS3Exceptions:  # pylint: disable=too-few-public-methods
+    """ Mirrors the `client.exceptions` namespace of a boto3 client. """
+    NoSuchKey = NoSuchKeyError
+
+
+class LocalS3Client:
+    """
+    A boto3-compatible S3 client storing objects on the local filesystem.
+    """
+
+    exceptions = LocalS3Exceptions
+
+    def __init__(self, root_dir: str) -> None:
+        """
+        Initialize the client.
+
+        :param root_dir: Directory where each bucket is stored as a sub directory.
+        """
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+
+    def _object_path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root_dir, bucket, *key.split('/'))
+
+    def _object_info(self, bucket: str, key: str) -> Dict[str, Any]:
+        path = self._object_path(bucket, key)
+        stat = os.stat(path)
+        with open(path, 'rb') as file:
+            etag = hashlib.md5(file.read()).hexdigest()  # nosec - S3 ETag semantics
+        return {
+            'Key': key,
+            'Size': stat.st_size,
+            'ETag': f'"{etag}"',
+            'LastModified': datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        }
+
+    def _check_exists(self, bucket: str, key: str) -> str:
+        path = self._object_path(bucket, key)
+        if not os.path.isfile(path):
+            raise NoSuchKeyError(f'The specified key does not exist: {bucket}/{key}')
+        return path
+
+    def list_objects(self, Bucket: str, Prefix: str = '', Delimiter: str = None,
+                     **_) -> Dict[str, Any]:
+        """
+        List the objects of a bucket whose key starts with the given prefix. With a
+        Delimiter, the keys containing it after the prefix are left out.
+        """
+        bucket_dir = os.path.join(self.root_dir, Bucket)
+        contents = []
+        for root, _dirs, files in os.walk(bucket_dir):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                key = os.path.relpath(path, bucket_dir).replace(os.sep, '/')
+                if key.startswith(Prefix) and not (
+                        Delimiter and Delimiter in key[len(Prefix):]):
+                    contents.append(self._object_info(Bucket, key))
+
+        contents.sort(key=lambda content: content['Key'])
+        response = {'Name': Bucket, 'Prefix': Prefix, 'IsTruncated': False}
+        if contents:
+            response['Contents'] = contents
+        return response
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = '', Delimiter: str = None,
+                        **_) -> Dict[str, Any]:
+        """
+        List the objects of a bucket, with the response shape of list_objects_v2.
+        """
+        response = self.list_objects(Bucket=Bucket, Prefix=Prefix, Delimiter=Delimiter)
+        response['KeyCount'] = len(response.get('Contents', []))
+        return response
+
+    def head_object(self, Bucket: str, Key: str, **_) -> Dict[str, Any]:
+        """
+        Return the metadata of an object. Like S3, a missing object is reported with
+        a ClientError with the '404' code.
+        """
+        if not os.path.isfile(self._object_path(Bucket, Key)):
+            raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}},
+                              'HeadObject')
+        info = self._object_info(Bucket, Key)
+        return {
+            'ContentLength': info['Size'],
+            'ETag': info['ETag'],
+            'LastModified': info['LastModified']
+        }
+
+    def get_object(self, Bucket: str, Key: str, **_) -> Dict[str, Any]:
+        """
+        Return an object with its content in a readable 'Body'.
+        """
+        path = self._check_exists(Bucket, Key)
+        with open(path, 'rb') as file:
+            content = file.read()
+        info = self._object_info(Bucket, Key)
+        response = {
+            'ContentLength': info['Size'],
+            'ETag': info['ETag'],
+            'LastModified': info['LastModified']
+        }
+        response['Body'] = io.BytesIO(content)
+        return response
+
+    def put_object(self, Bucket: str, Key: str, Body: Any = b'', IfMatch: str = None,
+                   IfNoneMatch: str = None, **_) -> Dict[str, Any]:
+        """
+        Store an object. The body may be bytes, a string or a readable file object.
+        IfMatch and IfNoneMatch='*' make the write conditional, as in S3.
+        """
+        exists = os.path.isfile(self._object_path(Bucket, Key))
+        etag = self._object_info(Bucket, Key)['ETag'] if exists else None
+        if (IfNoneMatch == '*' and exists) or (IfMatch is not None and etag != IfMatch):
+            raise ClientError({'Error': {'Code': 'PreconditionFailed',
+                                         'Message': 'At least one of the pre-conditions '
+                                                    'you specified did not hold'}},
+                              'PutObject')
+
+        if hasattr(Body, 'read'):
+            Body = Body.read()
+        if isinstance(Body, str):
+            Body = Body.encode('utf-8')
+
+        path = self._object_path(Bucket, Key)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(Body)
+        return {'ETag': f'"{hashlib.md5(Body).hexdigest()}"'}  # nosec - S3 ETag semantics
+
+    def copy_object(self, Bucket: str, CopySource: Dict[str, str], Key: str,
+                    **_) -> Dict[str, Any]:
+        """
+        Copy an object inside the local storage.
+        """
+        src_path = self._check_exists(CopySource['Bucket'], CopySource['Key'])
+        dest_path = self._object_path(Bucket, Key)
+        with self._lock:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copyfile(src_path, dest_path)
+        return {'CopyObjectResult': {'ETag': self._object_info(Bucket, Key)['ETag']}}
+
+    def delete_object(self, Bucket: str, Key: str, **_) -> Dict[str, Any]:
+        """
+        Delete an object. Like S3, deleting a missing key is not an error.
+        """
+        path = self._object_path(Bucket, Key)
+        if os.path.isfile(path):
+            os.remove(path)
+        return {}
+
+    def delete_objects(self, Bucket: str, Delete: Dict[str, Any], **_) -> Dict[str, Any]:
+        """
+        Delete several objects at once, with the response shape of delete_objects.
+        """
+        deleted = []
+        for obj in Delete['Objects']:
+            self.delete_object(Bucket=Bucket, Key=obj['Key'])
+            deleted.append({'Key': obj['Key']})
+        return {} if Delete.get('Quiet') else {'Deleted': deleted}
@@ -0,0 +1,276 @@
+"""
+This module provides the manifest of the files processed by the URL getters.
+
+The manifest is an SQLite database recording, for every source file, its size, ETag,
+modification time and content hash, the hash of its rendered URL, its processing status
+and the run that last processed it. A getter decides whether a file was already
+processed with an indexed lookup instead of reading its backup, files left in the
+'processing' status by an interrupted run can be resumed, and the files changed since
+a given run are listed without touching the storage.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.main.storage import ObjectInfo
+
+STATUS_PROCESSING = 'processing'
+STATUS_DONE = 'done'
+STATUS_ERROR = 'error'
+STATUS_UNCHANGED = 'unchanged'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS files (
+    file_name TEXT PRIMARY KEY,
+    content_hash TEXT,
+    size INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    last_modified REAL NOT NULL,
+    url_hash TEXT,
+    status TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    first_seen REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_run_id ON files (run_id);
+CREATE INDEX IF NOT EXISTS files_status ON files (status);
+"""
+
+_ENTRY_COLUMNS = ('file_name, content_hash, size, etag, last_modified, url_hash, status, '
+                  'run_id, first_seen, updated_at')
+
+
+def url_hash(url: str) -> str:
+    """
+    Return the SHA-256 hex digest of a rendered URL.
+    """
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class ManifestEntry:  # pylint: disable=too-many-instance-attributes
+    """ Represents the manifest record of a source file. """
+    file_name: str
+    content_hash: Optional[str]
+    size: int
+    etag: str
+    last_modified: float
+    url_hash: Optional[str]
+    status: str
+    run_id: int
+    first_seen: float
+    updated_at: float
+
+    def is_processed(self, info: ObjectInfo, content_digest: Callable[[], str]) -> bool:
+        """
+        Check whether the object was already processed: it has the recorded size and
+        ETag, or the recorded size and content hash. The content is only hashed when
+        the ETag differs, e.g. for a local file written again with the same content.
+
+        :param content_digest: Callable returning the SHA-256 hex digest of the object.
+        """
+        if self.status not in (STATUS_DONE, STATUS_UNCHANGED) or self.size != info.size:
+            return False
+        if self.etag == info.etag:
+            return True
+        return self.content_hash is not None and self.content_hash == content_digest()
+
+
+class Manifest:
+    """
+    SQLite index of the processed files, shared by the runs of the URL getters.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the manifest, creating its tables if needed.
+
+        :param path: Path of the SQLite database, or ':memory:'.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        # The async getter updates the manifest from its thread pool
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> 'Manifest':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self._connection.close()
+
+    def start_run(self) -> int:
+        """
+        Record the start of a run and return its id.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                'INSERT INTO runs (started_at) VALUES (?)', (time.time(),))
+            return cursor.lastrowid
+
+    def finish_run(self, run_id: int) -> None:
+        """
+        Record the end of a run.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                'UPDATE runs SET finished_at = ? WHERE run_id = ?', (time.time(), run_id))
+
+    def finished_at(self, run_id: int) -> Optional[float]:
+        """
+        Return the end time of a run, or None while it is not finished.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT finished_at FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def lookup(self, file_name: str) -> Optional[ManifestEntry]:
+        """
+        Return the record of a file, or None when the file is unknown.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                f'SELECT {_ENTRY_COLUMNS} FROM files WHERE file_name = ?',
+                (file_name,)).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def begin(self, file_name: str, info: ObjectInfo, run_id: int) -> None:
+        """
+        Record that a file is being processed by a run. The status stays 'processing'
+        until the run completes the file.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT INTO files (file_name, size, etag, last_modified, status, run_id, '
+                'first_seen, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (file_name) DO UPDATE SET size = excluded.size, '
+                'etag = excluded.etag, last_modified = excluded.last_modified, '
+                'status = excluded.status, run_id = excluded.run_id, '
+                'updated_at = excluded.updated_at',
+                (file_name, info.size, info.etag, info.last_modified, STATUS_PROCESSING,
+                 run_id, now, now))
+
+    def complete(self, updates: Dict[str, Dict[str, Optional[str]]]) -> None:
+        """
+        Record the outcome of several files in a single transaction.
+
+        :param updates: Dictionary mapping file names to their 'status', and for the
+            processed files their 'content_hash' and 'url_hash'. The URL hash of the
+            files found unchanged is kept.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            for file_name, update in updates.items():
+                if update['status'] == STATUS_UNCHANGED:
+                    self._connection.execute(
+                        'UPDATE files SET status = ?, '
+                        'content_hash = COALESCE(?, content_hash), updated_at = ? '
+                        'WHERE file_name = ?',
+                        (STATUS_UNCHANGED, update.get('content_hash'), now, file_name))
+                else:
+                    self._connection.execute(
+                        'UPDATE files SET status = ?, content_hash = ?, url_hash = ?, '
+                        'updated_at = ? WHERE file_name = ?',
+                        (update['status'], update.get('content_hash'),
+                         update.get('url_hash'), now, file_name))
+
+    def changed_since(self, run_id: int) -> List[ManifestEntry]:
+        """
+        Return the files processed, successfully or not, by the runs after run_id.
+        """
+        return self._select('run_id > ? AND status IN (?, ?)',
+                            (run_id, STATUS_DONE, STATUS_ERROR))
+
+    def incomplete(self) -> List[ManifestEntry]:
+        """
+        Return the files whose processing was interrupted, to be resumed.
+        """
+        return self._select('status = ?', (STATUS_PROCESSING,))
+
+    def _select(self, condition: str, parameters: tuple) -> List[ManifestEntry]:
+        with self._lock:
+            rows = self._connection.execute(
+                f'SELECT {_ENTRY_COLUMNS} FROM files WHERE {condition} ORDER BY file_name',
+                parameters).fetchall()
+        return [ManifestEntry(*row) for row in rows]
+
+
+class ManifestRun:
+    """
+    Run of a URL getter recorded in a manifest. The outcomes of the files are buffered
+    and only recorded once the moves and deletions of the files were flushed, which
+    happens many times per run, and the end of the run is recorded once by finish.
+    """
+
+    def __init__(self, manifest: Manifest) -> None:
+        """
+        Start a run in the manifest.
+        """
+        self.manifest = manifest
+        self.run_id = manifest.start_run()
+        self.finished = False
+        self._updates: Dict[str, Dict] = {}
+
+    def begin(self, file_name: str, info: ObjectInfo,
+              content_digest: Callable[[], str]) -> bool:
+        """
+        Look up a file and record it as being processed by the run, unless it was
+        already processed.
+
+        :param content_digest: Callable returning the SHA-256 hex digest of the file.
+        :return: False when the file was already processed.
+        """
+        entry = self.manifest.lookup(file_name)
+        if entry is not None and entry.is_processed(info, content_digest):
+            return False
+
+        self.manifest.begin(file_name, info, self.run_id)
+        self._updates[file_name] = {'known': entry is not None}
+        return True
+
+    def is_known(self, file_name: str) -> bool:
+        """
+        Check whether a file being processed was recorded by a previous run, in which
+        case it changed since and does not need to be compared with its backup.
+        """
+        return self._updates.get(file_name, {}).get('known', False)
+
+    def track(self, file_name: str, **update: Optional[str]) -> None:
+        """
+        Buffer the 'status', 'content_hash' or 'url_hash' of a file.
+        """
+        self._updates.setdefault(file_name, {}).update(update)
+
+    def commit(self, failed: Iterable[str] = ()) -> None:
+        """
+        Record the buffered outcomes, except those of the failed files which stay in
+        the 'processing' status.
+        """
+        failed = set(failed)
+        updates, self._updates = self._updates, {}
+        self.manifest.complete({file_name: update for file_name, update in updates.items()
+                                if file_name not in failed and 'status' in update})
+
+    def finish(self) -> None:
+        """
+        Record the end of the run, once.
+        """
+        if not self.finished:
+            self.manifest.finish_run(self.run_id)
+            self.finished = True
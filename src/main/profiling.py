@@ -0,0 +1,219 @@
+"""
+This module provides the on-demand profiling of the diagram rendering and the getters.
+
+The functions decorated with @profiled are run under cProfile and tracemalloc while a
+profiling session is active, e.g. for one Lambda invocation. Each profiled call writes
+its cProfile statistics (.prof, readable with pstats or snakeviz) and a text report of
+its slowest functions and top allocation sites to the destination of the session, a
+local directory or an S3 prefix, under a folder per invocation.
+
+The profiling is switched by the DIAGRAM_PROFILE environment variable:
+    off      never (default)
+    always   every invocation
+    request  the invocations asking for it, e.g. with ?profile=1 on the API
+When no session is active, a profiled function only costs a context variable lookup.
+"""
+import contextvars
+import cProfile
+import functools
+import io
+import logging
+import marshal
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, List, Optional
+
+from src.main.storage import LocalStorage, S3Storage, Storage
+
+PROFILE_ENV = 'DIAGRAM_PROFILE'
+PROFILE_DESTINATION_ENV = 'DIAGRAM_PROFILE_DESTINATION'
+PROFILE_OFF = 'off'
+PROFILE_ALWAYS = 'always'
+PROFILE_ON_REQUEST = 'request'
+# /tmp is the writable directory of a Lambda
+DEFAULT_DESTINATION = '/tmp/diagram-profiles'
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+TRACEMALLOC_FRAMES = 1
+
+_session: contextvars.ContextVar = contextvars.ContextVar('profile_session', default=None)
+
+
+def profiling_requested(flag: bool = False) -> bool:
+    """
+    Check whether an invocation is profiled, according to DIAGRAM_PROFILE.
+
+    :param flag: Whether the invocation asks for profiling.
+    """
+    mode = os.environ.get(PROFILE_ENV, PROFILE_OFF).strip().lower()
+    return mode == PROFILE_ALWAYS or (mode == PROFILE_ON_REQUEST and flag)
+
+
+def open_destination(destination: str) -> Storage:
+    """
+    Return the storage of a local directory or of an s3://bucket/prefix/ destination.
+    """
+    if not destination.startswith('s3://'):
+        return LocalStorage(destination)
+
+    # pylint: disable=import-outside-toplevel
+    from src.main.shared_resources import get_s3_client
+    bucket, _, prefix = destination[5:].partition('/')
+    return S3Storage(get_s3_client(), bucket, prefix)
+
+
+class _Tracing:
+    """
+    Counts the active sessions, tracemalloc being process-wide: it traces while any
+    session is active, e.g. in the concurrent requests of the local HTTP server. When
+    tracemalloc was started by someone else, it is left alone.
+    """
+
+    def __init__(self) -> None:
+        self.sessions = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """ Start tracing for a session. """
+        with self._lock:
+            if self.sessions or not tracemalloc.is_tracing():
+                if not self.sessions:
+                    tracemalloc.start(TRACEMALLOC_FRAMES)
+                self.sessions += 1
+
+    def stop(self) -> None:
+        """ Stop tracing after the last session. """
+        with self._lock:
+            if self.sessions:
+                self.sessions -= 1
+                if not self.sessions:
+                    tracemalloc.stop()
+
+
+_TRACING = _Tracing()
+
+
+@dataclass
+class ProfileSession:
+    """ Represents the profiled calls of an invocation and where they are written. """
+    storage: Storage
+    prefix: str
+    written: List[str] = field(default_factory=list)
+    _active: threading.local = field(default_factory=threading.local)
+
+    def run(self, func: Callable, args, kwargs) -> Any:
+        """
+        Run a function under cProfile and tracemalloc and write its reports. The
+        calls nested in a profiled call are part of its profile.
+        """
+        if getattr(self._active, 'value', False):
+            return func(*args, **kwargs)
+
+        profile = cProfile.Profile()
+        self._active.value = True
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active in the process, e.g. a debugger
+            profile = None
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+            elapsed = time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            self._active.value = False
+            try:
+                self._write(_label(func, args), elapsed, profile,
+                            after.compare_to(before, 'lineno')[:TOP_ALLOCATIONS])
+            except Exception:  # pylint: disable=broad-except
+                # The profiled call must not fail because of its profile
+                logging.exception('Failed to write the profile of %s', func.__qualname__)
+
+    def _write(self, label: str, elapsed: float, profile: Optional[cProfile.Profile],
+               allocations: List[tracemalloc.StatisticDiff]) -> None:
+        """
+        Write the statistics and the text report of a profiled call.
+        """
+        key = f'{self.prefix}{len(self.written):03d}-{label}'
+        report = io.StringIO()
+        report.write(f'{label}\nelapsed: {elapsed:.3f} s\n\n')
+
+        if profile is not None:
+            profile.create_stats()
+            self.storage.put(f'{key}.prof', marshal.dumps(profile.stats))
+            report.write(f'Top {TOP_FUNCTIONS} functions by cumulative time:\n')
+            pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(
+                TOP_FUNCTIONS)
+
+        report.write(f'Top {TOP_ALLOCATIONS} allocation sites:\n')
+        for allocation in allocations:
+            report.write(f'{allocation}\n')
+
+        self.storage.put(f'{key}.txt', report.getvalue().encode('utf-8'))
+        self.written.append(key)
+
+
+def _label(func: Callable, args) -> str:
+    """
+    Return the name of a profiled call: the function and its first string argument,
+    e.g. the file processed by a getter.
+    """
+    label = func.__qualname__
+    subject = next((arg for arg in args if isinstance(arg, str)), None)
+    if subject:
+        label = f'{label}-{subject}'
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', label)[:120]
+
+
+@contextmanager
+def profile_invocation(enabled: bool,
+                       destination: Optional[str] = None) -> Iterator[Optional[ProfileSession]]:
+    """
+    Profile the @profiled calls of an invocation, when enabled.
+
+    :param enabled: Whether the invocation is profiled, see profiling_requested.
+    :param destination: Local directory or s3:// prefix of the reports. Defaults to
+        DIAGRAM_PROFILE_DESTINATION, or to DEFAULT_DESTINATION.
+    :return: The session, or None when not enabled.
+    """
+    if not enabled:
+        yield None
+        return
+
+    destination = destination or os.environ.get(PROFILE_DESTINATION_ENV, DEFAULT_DESTINATION)
+    prefix = f'{time.strftime("%Y%m%dT%H%M%S")}-{uuid.uuid4().hex[:8]}/'
+    session = ProfileSession(open_destination(destination), prefix)
+
+    _TRACING.start()
+    token = _session.set(session)
+    try:
+        yield session
+    finally:
+        _session.reset(token)
+        _TRACING.stop()
+
+
+def profiled(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    This function is used to profile the method that use the decorator @profiled,
+    while a profiling session is active.
+    """
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        session = _session.get()
+        if session is None:
+            return func(*args, **kwargs)
+        return session.run(func, args, kwargs)
+    return wrapper
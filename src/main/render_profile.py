@@ -0,0 +1,98 @@
+"""
+This module provides the render profile used by the InterfaceDiagram class.
+
+The style strings and the constant attributes of the mxCell and mxGeometry elements
+only depend on the constants of the config module, so they are built once in a
+RenderProfile and reused for every cell instead of being formatted again per cell.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict
+
+from src.main import config
+
+
+@dataclass(frozen=True)
+class RenderProfile:  # pylint: disable=too-many-instance-attributes
+    """ Represents the precomputed styles, attributes and offsets of the diagram cells. """
+    app_styles: Dict[str, str]
+    default_app_style: str
+    protocol_style: str
+    connection_styles: Dict[str, str]
+    detail_style: str
+    link_style: str
+
+    # Constant attributes of the vertex and edge mxCell elements, the value attributes
+    # of the edges being omitted by the compact serialization
+    vertex_attrs: Dict[str, str]
+    edge_attrs: Dict[str, str]
+    edge_value_attrs: Dict[str, str]
+
+    # Constant attributes of the mxGeometry elements, after their x and y attributes
+    protocol_size_attrs: Dict[str, str]
+    detail_size_attrs: Dict[str, str]
+    edge_geometry_attrs: Dict[str, str]
+
+    app_width: str
+    column_width: int
+    row_height: int
+    protocol_positions: Dict[str, int]
+
+
+def app_style(fill_color: str, stroke_color: str) -> str:
+    """
+    Return the style string of an application shape.
+    """
+    return (f'rounded=1;whiteSpace=wrap;html=1;fillColor={fill_color};'
+            f'strokeColor={stroke_color};verticalAlign=top;')
+
+
+def connection_style(fill_color: str, stroke_color: str) -> str:
+    """
+    Return the style string of a connection.
+    """
+    return (f'edgeStyle=orthogonalEdgeStyle;rounded=0;fillColor={fill_color};'
+            f'strokeColor={stroke_color};orthogonalLoop=1;jettySize=auto;'
+            'html=1;strokeWidth=3')
+
+
+@lru_cache(maxsize=None)
+def get_render_profile() -> RenderProfile:
+    """
+    Build the render profile from the config module. The profile is cached, call
+    get_render_profile.cache_clear() after changing the config.
+    """
+    return RenderProfile(
+        app_styles={app_type: app_style(fill_color, stroke_color)
+                    for app_type, (fill_color, stroke_color) in config.COLOR_MAP.items()},
+        default_app_style=app_style(config.APP_DEFAULT_FILL_COLOR,
+                                    config.APP_DEFAULT_STROKE_COLOR),
+        protocol_style=(f'shape=delay;whiteSpace=wrap;html=1;'
+                        f'fillColor={config.PROTOCOL_FILL_COLOR};'
+                        f'strokeColor={config.PROTOCOL_STROKE_COLOR};rotation=0;fontSize=10;'),
+        connection_styles={
+            config.OUTBOUND: connection_style(config.CONNECTION_OUT_FILL_COLOR,
+                                              config.CONNECTION_OUT_STROKE_COLOR),
+            config.INBOUND: connection_style(config.CONNECTION_IN_FILL_COLOR,
+                                             config.CONNECTION_IN_STROKE_COLOR)
+        },
+        detail_style=('text;html=1;strokeColor=none;fillColor=none;align=center;'
+                      'verticalAlign=middle;whiteSpace=wrap;rounded=0'),
+        link_style=('text;html=1;strokeColor=none;fillColor=none;align=center;'
+                    'verticalAlign=middle;whiteSpace=wrap;rounded=0;fontSize=9'),
+        vertex_attrs={'parent': config.DEFAULT_PARENT_ID, 'vertex': config.DEFAULT_VERTEX},
+        edge_attrs={'parent': config.DEFAULT_PARENT_ID, 'edge': config.DEFAULT_EDGE},
+        edge_value_attrs={'value': '', 'invert': 'true'},
+        protocol_size_attrs={'width': str(config.PROTOCOL_WIDTH),
+                             'height': str(config.PROTOCOL_HEIGHT),
+                             'as': config.APP_GEOMETRY},
+        detail_size_attrs={'width': str(config.DETAIL_WIDTH),
+                           'height': str(config.DETAIL_HEIGHT),
+                           'as': config.APP_GEOMETRY},
+        edge_geometry_attrs={'relative': '1', 'as': config.APP_GEOMETRY},
+        app_width=str(config.APP_WIDTH),
+        column_width=config.APP_WIDTH * config.APP_SIZE_SPACE,
+        row_height=config.PROTOCOL_HEIGHT + config.Y_OFFSET,
+        protocol_positions={'out': config.PROTOCOL_OUT_POSITION,
+                            'in': config.PROTOCOL_IN_POSITION}
+    )
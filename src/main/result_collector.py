@@ -0,0 +1,195 @@
+"""
+This module provides a buffered collector for the rows produced by the URL getters.
+
+Rows are kept in a plain list while files are processed and the DataFrame is only
+built once, when the results are saved. With a chunk size, the buffer is flushed in
+chunks to a sink, by default a temporary spill file read back when the DataFrame is
+built, so that very large runs keep a bounded amount of rows in memory.
+
+Instead of the full JSON body, the collector can store a content hash and a reference
+to the backup file, which keeps the output under the Excel cell size limit.
+"""
+import hashlib
+import json
+import pickle
+import tempfile
+import threading
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+RESULT_COLUMNS = ['connected_app', 'body', 'file_name', 'url']
+REFERENCE_COLUMNS = ['connected_app', 'body_hash', 'body_ref', 'file_name', 'url']
+
+
+def body_hash(body: str) -> str:
+    """
+    Return the SHA-256 hex digest of a serialized JSON body.
+    """
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+
+class SpillFile:
+    """
+    Sink writing the flushed chunks to a temporary file, created on the first chunk
+    and deleted when closed.
+    """
+
+    def __init__(self) -> None:
+        self._file = None
+        self.chunks = 0
+
+    def __call__(self, chunk: pd.DataFrame) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        pickle.dump(chunk, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.chunks += 1
+
+    def read(self) -> Iterator[pd.DataFrame]:
+        """
+        Read the chunks back, in the order they were written.
+        """
+        if self._file is None:
+            return
+        self._file.seek(0)
+        try:
+            for _ in range(self.chunks):
+                yield pickle.load(self._file)
+        finally:
+            self._file.seek(0, 2)
+
+    def close(self) -> None:
+        """
+        Delete the temporary file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.chunks = 0
+
+
+class ResultCollector:
+    """
+    Collects the result rows of a run and builds the DataFrame on demand. The rows
+    may be appended by concurrent threads.
+    """
+
+    def __init__(self, columns: Optional[Sequence[str]] = None,
+                 chunk_size: Optional[int] = None,
+                 sink: Optional[Callable[[pd.DataFrame], Any]] = None,
+                 store_body: bool = True) -> None:
+        """
+        Initialize the collector.
+
+        :param columns: Column names of the result rows. Defaults to RESULT_COLUMNS,
+            or REFERENCE_COLUMNS when store_body is False.
+        :param chunk_size: Number of buffered rows that triggers a flush. When None,
+            rows are only converted when the DataFrame is requested.
+        :param sink: Callable receiving each flushed chunk as a DataFrame. When a sink
+            is given, flushed chunks are handed over and not retained by the collector.
+            Defaults to a SpillFile, whose chunks are part of to_data_frame.
+        :param store_body: When False, append_result stores a hash of the body and a
+            reference to its backup instead of the body itself.
+        """
+        self.store_body = store_body
+        if columns is None:
+            columns = RESULT_COLUMNS if store_body else REFERENCE_COLUMNS
+        self.columns = list(columns)
+        self.chunk_size = chunk_size
+        self.sink = sink or SpillFile()
+
+        self._rows: List[Tuple] = []
+        self._flushed_rows = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """
+        Return the total number of rows collected, including flushed ones.
+        """
+        return self._flushed_rows + len(self._rows)
+
+    def append(self, *values: Any) -> None:
+        """
+        Buffer a new row. The values must follow the order of the columns.
+        """
+        if len(values) != len(self.columns):
+            raise ValueError(
+                f'Expected {len(self.columns)} values, got {len(values)}.')
+
+        with self._lock:
+            self._rows.append(values)
+
+            if self.chunk_size and len(self._rows) >= self.chunk_size:
+                self.flush()
+
+    def append_result(self, connected_app: str, data: Any, file_name: str,
+                      url: str, body_ref: str = '') -> None:
+        """
+        Buffer the result of a processed file, storing either the full JSON body or
+        its hash and a reference to the backup, depending on store_body.
+
+        :param connected_app: Name of the connected app of the diagram.
+        :param data: Parsed JSON content of the file.
+        :param file_name: Name of the processed file.
+        :param url: Generated diagram URL.
+        :param body_ref: Location of the backup file holding the full body.
+        """
+        body = json.dumps(data)
+        if self.store_body:
+            self.append(connected_app, body, file_name, url)
+        else:
+            self.append_reference(connected_app, body_hash(body), body_ref, file_name, url)
+
+    def append_reference(self, connected_app: str, digest: str, body_ref: str,
+                         file_name: str, url: str) -> None:
+        """
+        Buffer the result of a processed file from the hash of its body, computed
+        beforehand, and the reference to its backup. Only valid when store_body is False.
+        """
+        if self.store_body:
+            raise ValueError('The collector stores the full body.')
+        self.append(connected_app, digest, body_ref, file_name, url)
+
+    def append_empty_row(self) -> None:
+        """
+        Buffer a row without values, used to produce a blank record in the output.
+        """
+        self.append(*[None] * len(self.columns))
+
+    def flush(self) -> None:
+        """
+        Convert the buffered rows into a DataFrame chunk, hand it to the sink and
+        release the buffer.
+        """
+        with self._lock:
+            if not self._rows:
+                return
+
+            chunk = pd.DataFrame.from_records(self._rows, columns=self.columns)
+            self._flushed_rows += len(self._rows)
+            self._rows = []
+            self.sink(chunk)
+
+    def to_data_frame(self) -> pd.DataFrame:
+        """
+        Build the DataFrame with every spilled chunk and the buffered rows.
+        """
+        frames = list(self.sink.read()) if isinstance(self.sink, SpillFile) else []
+        if self._rows:
+            frames.append(pd.DataFrame.from_records(
+                self._rows, columns=self.columns))
+
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def clear(self) -> None:
+        """
+        Drop every buffered row and spilled chunk.
+        """
+        self._rows = []
+        if isinstance(self.sink, SpillFile):
+            self.sink.close()
+        self._flushed_rows = 0
@@ -0,0 +1,252 @@
+"""
+This module provides the coordinator/worker mode of the URL getters.
+
+The coordinator lists the pending files of the source storage and partitions them into
+shards bounded by a number of files and a total size. Each shard is dispatched to an
+independent worker, an invocation of the S3 Lambda in production or a local subprocess,
+which processes its files and writes its result rows next to the Excel file. The
+coordinator then collects the rows of every shard, so the Excel file is written once.
+The coordinator waits for its workers, so it may give them a deadline, a wall clock
+time before which they return, leaving it the time to save the Excel file.
+
+Run as a module, a worker reads its shard from the standard input:
+    python -m src.main.sharding <source_dir> <excel_file> < shard.json
+"""
+import argparse
+import heapq
+import json
+import logging
+import math
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from src.main.interface_url_getter import InterfaceURLGetter
+from src.main.storage import ObjectInfo
+
+SHARD_MODE = 'shard'
+COORDINATOR_MODE = 'coordinator'
+MAX_SHARD_KEYS = 200
+MAX_SHARD_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class Shard:
+    """ Represents a set of files processed by a worker. """
+    keys: List[str] = field(default_factory=list)
+    size: int = 0
+
+
+class ShardError(Exception):
+    """ Raised when a worker fails to process its shard. """
+
+
+def partition_keys(infos: Iterable[ObjectInfo], max_keys: int = MAX_SHARD_KEYS,
+                   max_bytes: int = MAX_SHARD_BYTES) -> List[Shard]:
+    """
+    Partition files into the fewest shards allowed by the limits, balanced by size:
+    the largest files are assigned first, each to the smallest shard not yet full.
+
+    :param infos: Files to partition.
+    :param max_keys: Maximum number of files of a shard.
+    :param max_bytes: Total size of the files of a shard aimed at. A file larger
+        than max_bytes gets a shard of its own.
+    """
+    infos = sorted(infos, key=lambda info: info.size, reverse=True)
+    if not infos:
+        return []
+
+    shard_count = max(math.ceil(len(infos) / max_keys),
+                      math.ceil(sum(info.size for info in infos) / max_bytes))
+    shards = [Shard() for _ in range(shard_count)]
+    smallest = [(0, index) for index in range(shard_count)]
+
+    for info in infos:
+        if not smallest:
+            shards.append(Shard())
+            smallest.append((0, len(shards) - 1))
+        _, index = heapq.heappop(smallest)
+        shard = shards[index]
+        shard.keys.append(info.key)
+        shard.size += info.size
+        if len(shard.keys) < max_keys:
+            heapq.heappush(smallest, (shard.size, index))
+
+    for shard in shards:
+        shard.keys.sort()
+    return shards
+
+
+def run_shard(getter: InterfaceURLGetter, keys: Sequence[str], result_key: str,
+              deadline: Optional[float] = None) -> Dict:
+    """
+    Process the files of a shard and write the result rows to result_key, in the
+    output storage of the getter.
+
+    :param deadline: Wall clock time (time.time()) given by the coordinator, capping
+        the time budget of the getter. The files not processed by then are counted
+        as remaining.
+    :return: Summary of the shard, sent back to the coordinator.
+    """
+    if deadline is not None:
+        seconds = max(deadline - time.time(), 0.0)
+        if getter.time_budget is not None:
+            seconds = min(seconds, getter.time_budget.time_left)
+        getter.set_time_budget(seconds)
+
+    records = getter.process_source_keys(keys)
+    getter.finish_run()
+
+    data_frame = getter.data_frame
+    getter.output.put(result_key, json.dumps({
+        'columns': list(data_frame.columns),
+        'rows': data_frame.astype(object).where(data_frame.notna(), None).values.tolist()
+    }).encode('utf-8'))
+
+    return {'result_key': result_key, 'records': records, 'remaining': getter.remaining}
+
+
+class SubprocessShardDispatcher:  # pylint: disable=too-few-public-methods
+    """
+    Runs each shard in a local worker process.
+    """
+
+    def __init__(self, source_dir: str, excel_file: str) -> None:
+        """
+        :param source_dir: Source directory of the workers.
+        :param excel_file: Excel file of the workers, next to which the results are written.
+        """
+        self.command = [sys.executable, '-m', 'src.main.sharding', source_dir, excel_file]
+
+    def __call__(self, payload: Dict) -> Dict:
+        process = subprocess.run(self.command, input=json.dumps(payload),
+                                 capture_output=True, text=True, check=False)
+        if process.returncode:
+            raise ShardError(process.stderr.strip())
+        # The worker prints its summary on the last line of its output
+        return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+class LambdaShardDispatcher:  # pylint: disable=too-few-public-methods
+    """
+    Runs each shard in a synchronous invocation of a Lambda function.
+    """
+
+    def __init__(self, lambda_client, function_name: str) -> None:
+        """
+        :param lambda_client: boto3 Lambda client.
+        :param function_name: Name of the function handling the shard events.
+        """
+        self.lambda_client = lambda_client
+        self.function_name = function_name
+
+    def __call__(self, payload: Dict) -> Dict:
+        response = self.lambda_client.invoke(
+            FunctionName=self.function_name, InvocationType='RequestResponse',
+            Payload=json.dumps(payload).encode('utf-8'))
+        result = json.loads(response['Payload'].read())
+        if response.get('FunctionError'):
+            raise ShardError(result.get('errorMessage', response['FunctionError']))
+        return result
+
+
+class ShardCoordinator:  # pylint: disable=too-few-public-methods
+    """
+    Dispatches the pending files of a getter to workers and collects their results.
+    """
+
+    def __init__(self, getter: InterfaceURLGetter, dispatcher: Callable[[Dict], Dict],
+                 max_workers: int = 16) -> None:
+        """
+        :param getter: Getter listing the files and collecting the results.
+        :param dispatcher: Callable running a shard payload on a worker and returning
+            the summary of run_shard.
+        :param max_workers: Number of shards run at the same time.
+        """
+        self.getter = getter
+        self.dispatcher = dispatcher
+        self.max_workers = max_workers
+
+    def run(self, max_keys: int = MAX_SHARD_KEYS, max_bytes: int = MAX_SHARD_BYTES,
+            deadline: Optional[float] = None) -> Dict:
+        """
+        Dispatch the pending files and append the result rows of the workers to the
+        results of the getter. The files of failed shards stay in the source storage
+        and are counted in the remaining attribute of the getter. The results are
+        saved by the caller, with save_results.
+
+        :param deadline: Wall clock time (time.time()) sent to the workers, before
+            which they save their results and return.
+        :return: Summary with the number of shards and records and the failed shards.
+        """
+        shards = partition_keys(self.getter.list_pending(), max_keys, max_bytes)
+        result_prefix = f'{self.getter.excel_key}.shards/{uuid.uuid4().hex}/'
+        payloads = [{'mode': SHARD_MODE, 'keys': shard.keys,
+                     'result_key': f'{result_prefix}{index}.json'}
+                    for index, shard in enumerate(shards)]
+        if deadline is not None:
+            for payload in payloads:
+                payload['deadline'] = deadline
+
+        summary = {'shards': len(shards), 'records': 0, 'failed': []}
+        if not payloads:
+            # As in a full scan, create one empty row
+            self.getter.results.append_empty_row()
+            return summary
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.dispatcher, payload) for payload in payloads]
+
+        for payload, future in zip(payloads, futures):
+            try:
+                result = future.result()
+                self._collect(result['result_key'])
+            except Exception as error:  # pylint: disable=broad-except
+                logging.error('Shard %s failed: %s', payload['result_key'], error)
+                summary['failed'].append(payload['result_key'])
+                self.getter.remaining += len(payload['keys'])
+                continue
+            summary['records'] += result['records']
+            self.getter.remaining += result['remaining']
+
+        return summary
+
+    def _collect(self, result_key: str) -> None:
+        """
+        Append the result rows of a shard to the results and delete them.
+        """
+        result = json.loads(self.getter.output.get(result_key))
+        if result['columns'] != self.getter.results.columns:
+            raise ShardError(f'Unexpected columns in {result_key}: {result["columns"]}')
+        for row in result['rows']:
+            self.getter.results.append(*row)
+        self.getter.output.delete(result_key)
+
+
+def main():
+    """
+    Worker entry point of the subprocess dispatcher.
+    """
+    parser = argparse.ArgumentParser(description='Process a shard read from stdin.')
+    parser.add_argument('source_dir')
+    parser.add_argument('excel_file')
+    args = parser.parse_args()
+
+    # pylint: disable=import-outside-toplevel
+    if args.source_dir.startswith('s3://'):
+        from src.main.s3_interface_url_getter import S3InterfaceURLGetter as Getter
+    else:
+        from src.main.local_interface_url_getter import LocalInterfaceURLGetter as Getter
+
+    payload = json.load(sys.stdin)
+    print(json.dumps(run_shard(Getter(args.source_dir, args.excel_file),
+                               payload['keys'], payload['result_key'],
+                               payload.get('deadline'))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+This module provides the resources shared by the invocations of a warm Lambda container.
+
+Creating a boto3 client resolves the credentials and the endpoints, which takes hundreds
+of milliseconds, and the logging only needs to be configured once. The resources are
+created on first use, kept at module level and reused by the following invocations of
+the same container. The clients are thread-safe once created, but their creation is
+not, so it is serialized.
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict
+
+from src.main.logging_utils import configure_logging
+from src.main.render_profile import get_render_profile
+
+# Connections kept open to S3: the batch operations and the async getter both run 16
+# requests at a time, over the 10 connections of the boto3 default
+S3_MAX_POOL_CONNECTIONS = int(os.environ.get('S3_MAX_POOL_CONNECTIONS', '32'))
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 60
+MAX_ATTEMPTS = 3
+# A shard is run by a synchronous invocation, lasting up to the 15 minutes of a Lambda,
+# and is not retried by the client, the coordinator reporting the failed shards
+LAMBDA_READ_TIMEOUT = 900
+
+_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+_initialized = threading.Event()
+
+
+def get_client(service_name: str, max_pool_connections: int = 10,
+               read_timeout: int = READ_TIMEOUT, max_attempts: int = MAX_ATTEMPTS):
+    """
+    Return the shared boto3 client of a service, creating it on first use. The
+    configuration parameters are only used when the client is created.
+
+    :param service_name: Name of the AWS service, e.g. 's3'.
+    :param max_pool_connections: Connections kept open.
+    :param read_timeout: Seconds waited for a response.
+    :param max_attempts: Attempts of a request, the first one included.
+    """
+    client = _clients.get(service_name)
+    if client is not None:
+        return client
+
+    # boto3 is only imported by the functions creating clients
+    # pylint: disable=import-outside-toplevel
+    import boto3
+    from botocore.config import Config
+
+    with _lock:
+        if service_name not in _clients:
+            _clients[service_name] = boto3.client(
+                service_name, config=Config(
+                    max_pool_connections=max_pool_connections,
+                    connect_timeout=CONNECT_TIMEOUT,
+                    read_timeout=read_timeout,
+                    retries={'max_attempts': max_attempts, 'mode': 'standard'},
+                    tcp_keepalive=True))
+        return _clients[service_name]
+
+
+def get_s3_client():
+    """
+    Return the shared S3 client, with a connection pool sized for the parallel requests.
+    """
+    return get_client('s3', S3_MAX_POOL_CONNECTIONS)
+
+
+def get_lambda_client():
+    """
+    Return the shared Lambda client, waiting for the synchronous invocations.
+    """
+    return get_client('lambda', read_timeout=LAMBDA_READ_TIMEOUT, max_attempts=1)
+
+
+def initialize(log_level=logging.ERROR) -> None:
+    """
+    Configure the logging and build the render profile, once per container.
+    """
+    if _initialized.is_set():
+        return
+    configure_logging(log_level)
+    get_render_profile()
+    _initialized.set()
+
+
+def reset() -> None:
+    """
+    Drop the shared resources, so they are created again on next use.
+    """
+    with _lock:
+        _clients.clear()
+    _initialized.clear()
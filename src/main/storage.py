@@ -0,0 +1,472 @@
+"""
+This module provides the storage backends used by the InterfaceURLGetter.
+
+Every backend exposes the same operations (list, head, get, put, copy, delete and batch
+delete) on '/' separated keys relative to its root, so the processing flow of the
+getter is written once for the local filesystem, memory and S3.
+
+Listings are not recursive: only the objects directly under the given prefix are
+returned, so the backup and error directories are not listed with the source files.
+"""
+import hashlib
+import io
+import os
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+MAX_DELETE_BATCH_SIZE = 1000
+
+# Error codes returned by S3 when a conditional write lost a race
+CONDITIONAL_WRITE_ERRORS = ('PreconditionFailed', 'ConditionalRequestConflict')
+
+
+class StorageError(Exception):
+    """ Raised when a storage operation fails. """
+
+
+class ObjectNotFoundError(StorageError):
+    """ Raised when an object does not exist in the storage. """
+
+
+class PreconditionFailedError(StorageError):
+    """ Raised when the condition of a conditional write does not hold. """
+
+
+@dataclass
+class ObjectInfo:
+    """ Represents the metadata of a stored object. """
+    key: str
+    size: int
+    etag: str
+    last_modified: float
+
+
+class Storage(ABC):
+    """
+    Base class of the storage backends.
+    """
+
+    # Whether delete_many is cheaper than individual deletions, in which case moves
+    # are run as copies followed by a batch deletion of the sources
+    batch_deletes = False
+
+    @abstractmethod
+    def list_pages(self, prefix: str = '') -> Iterator[List[ObjectInfo]]:
+        """
+        List the objects directly under the prefix, one page at a time.
+        """
+
+    @abstractmethod
+    def get_with_info(self, key: str) -> Tuple[bytes, ObjectInfo]:
+        """
+        Return the content and the metadata of an object, read together.
+        """
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, if_match: Optional[str] = None,
+            if_none_match: bool = False) -> str:
+        """
+        Store an object and return its ETag.
+
+        :param if_match: Only write when the current ETag of the object is this one.
+        :param if_none_match: Only write when the object does not exist.
+        :raises PreconditionFailedError: When the condition does not hold.
+        """
+
+    @abstractmethod
+    def copy(self, src_key: str, dest_key: str) -> None:
+        """
+        Copy an object.
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Delete an object. Deleting a missing object is not an error.
+        """
+
+    @abstractmethod
+    def uri(self, key: str) -> str:
+        """
+        Return the location of an object, e.g. a file path or an s3:// URI.
+        """
+
+    def list(self, prefix: str = '') -> Iterator[ObjectInfo]:
+        """
+        List the objects directly under the prefix.
+        """
+        for page in self.list_pages(prefix):
+            yield from page
+
+    def head(self, key: str) -> ObjectInfo:
+        """
+        Return the metadata of an object.
+        """
+        return self.get_with_info(key)[1]
+
+    def get(self, key: str) -> bytes:
+        """
+        Return the content of an object.
+        """
+        return self.get_with_info(key)[0]
+
+    def open(self, key: str) -> BinaryIO:
+        """
+        Return a binary stream reading the content of an object. Backends that can
+        stream override it, the default reads the whole content.
+        """
+        return io.BytesIO(self.get(key))
+
+    def digest(self, key: str, chunk_size: int = 64 * 1024) -> str:
+        """
+        Return the SHA-256 hex digest of the content of an object, read as a stream.
+        """
+        digest = hashlib.sha256()
+        with closing(self.open(key)) as stream:
+            for chunk in iter(lambda: stream.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def exists(self, key: str) -> bool:
+        """
+        Check whether an object exists.
+        """
+        try:
+            self.head(key)
+            return True
+        except ObjectNotFoundError:
+            return False
+
+    def move(self, src_key: str, dest_key: str) -> None:
+        """
+        Move an object.
+        """
+        self.copy(src_key, dest_key)
+        self.delete(src_key)
+
+    def delete_many(self, keys: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        Delete several objects.
+
+        :return: List of (key, error) pairs of the objects that could not be deleted.
+        """
+        failed = []
+        for key in keys:
+            try:
+                self.delete(key)
+            except OSError as error:
+                failed.append((key, str(error)))
+        return failed
+
+    def key_from_uri(self, uri: str) -> str:
+        """
+        Return the key of an object from its location, the inverse of uri.
+        """
+        root = self.uri('')
+        if not uri.startswith(root):
+            raise ValueError(f'{uri} is not a location of this storage.')
+        return uri[len(root):].replace(os.sep, '/').lstrip('/')
+
+
+class LocalStorage(Storage):
+    """
+    Storage backend on a local directory.
+    """
+
+    def __init__(self, root_dir: str) -> None:
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, *key.split('/')) if key else self.root_dir
+
+    @staticmethod
+    def _info(key: str, stat: os.stat_result) -> ObjectInfo:
+        # The size and modification time are used as a cheap ETag
+        return ObjectInfo(key, stat.st_size, f'{stat.st_size}-{stat.st_mtime_ns}',
+                          stat.st_mtime)
+
+    def list_pages(self, prefix: str = '') -> Iterator[List[ObjectInfo]]:
+        directory, _, name_prefix = prefix.rpartition('/')
+        path = self._path(directory)
+        if not os.path.isdir(path):
+            return
+
+        key_prefix = f'{directory}/' if directory else ''
+        with os.scandir(path) as entries:
+            page = [self._info(f'{key_prefix}{entry.name}', entry.stat())
+                    for entry in entries
+                    if entry.is_file() and entry.name.startswith(name_prefix)]
+
+        page.sort(key=lambda info: info.key)
+        if page:
+            yield page
+
+    def head(self, key: str) -> ObjectInfo:
+        try:
+            return self._info(key, os.stat(self._path(key)))
+        except FileNotFoundError as error:
+            raise ObjectNotFoundError(key) from error
+
+    def get_with_info(self, key: str) -> Tuple[bytes, ObjectInfo]:
+        try:
+            with open(self._path(key), 'rb') as file:
+                return file.read(), self._info(key, os.fstat(file.fileno()))
+        except FileNotFoundError as error:
+            raise ObjectNotFoundError(key) from error
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return open(self._path(key), 'rb')  # pylint: disable=consider-using-with
+        except FileNotFoundError as error:
+            raise ObjectNotFoundError(key) from error
+
+    def put(self, key: str, data: bytes, if_match: Optional[str] = None,
+            if_none_match: bool = False) -> str:
+        path = self._path(key)
+        with self._lock:
+            if if_match is not None or if_none_match:
+                etag = self.head(key).etag if os.path.isfile(path) else None
+                if (if_none_match and etag is not None) or (
+                        if_match is not None and etag != if_match):
+                    raise PreconditionFailedError(key)
+
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(data)
+            return self.head(key).etag
+
+    def copy(self, src_key: str, dest_key: str) -> None:
+        dest_path = self._path(dest_key)
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        try:
+            shutil.copyfile(self._path(src_key), dest_path)
+        except FileNotFoundError as error:
+            raise ObjectNotFoundError(src_key) from error
+
+    def move(self, src_key: str, dest_key: str) -> None:
+        dest_path = self._path(dest_key)
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True)
+        try:
+            os.replace(self._path(src_key), dest_path)
+        except FileNotFoundError as error:
+            raise ObjectNotFoundError(src_key) from error
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def uri(self, key: str) -> str:
+        return os.path.join(self.root_dir, *key.split('/'))
+
+
+class InMemoryStorage(Storage):
+    """
+    Storage backend keeping the objects in memory, used for tests and load tests.
+    """
+
+    def __init__(self) -> None:
+        self._objects: Dict[str, Tuple[bytes, ObjectInfo]] = {}
+        self._lock = threading.Lock()
+
+    def list_pages(self, prefix: str = '') -> Iterator[List[ObjectInfo]]:
+        with self._lock:
+            page = [info for key, (_, info) in self._objects.items()
+                    if key.startswith(prefix) and '/' not in key[len(prefix):]]
+        page.sort(key=lambda info: info.key)
+        if page:
+            yield page
+
+    def get_with_info(self, key: str) -> Tuple[bytes, ObjectInfo]:
+        with self._lock:
+            if key not in self._objects:
+                raise ObjectNotFoundError(key)
+            return self._objects[key]
+
+    def put(self, key: str, data: bytes, if_match: Optional[str] = None,
+            if_none_match: bool = False) -> str:
+        with self._lock:
+            current = self._objects.get(key)
+            etag = current[1].etag if current else None
+            if (if_none_match and current is not None) or (
+                    if_match is not None and etag != if_match):
+                raise PreconditionFailedError(key)
+
+            info = ObjectInfo(key, len(data), f'"{hashlib.md5(data).hexdigest()}"',  # nosec
+                              time.time())
+            self._objects[key] = (bytes(data), info)
+            return info.etag
+
+    def copy(self, src_key: str, dest_key: str) -> None:
+        data = self.get(src_key)
+        self.put(dest_key, data)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def uri(self, key: str) -> str:
+        return f'memory://{key}'
+
+
+class S3Storage(Storage):
+    """
+    Storage backend on an S3 bucket, optionally rooted at a key prefix.
+    """
+
+    batch_deletes = True
+
+    def __init__(self, s3_client, bucket: str, prefix: str = '', max_retries: int = 3,
+                 retry_delay: float = 0.2) -> None:
+        """
+        Initialize the backend.
+
+        :param s3_client: boto3 S3 client (or a compatible stand-in).
+        :param bucket: Name of the bucket.
+        :param prefix: Key prefix of the root of the storage, e.g. 'in/'.
+        :param max_retries: Number of retries of a failed copy or batch deletion.
+        :param retry_delay: Initial delay in seconds between retries, doubled at each retry.
+        """
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def _wait_before_retry(self, attempt: int) -> None:
+        if attempt:
+            time.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+    @staticmethod
+    def _is_not_found(client_error: ClientError) -> bool:
+        return client_error.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound')
+
+    def list_pages(self, prefix: str = '') -> Iterator[List[ObjectInfo]]:
+        request = {'Bucket': self.bucket, 'Prefix': f'{self.prefix}{prefix}',
+                   'Delimiter': '/'}
+        while True:
+            response = self.s3_client.list_objects_v2(**request)
+
+            page = [ObjectInfo(content['Key'][len(self.prefix):], content['Size'],
+                               content['ETag'], content['LastModified'].timestamp())
+                    for content in response.get('Contents', [])]
+            if page:
+                yield page
+
+            if not response.get('IsTruncated'):
+                return
+            request['ContinuationToken'] = response['NextContinuationToken']
+
+    def head(self, key: str) -> ObjectInfo:
+        try:
+            response = self.s3_client.head_object(
+                Bucket=self.bucket, Key=f'{self.prefix}{key}')
+        except ClientError as client_error:
+            if self._is_not_found(client_error):
+                raise ObjectNotFoundError(key) from client_error
+            raise
+        return ObjectInfo(key, response['ContentLength'], response['ETag'],
+                          response['LastModified'].timestamp())
+
+    def get_with_info(self, key: str) -> Tuple[bytes, ObjectInfo]:
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket, Key=f'{self.prefix}{key}')
+        except self.s3_client.exceptions.NoSuchKey as error:
+            raise ObjectNotFoundError(key) from error
+
+        data = response['Body'].read()
+        return data, ObjectInfo(key, len(data), response['ETag'],
+                                response['LastModified'].timestamp())
+
+    def open(self, key: str) -> BinaryIO:
+        """
+        Return the streaming body of the object, read from S3 as it is consumed.
+        """
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket, Key=f'{self.prefix}{key}')
+        except self.s3_client.exceptions.NoSuchKey as error:
+            raise ObjectNotFoundError(key) from error
+        return response['Body']
+
+    def put(self, key: str, data: bytes, if_match: Optional[str] = None,
+            if_none_match: bool = False) -> str:
+        condition = {}
+        if if_match is not None:
+            condition['IfMatch'] = if_match
+        if if_none_match:
+            condition['IfNoneMatch'] = '*'
+
+        try:
+            response = self.s3_client.put_object(
+                Bucket=self.bucket, Key=f'{self.prefix}{key}', Body=data, **condition)
+        except ClientError as client_error:
+            if client_error.response['Error']['Code'] in CONDITIONAL_WRITE_ERRORS:
+                raise PreconditionFailedError(key) from client_error
+            raise
+        return response.get('ETag', '')
+
+    def copy(self, src_key: str, dest_key: str) -> None:
+        for attempt in range(self.max_retries + 1):
+            self._wait_before_retry(attempt)
+            try:
+                self.s3_client.copy_object(
+                    Bucket=self.bucket, Key=f'{self.prefix}{dest_key}',
+                    CopySource={'Bucket': self.bucket, 'Key': f'{self.prefix}{src_key}'})
+                return
+            except self.s3_client.exceptions.NoSuchKey as error:
+                raise ObjectNotFoundError(src_key) from error
+            except (BotoCoreError, ClientError) as client_error:
+                if isinstance(client_error, ClientError) and self._is_not_found(client_error):
+                    raise ObjectNotFoundError(src_key) from client_error
+                if attempt == self.max_retries:
+                    raise StorageError(str(client_error)) from client_error
+
+    def delete(self, key: str) -> None:
+        self.s3_client.delete_object(Bucket=self.bucket, Key=f'{self.prefix}{key}')
+
+    def delete_many(self, keys: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        Delete the objects with delete_objects in batches of up to 1,000 keys,
+        retrying the keys reported as failed.
+        """
+        keys = list(keys)
+        failed = []
+        for start in range(0, len(keys), MAX_DELETE_BATCH_SIZE):
+            failed.extend(self._delete_batch(keys[start:start + MAX_DELETE_BATCH_SIZE]))
+        return failed
+
+    def _delete_batch(self, keys: List[str]) -> List[Tuple[str, str]]:
+        errors: Dict[str, str] = {}
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_before_retry(attempt)
+            try:
+                response = self.s3_client.delete_objects(Bucket=self.bucket, Delete={
+                    'Objects': [{'Key': f'{self.prefix}{key}'} for key in keys],
+                    'Quiet': True})
+            except (BotoCoreError, ClientError) as client_error:
+                errors = {key: str(client_error) for key in keys}
+                continue
+
+            errors = {error['Key'][len(self.prefix):]:
+                      error.get('Message', error.get('Code', ''))
+                      for error in response.get('Errors', [])}
+            keys = [key for key in keys if key in errors]
+            if not keys:
+                break
+
+        return list(errors.items())
+
+    def uri(self, key: str) -> str:
+        return f's3://{self.bucket}/{self.prefix}{key}'
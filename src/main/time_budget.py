@@ -0,0 +1,64 @@
+"""
+This module provides the time budget of a run of the URL getters.
+
+A Lambda invocation is stopped at its timeout, losing the results not yet saved. With a
+time budget, the getter stops taking new files while there is still time to flush the
+storage operations and save the partial results. A new file is only started when the
+time left exceeds the longest processing time of a file seen so far.
+"""
+import time
+from typing import Callable, Optional
+
+
+class TimeBudget:
+    """
+    Tracks the time left before a deadline and the processing time of the files.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Start the budget.
+
+        :param seconds: Seconds available to process files, the time needed to save
+            the results being already deducted.
+        :param clock: Clock returning seconds, time.monotonic by default.
+        """
+        self.clock = clock
+        self.deadline = clock() + seconds
+        self.longest_item = 0.0
+        self._item_start = None
+
+    @property
+    def time_left(self) -> float:
+        """
+        Seconds left before the deadline.
+        """
+        return self.deadline - self.clock()
+
+    def has_time_for_item(self) -> bool:
+        """
+        Check whether a new file can be processed before the deadline.
+        """
+        return self.time_left > self.longest_item
+
+    def start_item(self) -> float:
+        """
+        Record the start of the processing of a file.
+
+        :return: The start time, given back to finish_item when files are processed
+            concurrently.
+        """
+        self._item_start = self.clock()
+        return self._item_start
+
+    def finish_item(self, start: Optional[float] = None) -> None:
+        """
+        Record the end of the processing of a file.
+
+        :param start: Start time returned by start_item. Defaults to the start of the
+            last file started.
+        """
+        if start is None:
+            start, self._item_start = self._item_start, None
+        if start is not None:
+            self.longest_item = max(self.longest_item, self.clock() - start)
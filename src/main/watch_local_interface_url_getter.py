@@ -0,0 +1,132 @@
+"""
+Module to keep the Interface Diagram URL Excel file up to date while files are dropped.
+
+This module contains a variant of the LocalInterfaceURLGetter that runs as a daemon:
+the source directory is watched (see directory_events), the bursts of events are
+debounced, the diagrams of the files changed in a burst are rendered on a worker pool
+and the new records are merged into the Excel file, replacing the records of the same
+files. The files already in the directory when the watch starts are processed first.
+"""
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from src.main.directory_events import open_directory_events
+from src.main.interface_url_getter import (
+    PROCESSING_ERRORS, SOURCE_EXTENSIONS, render_diagram_url)
+from src.main.local_interface_url_getter import LocalInterfaceURLGetter
+from src.main.storage import ObjectNotFoundError
+
+from src.main.logging_utils import debug_logging
+
+
+class WatchLocalInterfaceURLGetter(LocalInterfaceURLGetter):
+    """
+    Class to update the Interface Diagram URL Excel file each time JSON or CSV files
+    are written to the source directory.
+    """
+
+    @debug_logging
+    def __init__(self, source_dir: str, excel_file: str, debounce: float = 1.0,
+                 render_executor: Optional[Executor] = None, **options):
+        """
+        Initializes the getter. The keyword arguments are the GetterOptions.
+
+        :param debounce: Seconds without event on a file before it is processed, so a
+            file being written or a burst of files is processed once.
+        :param render_executor: Executor used to render the diagrams. Defaults to a
+            ProcessPoolExecutor created for the duration of the watch.
+        """
+        super().__init__(source_dir, excel_file, **options)
+
+        self.debounce = debounce
+        self.render_executor = render_executor
+
+    @debug_logging
+    def watch(self, stop_event: Optional[threading.Event] = None,
+              poll_interval: float = 1.0, use_inotify: bool = True):
+        """
+        Watch the source directory until stop_event is set.
+
+        :param stop_event: Event ending the watch, checked at least every poll_interval
+            seconds. When None, the watch runs until interrupted.
+        :param poll_interval: Seconds between two scans when the directory is polled.
+        :param use_inotify: Whether inotify is used where available, instead of polling.
+        """
+        stop_event = stop_event or threading.Event()
+        events = open_directory_events(
+            self.file_info['source_dir'], poll_interval, use_inotify)
+        executor = self.render_executor or ProcessPoolExecutor()
+
+        try:
+            # Last event time of the files waiting for the end of their burst
+            pending: Dict[str, float] = dict.fromkeys(
+                (info.key for info in self.source.list()), float('-inf'))
+
+            while not stop_event.is_set():
+                now = time.monotonic()
+                ready = [key for key, last_event in pending.items()
+                         if now - last_event >= self.debounce]
+                if ready:
+                    for key in ready:
+                        del pending[key]
+                    self.process_batch(ready, executor)
+                    continue
+
+                timeout = poll_interval
+                if pending:
+                    timeout = min(timeout, self.debounce - (now - max(pending.values())))
+                for key in events.wait(max(timeout, 0.0)):
+                    pending[key] = time.monotonic()
+        finally:
+            events.close()
+            self.finish_run()
+            if executor is not self.render_executor:
+                executor.shutdown()
+
+    @debug_logging
+    def process_batch(self, keys: Iterable[str], executor: Executor) -> int:
+        """
+        Processes the given files, rendering the diagrams of the JSON files on the
+        executor, and merges their records into the Excel file. An invalid file is
+        moved to the error directory and does not stop the batch.
+
+        :return: Number of records added to the Excel file.
+        """
+        renders = {}
+
+        for key in sorted(keys):
+            if '/' in key or not key.endswith(SOURCE_EXTENSIONS):
+                continue
+            try:
+                if key.endswith('.json') and not self.options.stream_records:
+                    if self._begin_file(key):
+                        data = self._load_new_records(key, self.source.get(key),
+                                                      self._read_backup(key))
+                        if data is not None:
+                            renders[key] = data, executor.submit(render_diagram_url, data)
+                else:
+                    self._process_file(key)
+            except ObjectNotFoundError:
+                # Written then moved or deleted during the debounce
+                continue
+            except PROCESSING_ERRORS as error:
+                self._move_to_error(key, error)
+
+        for key, (data, future) in renders.items():
+            try:
+                app_name = self.get_connected_app_name(data)
+                url = future.result()
+            except PROCESSING_ERRORS as error:
+                self._move_to_error(key, error)
+                continue
+            self._record_result(key, app_name, data, url)
+
+        self.flush_operations()
+
+        record_count = len(self.results)
+        if record_count:
+            self.save_results(merge=True)
+            self.results.clear()
+        return record_count
@@ -0,0 +1,167 @@
+"""Unit tests for the AsyncS3InterfaceURLGetter class, run against a LocalS3Client."""
+import json
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.main.async_s3_interface_url_getter import AsyncS3InterfaceURLGetter
+from src.main.local_s3_client import LocalS3Client
+from src.main.profiling import profile_invocation
+from src.main.s3_interface_url_getter import S3InterfaceURLGetter
+
+BUCKET = 'interface-diagram-files'
+SOURCE_DIR = f's3://{BUCKET}/in/'
+EXCEL_FILE = f's3://{BUCKET}/out/interfaces_diagrams_urls.xlsx'
+
+
+class TestAsyncS3InterfaceURLGetter(unittest.TestCase):
+    """Test cases for the AsyncS3InterfaceURLGetter class."""
+
+    def setUp(self):
+        """Create a local S3 stand-in with a few JSON files in the source directory."""
+        self.root_dir = tempfile.mkdtemp()
+        self.s3_client = LocalS3Client(self.root_dir)
+
+        with open('src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as file:
+            self.body = file.read()
+
+        for index in range(5):
+            self.s3_client.put_object(
+                Bucket=BUCKET, Key=f'in/file_{index}.json', Body=self.body)
+
+        # An identical backup means the source file is discarded without processing
+        self.s3_client.put_object(
+            Bucket=BUCKET, Key='in/backup/file_0.json', Body=self.body)
+
+    def tearDown(self):
+        """Remove the local S3 stand-in."""
+        shutil.rmtree(self.root_dir)
+
+    def _keys(self, prefix):
+        response = self.s3_client.list_objects(Bucket=BUCKET, Prefix=prefix)
+        return [content['Key'] for content in response.get('Contents', [])]
+
+    def test_process_json_files(self):
+        """Test that every changed file is rendered and moved to the backup directory."""
+        getter = AsyncS3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client, max_concurrency=2)
+        getter.process_json_files()
+        getter.save_results()
+
+        data_frame = getter.data_frame
+        self.assertEqual(sorted(data_frame['file_name']),
+                         [f'file_{index}.json' for index in range(1, 5)])
+        self.assertTrue(all(url.startswith('https://viewer.diagrams.net/')
+                            for url in data_frame['url']))
+
+        self.assertEqual(self._keys('in/backup/'),
+                         [f'in/backup/file_{index}.json' for index in range(5)])
+        self.assertEqual([key for key in self._keys('in/') if '/backup/' not in key], [])
+        self.assertEqual(self._keys('out/'), ['out/interfaces_diagrams_urls.xlsx'])
+
+    def test_matches_sync_getter(self):
+        """Test that the async getter produces the same rows as the sync getter."""
+        sync_root = tempfile.mkdtemp()
+        try:
+            shutil.copytree(self.root_dir, sync_root, dirs_exist_ok=True)
+            sync_getter = S3InterfaceURLGetter(
+                SOURCE_DIR, EXCEL_FILE, s3_client=LocalS3Client(sync_root))
+            sync_getter.process_json_files()
+        finally:
+            shutil.rmtree(sync_root)
+
+        async_getter = AsyncS3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client)
+        async_getter.process_json_files()
+
+        sync_rows = sync_getter.data_frame.sort_values('file_name').to_dict('records')
+        async_rows = async_getter.data_frame.sort_values('file_name').to_dict('records')
+        self.assertEqual(sync_rows, async_rows)
+
+    def test_process_json_files_no_json(self):
+        """Test that a blank record is produced when no JSON file is found."""
+        for index in range(5):
+            self.s3_client.delete_object(Bucket=BUCKET, Key=f'in/file_{index}.json')
+
+        getter = AsyncS3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client)
+        getter.process_json_files()
+
+        self.assertEqual(len(getter.data_frame), 1)
+        self.assertTrue(getter.data_frame.isna().all().all())
+
+    def test_invalid_file_is_moved_to_error(self):
+        """Test that a file with missing keys is moved to the error directory."""
+        self.s3_client.put_object(
+            Bucket=BUCKET, Key='in/invalid.json',
+            Body=json.dumps([{'code_id': '1', 'direction': 'Inbound'}]))
+
+        getter = AsyncS3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client)
+        getter.process_json_files()
+
+        self.assertEqual(self._keys('in/error/'), ['in/error/invalid.json'])
+        self.assertNotIn('invalid.json', list(getter.data_frame['file_name']))
+
+    def test_process_csv_file_and_render_executor(self):
+        """Test that the CSV exports are processed as in the sync getter, and the
+        diagrams of the JSON files rendered on the render executor."""
+        with open('src/tests/test_data/interfaces.csv', 'rb') as file:
+            self.s3_client.put_object(Bucket=BUCKET, Key='in/export.csv', Body=file.read())
+
+        with ThreadPoolExecutor(max_workers=2) as render_executor:
+            getter = AsyncS3InterfaceURLGetter(
+                SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client,
+                render_executor=render_executor)
+            getter.process_json_files()
+
+        self.assertEqual(sorted(getter.data_frame['file_name']),
+                         ['export.csv#3PL'] + [f'file_{index}.json' for index in range(1, 5)])
+        self.assertIn('in/backup/export.csv', self._keys('in/backup/'))
+
+    def test_process_streamed_files(self):
+        """Test that the files are parsed while they are read with stream_records."""
+        getter = AsyncS3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client, stream_records=True)
+        getter.process_json_files()
+
+        self.assertEqual(sorted(getter.data_frame['file_name']),
+                         [f'file_{index}.json' for index in range(1, 5)])
+        self.assertEqual(len(self._keys('in/backup/')), 5)
+
+    def test_time_budget(self):
+        """Test that the files are counted as remaining once the budget is exhausted,
+        and that the processing time of the files is tracked."""
+        getter = AsyncS3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client, max_concurrency=2)
+        getter.set_time_budget(0)
+        getter.process_json_files()
+
+        self.assertEqual((getter.remaining, len(getter.results)), (5, 0))
+        self.assertEqual(len(self._keys('in/backup/')), 1)
+
+        getter = AsyncS3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client, max_concurrency=2)
+        getter.set_time_budget(3600)
+        getter.process_json_files()
+
+        self.assertEqual((getter.remaining, len(getter.results)), (0, 4))
+        self.assertGreater(getter.time_budget.longest_item, 0)
+
+    def test_files_are_profiled(self):
+        """Test that the files processed on the thread pool are part of the profiling
+        session of the caller."""
+        profile_dir = tempfile.mkdtemp()
+        try:
+            getter = AsyncS3InterfaceURLGetter(
+                SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client, max_concurrency=2)
+            with profile_invocation(True, profile_dir) as session:
+                getter.process_json_files()
+        finally:
+            shutil.rmtree(profile_dir)
+
+        self.assertEqual(len([key for key in session.written if '_process_file' in key]), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Unit tests for the BatchOperations class."""
+import shutil
+import tempfile
+import unittest
+
+from botocore.exceptions import ClientError
+
+from src.main.batch_operations import BatchOperations
+from src.main.local_s3_client import LocalS3Client
+from src.main.storage import InMemoryStorage, S3Storage
+
+BUCKET = 'interface-diagram-files'
+
+
+class FlakyS3Client(LocalS3Client):
+    """LocalS3Client failing the first copy and the first deletion of some keys."""
+
+    def __init__(self, root_dir, failing_keys):
+        super().__init__(root_dir)
+        self.failing_keys = set(failing_keys)
+        self.delete_calls = []
+        self.copy_failures = set()
+
+    def copy_object(self, Bucket, CopySource, Key, **kwargs):  # pylint: disable=invalid-name
+        if CopySource['Key'] in self.failing_keys and CopySource['Key'] not in self.copy_failures:
+            self.copy_failures.add(CopySource['Key'])
+            raise ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Slow down'}},
+                              'CopyObject')
+        return super().copy_object(Bucket=Bucket, CopySource=CopySource, Key=Key, **kwargs)
+
+    def delete_objects(self, Bucket, Delete, **kwargs):  # pylint: disable=invalid-name
+        keys = [obj['Key'] for obj in Delete['Objects']]
+        self.delete_calls.append(keys)
+
+        failing = [key for key in keys if key in self.failing_keys]
+        self.failing_keys.difference_update(failing)
+
+        super().delete_objects(Bucket=Bucket, Delete={
+            'Objects': [{'Key': key} for key in keys if key not in failing], 'Quiet': True})
+        return {'Errors': [{'Key': key, 'Code': 'InternalError', 'Message': 'Internal error'}
+                           for key in failing]}
+
+
+class TestBatchOperations(unittest.TestCase):
+    """Test cases for the BatchOperations class."""
+
+    def setUp(self):
+        """Create a local S3 stand-in."""
+        self.root_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the local S3 stand-in."""
+        shutil.rmtree(self.root_dir)
+
+    def _storage(self, failing_keys, **kwargs):
+        s3_client = FlakyS3Client(self.root_dir, failing_keys)
+        return s3_client, S3Storage(s3_client, BUCKET, 'in/', retry_delay=0, **kwargs)
+
+    def test_deletes_are_sent_in_batches(self):
+        """Test that the deletions are grouped in batches of up to 1,000 keys."""
+        s3_client, storage = self._storage([])
+        operations = BatchOperations(storage)
+        for index in range(2500):
+            operations.queue_delete(f'file_{index}.json')
+
+        report = operations.flush()
+
+        self.assertEqual([len(keys) for keys in s3_client.delete_calls], [1000, 1000, 500])
+        self.assertEqual(len(report['deleted']), 2500)
+        self.assertEqual(report['failed'], [])
+        self.assertEqual(operations.pending, 0)
+
+    def test_moves_with_partial_failures_are_retried(self):
+        """Test that failed copies and deletions are retried."""
+        s3_client, storage = self._storage(['in/file_1.json', 'in/file_3.json'])
+        operations = BatchOperations(storage, max_workers=4)
+        for index in range(5):
+            storage.put(f'file_{index}.json', b'[]')
+            operations.queue_move(f'file_{index}.json', f'backup/file_{index}.json')
+
+        report = operations.flush()
+
+        self.assertEqual(report['failed'], [])
+        self.assertEqual(len(report['copied']), 5)
+        self.assertEqual(len(s3_client.delete_calls), 2)
+        self.assertEqual([info.key for info in storage.list('backup/')],
+                         [f'backup/file_{index}.json' for index in range(5)])
+        self.assertEqual(list(storage.list()), [])
+
+    def test_source_is_kept_when_copy_fails(self):
+        """Test that the source of a move is not deleted when the copy keeps failing."""
+        _, storage = self._storage(['in/file_0.json'], max_retries=0)
+        operations = BatchOperations(storage)
+        storage.put('file_0.json', b'[]')
+        operations.queue_move('file_0.json', 'backup/file_0.json')
+
+        report = operations.flush()
+
+        self.assertEqual([key for key, _ in report['failed']], ['file_0.json'])
+        self.assertEqual([info.key for info in storage.list()], ['file_0.json'])
+
+    def test_moves_without_batch_deletes(self):
+        """Test that moves on storages without batch deletion are plain moves."""
+        storage = InMemoryStorage()
+        operations = BatchOperations(storage)
+        storage.put('file_0.json', b'[]')
+        storage.put('file_1.json', b'[]')
+        operations.queue_move('file_0.json', 'backup/file_0.json')
+        operations.queue_move('missing.json', 'backup/missing.json')
+        operations.queue_delete('file_1.json')
+
+        report = operations.flush()
+
+        self.assertEqual(report['copied'], ['file_0.json'])
+        self.assertEqual(sorted(report['deleted']), ['file_0.json', 'file_1.json'])
+        self.assertEqual([key for key, _ in report['failed']], ['missing.json'])
+        self.assertTrue(storage.exists('backup/file_0.json'))
+        self.assertEqual(list(storage.list()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
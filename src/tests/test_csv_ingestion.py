@@ -0,0 +1,90 @@
+"""Unit tests for the csv_ingestion module."""
+import csv
+import io
+import json
+import unittest
+
+from src.main.csv_ingestion import CSVPartitioner, iter_csv_partitions
+
+CSV_FILE = './src/tests/test_data/interfaces.csv'
+JSON_FILE = './src/tests/test_data/interfaces.json'
+
+
+def to_csv(records):
+    """Serialize records to a CSV text stream."""
+    csv_stream = io.StringIO(newline='')
+    writer = csv.DictWriter(csv_stream, fieldnames=list(records[0]))
+    writer.writeheader()
+    writer.writerows(records)
+    csv_stream.seek(0)
+    return csv_stream
+
+
+class TestCSVIngestion(unittest.TestCase):
+    """Test cases for the CSV partitioning."""
+
+    def setUp(self):
+        """Load the JSON sample records."""
+        with open(JSON_FILE, 'r', encoding='utf-8') as json_file:
+            self.records = json.load(json_file)
+
+    def test_partition_by_connected_app(self):
+        """Test that the sample CSV export holds a single connected app."""
+        with open(CSV_FILE, 'r', encoding='utf-8-sig', newline='') as csv_file:
+            partitions = list(iter_csv_partitions(csv_file))
+
+        self.assertEqual([name for name, _ in partitions], ['3PL'])
+        self.assertEqual(len(partitions[0][1]), 43)
+
+    def test_records_match_json(self):
+        """Test that the records of a CSV export equal the JSON records."""
+        partitions = dict(iter_csv_partitions(to_csv(self.records)))
+
+        self.assertEqual(sum(len(records) for records in partitions.values()),
+                         len(self.records))
+        self.assertEqual([record for records in partitions.values() for record in records
+                          if record['code_id'] == self.records[0]['code_id']],
+                         [record for record in self.records
+                          if record['code_id'] == self.records[0]['code_id']])
+
+    def test_custom_partition_key(self):
+        """Test partitioning by the value of a column."""
+        partitions = dict(iter_csv_partitions(to_csv(self.records), 'direction'))
+
+        self.assertEqual(set(partitions), {'Inbound', 'Outbound'})
+        for direction, records in partitions.items():
+            first_rows = [record for index, record in enumerate(records)
+                          if index == 0 or record['code_id'] != records[index - 1]['code_id']]
+            self.assertTrue(all(row['direction'] == direction for row in first_rows))
+
+    def test_spill_preserves_order(self):
+        """Test that spilled partitions are read back in their original order."""
+        expected = dict(iter_csv_partitions(to_csv(self.records)))
+
+        with CSVPartitioner(max_buffered_rows=10) as partitioner:
+            partitioner.add_rows(csv.DictReader(to_csv(self.records)))
+            self.assertTrue(partitioner.spilled)
+            self.assertEqual(dict(partitioner.partitions()), expected)
+        self.assertFalse(partitioner.spilled)
+
+    def test_missing_column(self):
+        """Test that an export without a column of the records is rejected."""
+        records = [{key: value for key, value in record.items() if key != 'code_id'}
+                   for record in self.records]
+
+        with self.assertRaisesRegex(ValueError, 'code_id'):
+            list(iter_csv_partitions(to_csv(records)))
+
+    def test_row_with_missing_fields(self):
+        """Test that a row with fewer fields than the header is rejected."""
+        csv_stream = to_csv(self.records)
+        csv_stream.seek(0, io.SEEK_END)
+        csv_stream.write('IF_1,Inbound\r\n')
+        csv_stream.seek(0)
+
+        with self.assertRaisesRegex(ValueError, 'Line'):
+            list(iter_csv_partitions(csv_stream))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Unit tests for the diagram_oracle module."""
+import json
+import random
+import unittest
+import xml.etree.ElementTree as ET
+
+from src.main.diagram_oracle import (REFERENCE_PATH, RENDER_PATHS, cell_signatures,
+                                     compare_outputs, decode_graph_model, random_records,
+                                     run_differential)
+
+
+class TestDiagramOracle(unittest.TestCase):
+    """Test cases for the differential oracle of the render paths."""
+
+    def setUp(self):
+        """Load the sample records."""
+        with open('src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as file:
+            self.records = json.load(file)
+
+    def test_decode_outputs(self):
+        """Test that the URL, XML and compressed outputs decode to the same cells."""
+        signatures = [cell_signatures(decode_graph_model(RENDER_PATHS[path](self.records)))
+                      for path in (REFERENCE_PATH, 'xml', 'compressed')]
+
+        self.assertGreater(sum(signatures[0].values()), 0)
+        self.assertEqual(signatures[1], signatures[0])
+        self.assertEqual(signatures[2], signatures[0])
+
+    def test_sample_paths_equivalent(self):
+        """Test the alternative paths on the sample records."""
+        self.assertEqual(list(run_differential(iter([self.records]), list(RENDER_PATHS))), [])
+
+    def test_random_paths_equivalent(self):
+        """Test the alternative paths on random records."""
+        rng = random.Random(49)
+        cases = [random_records(rng) for _ in range(25)]
+
+        self.assertEqual(list(run_differential(iter(cases), list(RENDER_PATHS))), [])
+
+    def test_detects_differences(self):
+        """Test that a moved vertex and a rewired edge are reported."""
+        records = random_records(random.Random(3))
+        reference = RENDER_PATHS[REFERENCE_PATH](records)
+        xml = RENDER_PATHS['xml'](records)
+
+        mxfile = ET.fromstring(xml)
+        vertex = next(cell for cell in mxfile.iter('mxCell') if cell.get('vertex') == '1')
+        vertex.find('mxGeometry').set('x', '9999')
+        differences = compare_outputs(reference, ET.tostring(mxfile).decode('utf-8'))
+        self.assertEqual(len(differences), 2)
+        self.assertTrue(differences[0].startswith('missing 1 x vertex'))
+
+        mxfile = ET.fromstring(xml)
+        edge = next(cell for cell in mxfile.iter('mxCell') if cell.get('edge') == '1')
+        edge.set('source', vertex.get('id'))
+        self.assertTrue(compare_outputs(reference, ET.tostring(mxfile).decode('utf-8')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Unit tests for the diagram_rendering module."""
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.main.diagram_rendering import (FORMAT_URL, FORMAT_XML, BatchRenderer, URLCache,
+                                        render_diagram, render_diagram_url)
+
+
+class TestDiagramRendering(unittest.TestCase):
+    """Test cases for the URL cache and the batch renderer."""
+
+    def setUp(self):
+        """Load the sample records."""
+        with open('src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as file:
+            self.records = json.load(file)
+
+    def test_url_cache_evicts_least_recently_used(self):
+        """Test the LRU eviction and the hit and miss counts."""
+        cache = URLCache(max_entries=2)
+        cache.put('a', 'url-a')
+        cache.put('b', 'url-b')
+        self.assertEqual(cache.get('a'), 'url-a')
+        cache.put('c', 'url-c')
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), ('url-a', 'url-c'))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (3, 1, 2))
+
+    def test_cache_key_ignores_key_order(self):
+        """Test that records equal as JSON objects have the same key."""
+        reordered = [dict(reversed(list(item.items()))) for item in self.records]
+        self.assertEqual(URLCache.key(self.records), URLCache.key(reordered))
+
+    def test_render_batch(self):
+        """Test that each diagram gets its URL or its error."""
+        diagrams = {
+            'first': self.records,
+            'second': self.records[:10],
+            'missing_field': [{'code_id': 'x'}],
+            'not_a_list': {'code_id': 'x'}
+        }
+        for executor in (None, ThreadPoolExecutor(max_workers=2)):
+            with self.subTest(executor=executor):
+                results = BatchRenderer(executor).render_batch(diagrams)
+
+                self.assertEqual(list(results), list(diagrams))
+                self.assertEqual(results['first'], {'url': render_diagram_url(self.records)})
+                self.assertIn('url', results['second'])
+                self.assertTrue(results['missing_field']['error'].startswith('TypeError'))
+                self.assertIn('error', results['not_a_list'])
+
+    def test_render_batch_uses_cache(self):
+        """Test that identical diagrams are rendered once."""
+        cache = URLCache()
+        renderer = BatchRenderer(cache=cache)
+
+        results = renderer.render_batch({'a': self.records, 'b': self.records})
+        self.assertEqual(results['a'], results['b'])
+        self.assertEqual(len(cache), 1)
+
+        self.assertEqual(renderer.render(self.records), results['a']['url'])
+        self.assertEqual(cache.hits, 1)
+
+    def test_render_formats(self):
+        """Test that the formats are rendered and cached under distinct keys."""
+        renderer = BatchRenderer(cache=URLCache())
+
+        xml = renderer.render(self.records, FORMAT_XML)
+        url = renderer.render(self.records, FORMAT_URL)
+
+        self.assertTrue(xml.startswith('<mxfile'))
+        self.assertEqual(url, render_diagram_url(self.records))
+        self.assertEqual(len(renderer.cache), 2)
+        self.assertEqual(renderer.render_batch({'a': self.records}, FORMAT_XML),
+                         {'a': {FORMAT_XML: xml}})
+        with self.assertRaises(ValueError):
+            render_diagram(self.records, 'png')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""Unit tests for the diagram_server module."""
+import gzip
+import http.client
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.main.diagram_server import DiagramServer
+from src.main.lambda_api_function import lambda_handler
+
+
+class TestDiagramServer(unittest.TestCase):
+    """Test cases for the local HTTP server of the diagram API."""
+
+    def setUp(self):
+        """Start a server on a free port, rendering on a thread pool."""
+        with open('src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as file:
+            self.body = file.read()
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        self.server = DiagramServer(('127.0.0.1', 0), executor, max_body_size=1024 * 1024)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.connection = http.client.HTTPConnection(*self.server.server_address[:2])
+        self.addCleanup(self.connection.close)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request on the kept-alive connection and read its response."""
+        self.connection.request(method, path, body, headers or {})
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def test_same_contract_as_lambda(self):
+        """Test that the server answers as the Lambda handler, on one connection."""
+        expected = lambda_handler({'body': self.body}, None)['body']
+
+        response, body = self.request('POST', '/', self.body)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body.decode(), expected)
+
+        batch = json.dumps({'diagrams': {'a': json.loads(self.body)}})
+        response, body = self.request('POST', '/?format=xml', batch,
+                                      {'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.getheader('Content-Encoding'), 'gzip')
+        self.assertTrue(json.loads(gzip.decompress(body))['results']['a']['xml']
+                        .startswith('<mxfile'))
+
+        response, body = self.request('POST', '/', gzip.compress(self.body.encode()),
+                                      {'Content-Encoding': 'gzip'})
+        self.assertEqual(body.decode(), expected)
+
+    def test_limits(self):
+        """Test the rejected methods, oversized bodies and invalid records."""
+        response, _ = self.request('GET', '/')
+        self.assertEqual(response.status, 405)
+
+        response, _ = self.request('POST', '/', json.dumps([{'code_id': 'missing'}]))
+        self.assertEqual(response.status, 500)
+
+        # The oversized body is rejected from its headers, before being sent
+        self.connection.putrequest('POST', '/')
+        self.connection.putheader('Content-Length', str(1024 * 1024 + 1))
+        self.connection.endheaders()
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 413)
+        self.assertTrue(response.will_close)
+
+
+if __name__ == '__main__':
+    unittest.main()
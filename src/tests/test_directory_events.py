@@ -0,0 +1,64 @@
+"""Unit tests for the directory_events module."""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from src.main.directory_events import InotifyEvents, PollingEvents, open_directory_events
+
+
+class TestDirectoryEvents(unittest.TestCase):
+    """Test cases for the directory event sources."""
+
+    def setUp(self):
+        """Create the watched directory."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the watched directory."""
+        shutil.rmtree(self.directory)
+
+    def write(self, name, content):
+        """Write a file of the watched directory."""
+        with open(os.path.join(self.directory, name), 'w', encoding='utf-8') as file:
+            file.write(content)
+
+    def test_polling_events(self):
+        """Test that polling reports the new and modified files only."""
+        self.write('existing.json', '[]')
+        events = PollingEvents(self.directory, poll_interval=0.01)
+
+        self.assertEqual(events.wait(), set())
+        self.write('new.json', '[]')
+        self.write('existing.json', '[1]')
+        self.assertEqual(events.wait(), {'new.json', 'existing.json'})
+        self.assertEqual(events.wait(0), set())
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), 'inotify is Linux only')
+    def test_inotify_events(self):
+        """Test that inotify reports the written and moved files."""
+        events = open_directory_events(self.directory)
+        self.assertIsInstance(events, InotifyEvents)
+        try:
+            self.assertEqual(events.wait(0), set())
+
+            self.write('new.json', '[]')
+            other_directory = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, other_directory)
+            with open(os.path.join(other_directory, 'moved.json'), 'w', encoding='utf-8'):
+                pass
+            shutil.move(os.path.join(other_directory, 'moved.json'), self.directory)
+
+            self.assertEqual(events.wait(1), {'new.json', 'moved.json'})
+        finally:
+            events.close()
+
+    def test_polling_fallback(self):
+        """Test that polling is used when inotify is not requested."""
+        events = open_directory_events(self.directory, use_inotify=False)
+        self.assertIsInstance(events, PollingEvents)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -81,6 +81,43 @@ class TestEncodingHelper(unittest.TestCase):
         # Assert that the actual output is equal to the expected output
         self.assertEqual(actual_output, expected_output)
 
+    def test_decode_diagram_data(self):
+        """
+        Test that decode_diagram_data reverses encode_diagram_data
+        """
+        data = '<mxfile><diagram name="Page-1">Ação &amp; (test) ~100%</diagram></mxfile>'
+
+        helper = EncodingHelper()
+
+        self.assertEqual(helper.decode_diagram_data(helper.encode_diagram_data(data)), data)
+
+    def test_parallel_deflate_raw(self):
+        """
+        Test that the parallel chunks form a single raw deflate stream
+        """
+        data = b''.join(f'<mxCell id="{index}" value="App {index % 7}" />'.encode()
+                        for index in range(5000))
+
+        helper = EncodingHelper(parallel_threshold=1024, chunk_size=4096, max_workers=4)
+        compressed_data = helper.pako_deflate_raw(data)
+
+        self.assertEqual(zlib.decompress(compressed_data, -15), data)
+        self.assertEqual(helper.pako_inflate_raw(compressed_data), data)
+        self.assertEqual(zlib.decompress(helper.parallel_deflate_raw(b''), -15), b'')
+
+    def test_parallel_deflate_threshold(self):
+        """
+        Test that data below the threshold is compressed as a single stream
+        """
+        data = b'Hello, World!' * 10
+
+        helper = EncodingHelper(parallel_threshold=1024, chunk_size=16, max_workers=4)
+
+        self.assertEqual(helper.pako_deflate_raw(data),
+                         EncodingHelper(parallel_threshold=None).pako_deflate_raw(data))
+        self.assertEqual(helper.decode_diagram_data(helper.encode_diagram_data(
+            'x' * 2048)), 'x' * 2048)
+
 
 # Run the tests
 if __name__ == '__main__':
@@ -0,0 +1,62 @@
+"""Unit tests for the http_encoding module."""
+import gzip
+import unittest
+import zlib
+
+from src.main.http_encoding import (BodyTooLargeError, UnsupportedEncodingError,
+                                    choose_encoding, decode_body, encode_body, get_header)
+
+
+class TestHttpEncoding(unittest.TestCase):
+    """Test cases for the request and response encodings."""
+
+    body = b'[{"code_id": "IFS_001"}]' * 100
+
+    def test_decode_body(self):
+        """Test decoding each supported request encoding."""
+        raw_deflate = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        encoded = {
+            '': self.body,
+            'identity': self.body,
+            'gzip': gzip.compress(self.body),
+            'GZIP': gzip.compress(self.body),
+            'deflate': zlib.compress(self.body),
+            ' deflate': raw_deflate.compress(self.body) + raw_deflate.flush()
+        }
+        for encoding, body in encoded.items():
+            with self.subTest(encoding=encoding):
+                self.assertEqual(decode_body(body, encoding), self.body)
+
+    def test_decode_body_errors(self):
+        """Test the unsupported, oversized and corrupted bodies."""
+        with self.assertRaises(UnsupportedEncodingError):
+            decode_body(self.body, 'br')
+        with self.assertRaises(BodyTooLargeError):
+            decode_body(gzip.compress(self.body), 'gzip', max_size=100)
+        with self.assertRaises(zlib.error):
+            decode_body(gzip.compress(self.body)[:-20], 'gzip')
+
+    def test_choose_encoding(self):
+        """Test the negotiation of the response encoding."""
+        self.assertEqual(choose_encoding('gzip, deflate, br'), 'gzip')
+        self.assertEqual(choose_encoding('deflate;q=1.0, gzip;q=0.5'), 'deflate')
+        self.assertEqual(choose_encoding('gzip;q=0, *'), 'deflate')
+        self.assertIsNone(choose_encoding('br'))
+        self.assertIsNone(choose_encoding(''))
+
+    def test_encode_body_round_trip(self):
+        """Test that the encoded responses decode to the original body."""
+        for encoding in ('gzip', 'deflate'):
+            with self.subTest(encoding=encoding):
+                encoded = encode_body(self.body, encoding)
+                self.assertLess(len(encoded), len(self.body))
+                self.assertEqual(decode_body(encoded, encoding), self.body)
+
+    def test_get_header(self):
+        """Test that header names are matched case-insensitively."""
+        self.assertEqual(get_header({'content-encoding': 'gzip'}, 'Content-Encoding'), 'gzip')
+        self.assertEqual(get_header(None, 'Accept-Encoding'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,13 +5,19 @@ import xml.etree.ElementTree as ET
 import json
 
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from bs4 import BeautifulSoup
 
-from src.main.interface_diagram import InterfaceDiagram
+from src.main import config
+from src.main.encoding_helper import EncodingHelper
+from src.main.interface_diagram import (InterfaceDiagram, count_rows, estimate_cells,
+                                         split_pages)
 from src.main.json_parser import JSONParser
 
-from src.main.data_definitions import SourceStructure
+from src.main.data_definitions import PagingOptions, SourceStructure
+from src.main.diagram_oracle import compare_outputs
 
 
 class TestInterfaceDiagram(unittest.TestCase):
@@ -128,6 +134,171 @@ class TestInterfaceDiagram(unittest.TestCase):
         # Verify the title (replace 'Expected Title' with the expected title value)
         self.assertEqual(title, 'Flowchart Maker & Online Diagram Software')
 
+    def test_short_id_strategy(self):
+        """
+        Test that the short ids keep the diagram structure and map back to the name ids
+        """
+        name_diagram = InterfaceDiagram(self.interfaces)
+        name_diagram.build_xml_file()
+        short_diagram = InterfaceDiagram(self.interfaces, id_strategy='short')
+        short_diagram.build_xml_file()
+
+        name_cells = name_diagram.xml_content['root'].findall('mxCell')
+        short_cells = short_diagram.xml_content['root'].findall('mxCell')
+        self.assertEqual(len(name_cells), len(short_cells))
+
+        name_ids = {cell.get('id') for cell in name_cells}
+        short_ids = {cell.get('id') for cell in short_cells}
+        for name_cell, short_cell in zip(name_cells[2:], short_cells[2:]):
+            self.assertEqual(short_diagram.id_map[short_cell.get('id')], name_cell.get('id'))
+            for reference in ('source', 'target'):
+                if short_cell.get(reference) is not None:
+                    self.assertEqual(short_diagram.id_map[short_cell.get(reference)],
+                                     name_cell.get(reference))
+                    self.assertEqual(short_cell.get(reference) in short_ids,
+                                     name_cell.get(reference) in name_ids)
+
+        self.assertNotIn('0', short_diagram.id_map)
+        self.assertNotIn('1', short_diagram.id_map)
+        self.assertLess(len(ET.tostring(short_diagram.xml_content['mxfile'])),
+                        len(ET.tostring(name_diagram.xml_content['mxfile'])))
+
+    def test_compact_serialization(self):
+        """
+        Test that the compact URL decodes to the same diagram without the omitted attributes
+        """
+        def drawn(element):
+            """Return the attributes used to draw the element and its children"""
+            attributes = dict(element.attrib)
+            if element.tag == 'mxfile':
+                attributes = {key: value for key, value in attributes.items()
+                              if key in config.COMPACT_MXFILE_PARAMETERS}
+            for key in ('dx', 'dy', 'invert'):
+                attributes.pop(key, None)
+            if attributes.get('value') == '':
+                del attributes['value']
+            return (element.tag, attributes, [drawn(child) for child in element])
+
+        helper = EncodingHelper()
+        prefix = 'https://viewer.diagrams.net/?#R'
+
+        full_url = InterfaceDiagram(self.interfaces).generate_diagram_url()
+        compact_url = InterfaceDiagram(
+            self.interfaces, serialization='compact').generate_diagram_url()
+
+        full_xml = ET.fromstring(helper.decode_diagram_data(full_url[len(prefix):]))
+        compact_xml = ET.fromstring(helper.decode_diagram_data(compact_url[len(prefix):]))
+
+        self.assertEqual(drawn(compact_xml), drawn(full_xml))
+        self.assertNotIn('invert', helper.decode_diagram_data(compact_url[len(prefix):]))
+        self.assertLess(len(compact_url), len(full_url))
+
+    def test_generate_diagram_xml(self):
+        """
+        Test that the XML and compressed XML outputs hold the diagram of the URL
+        """
+        helper = EncodingHelper()
+        prefix = 'https://viewer.diagrams.net/?#R'
+
+        url = InterfaceDiagram(self.interfaces).generate_diagram_url()
+        xml = InterfaceDiagram(self.interfaces).generate_diagram_xml()
+        compressed = ET.fromstring(InterfaceDiagram(self.interfaces).generate_compressed_xml())
+
+        self.assertEqual(xml.decode('utf-8'), helper.decode_diagram_data(url[len(prefix):]))
+
+        diagram = compressed.find('diagram')
+        self.assertIsNone(diagram.find('mxGraphModel'))
+        self.assertEqual(helper.decode_diagram_data(diagram.text),
+                         ET.tostring(ET.fromstring(xml).find('diagram/mxGraphModel'))
+                         .decode('utf-8'))
+
+    def test_unknown_id_strategy(self):
+        """
+        Test that an unknown id strategy is rejected
+        """
+        with self.assertRaises(ValueError):
+            InterfaceDiagram(self.interfaces, id_strategy='uuid')
+        with self.assertRaises(ValueError):
+            InterfaceDiagram(self.interfaces, serialization='minified')
+
+    def test_single_page_by_default(self):
+        """
+        Test that the diagram has a single page when the rows fit in the budget
+        """
+        paging = PagingOptions(max_rows=1000)
+        mxfile = ET.fromstring(
+            InterfaceDiagram(self.interfaces, paging=paging).generate_diagram_xml())
+
+        self.assertEqual(len(mxfile.findall('diagram')), 1)
+        self.assertEqual(
+            InterfaceDiagram(self.interfaces, paging=paging).generate_compressed_xml(),
+            InterfaceDiagram(self.interfaces).generate_compressed_xml())
+
+    def test_split_pages_by_rows(self):
+        """
+        Test that the rows are split into pages of at most max_rows rows, holding the
+        shapes of the single page diagram
+        """
+        def shapes(model):
+            # The applications are drawn on each page of their rows
+            return sorted((cell.get('value') or '', cell.get('edge') or '')
+                          for cell in model.iter('mxCell')
+                          if cell.get('parent') not in (None, '0')
+                          and cell.get('id') not in self.diagram.app_order)
+
+        single = ET.fromstring(self.diagram.generate_diagram_xml())
+        paged = ET.fromstring(InterfaceDiagram(
+            self.interfaces, paging=PagingOptions(max_rows=3)).generate_diagram_xml())
+        diagrams = paged.findall('diagram')
+        rows = count_rows(self.interfaces)
+
+        self.assertEqual(len(diagrams), -(-rows // 3))
+        self.assertEqual(len({diagram.get('id') for diagram in diagrams}), len(diagrams))
+        self.assertEqual([diagram.get('name') for diagram in diagrams][:2],
+                         ['Page-1', 'Page-2'])
+        three_rows = config.APP_MIN_HEIGHT + 2 * (config.PROTOCOL_HEIGHT + config.Y_OFFSET)
+        for diagram in diagrams:
+            self.assertLessEqual(int(diagram.find('mxGraphModel').get('pageHeight')),
+                                 three_rows)
+
+        self.assertEqual(
+            sorted(shape for diagram in diagrams for shape in shapes(diagram)),
+            shapes(single))
+
+    def test_split_pages_by_cells(self):
+        """
+        Test that the pages hold at most max_cells estimated cells, unless a single row
+        exceeds it
+        """
+        pages = split_pages(self.interfaces, PagingOptions(max_cells=40))
+
+        self.assertGreater(len(pages), 1)
+        self.assertEqual([interface for page in pages for interface in page],
+                         self.interfaces)
+        for page in pages:
+            apps = {app.app_name for interface in page for app in interface.apps}
+            if count_rows(page) > 1:
+                self.assertLessEqual(estimate_cells(page) + len(apps), 40)
+
+    def test_build_pages_on_executor(self):
+        """
+        Test that the pages built on an executor match the pages built sequentially,
+        also in the compressed output
+        """
+        sequential = InterfaceDiagram(self.interfaces, paging=PagingOptions(max_rows=4))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = InterfaceDiagram(
+                self.interfaces, paging=PagingOptions(max_rows=4, executor=executor))
+            parallel_xml = parallel.generate_diagram_xml()
+
+        self.assertEqual(parallel_xml, sequential.generate_diagram_xml())
+
+        compressed = InterfaceDiagram(
+            self.interfaces, paging=PagingOptions(max_rows=4)).generate_compressed_xml()
+        self.assertEqual(len(ET.fromstring(compressed).findall('diagram/mxGraphModel')), 0)
+        self.assertEqual(compare_outputs(parallel_xml.decode('utf-8'),
+                                         compressed.decode('utf-8')), [])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+"""Unit tests for the incremental JSON array reader."""
+import hashlib
+import io
+import json
+import unittest
+
+from src.main.json_stream import RecordStream, iter_json_array
+
+
+class TestJsonStream(unittest.TestCase):
+    """Test cases for iter_json_array and RecordStream."""
+
+    def setUp(self):
+        """Load the sample interfaces."""
+        with open('src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as json_file:
+            self.content = json_file.read()
+        self.data = json.loads(self.content)
+
+    def test_items_across_chunks(self):
+        """Test that the items are decoded whatever the chunk boundaries."""
+        for chunk_size in (1, 7, 1024, 1024 * 1024):
+            stream = io.BytesIO(self.content.encode('utf-8'))
+            self.assertEqual(list(iter_json_array(stream, chunk_size)), self.data)
+
+    def test_scalar_items(self):
+        """Test arrays of scalars, including numbers cut by the chunk boundaries."""
+        content = '﻿ [ 1.5e3, -12, "é", null, true, {"a": [1, 2]} ] '
+        for chunk_size in (1, 2, 5, 100):
+            stream = io.BytesIO(content.encode('utf-8'))
+            self.assertEqual(list(iter_json_array(stream, chunk_size)),
+                             [1.5e3, -12, 'é', None, True, {'a': [1, 2]}])
+        self.assertEqual(list(iter_json_array(io.BytesIO(b' [ ] '))), [])
+
+    def test_invalid_content(self):
+        """Test that invalid arrays raise ValueError."""
+        for content in (b'', b'{}', b'[1,', b'[1 2]', b'[1,]', b'[1x]'):
+            with self.assertRaises(ValueError):
+                list(iter_json_array(io.BytesIO(content), 2))
+
+    def test_record_stream(self):
+        """Test that the record stream extracts the app name, body and body hash."""
+        records = RecordStream(io.BytesIO(self.content.encode('utf-8')), keep_body=True,
+                               chunk_size=100)
+
+        with self.assertRaises(ValueError):
+            _ = records.body_hash
+
+        self.assertEqual(len(list(records)), len(self.data))
+        self.assertEqual(records.connected_app, 'Athena')
+        self.assertEqual(records.body, json.dumps(self.data))
+        self.assertEqual(records.body_hash,
+                         hashlib.sha256(json.dumps(self.data).encode('utf-8')).hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
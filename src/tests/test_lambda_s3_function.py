@@ -1,8 +1,19 @@
 """Unit tests for the lambda_handler function."""
-import unittest
+import io
 import json
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
 
-from src.main.lambda_s3_function import lambda_handler
+from src.main import s3_interface_url_getter
+from src.main.lambda_s3_function import (BUCKET, SAVE_MARGIN_SECONDS, get_event_keys,
+                                         get_shard_deadline, get_time_budget,
+                                         lambda_handler)
+from src.main.local_s3_client import LocalS3Client
 
 
 class TestLambdaHandler(unittest.TestCase):
@@ -31,6 +42,87 @@ class TestLambdaHandler(unittest.TestCase):
         # 2. Validate the content of the Excel file
         # Note: These steps should be done manually unless you want to write code to perform these validations
 
+    def test_coordinator_without_context(self):
+        """Test that the coordinator mode is rejected without a Lambda context."""
+        with mock.patch.object(s3_interface_url_getter, 'get_s3_client') as get_s3_client:
+            response = lambda_handler({'mode': 'coordinator'}, None)
+
+        self.assertEqual(response['statusCode'], 400)
+        self.assertEqual(json.loads(response['body']),
+                         'Coordinator mode requires a Lambda context.')
+        get_s3_client.assert_not_called()
+
+    def test_full_scan_keeps_event_rows(self):
+        """Test that a full scan after an event invocation keeps the rows of the event."""
+        root_dir = tempfile.mkdtemp()
+        s3_client = LocalS3Client(root_dir)
+        with open('src/tests/test_data/interfaces.json', 'rb') as file:
+            body = file.read()
+
+        def event_for(key):
+            return {'Records': [{'eventSource': 'aws:s3',
+                                 's3': {'bucket': {'name': BUCKET}, 'object': {'key': key}}}]}
+
+        try:
+            with mock.patch.object(s3_interface_url_getter, 'get_s3_client',
+                                   return_value=s3_client):
+                s3_client.put_object(Bucket=BUCKET, Key='in/event.json', Body=body)
+                lambda_handler(event_for('in/event.json'), None)
+
+                s3_client.put_object(Bucket=BUCKET, Key='in/scanned.json', Body=body)
+                lambda_handler({'mode': 'full_scan'}, None)
+
+                # A full scan without files keeps the rows too
+                lambda_handler({'mode': 'full_scan'}, None)
+
+            excel = s3_client.get_object(
+                Bucket=BUCKET, Key='out/interfaces_diagrams_urls.xlsx')['Body'].read()
+        finally:
+            shutil.rmtree(root_dir)
+
+        self.assertEqual(sorted(pd.read_excel(io.BytesIO(excel))['file_name']),
+                         ['event.json', 'scanned.json'])
+
+    def test_get_event_keys(self):
+        """Test that the keys of the S3 event records of the bucket are extracted."""
+        event = {'Records': [
+            {'eventSource': 'aws:s3',
+             's3': {'bucket': {'name': BUCKET}, 'object': {'key': 'in/My+App%281%29.json'}}},
+            {'eventSource': 'aws:s3',
+             's3': {'bucket': {'name': 'other-bucket'}, 'object': {'key': 'in/other.json'}}},
+            {'eventSource': 'aws:s3',
+             's3': {'bucket': {'name': BUCKET}, 'object': {'key': 'in/My+App%281%29.json'}}}
+        ]}
+
+        self.assertEqual(get_event_keys(event, BUCKET), ['in/My App(1).json'])
+
+    def test_get_event_keys_full_scan(self):
+        """Test that non S3 events and explicit requests fall back to a full scan."""
+        self.assertIsNone(get_event_keys({'source': 'aws.events'}, BUCKET))
+        self.assertIsNone(get_event_keys({'mode': 'full_scan', 'Records': [{}]}, BUCKET))
+
+    def test_get_time_budget(self):
+        """Test that the time kept to save the results is deducted from the budget."""
+        class Context:  # pylint: disable=too-few-public-methods
+            """Lambda context stand-in."""
+            remaining = 0
+
+            def get_remaining_time_in_millis(self):
+                """Return the remaining time of the invocation."""
+                return self.remaining
+
+        context = Context()
+        context.remaining = (SAVE_MARGIN_SECONDS + 60) * 1000
+        self.assertEqual(get_time_budget(context), 60)
+        context.remaining = 1000
+        self.assertEqual(get_time_budget(context), 0)
+        self.assertIsNone(get_time_budget(None))
+
+        # The workers of a coordinator also keep the time to save their results
+        context.remaining = (2 * SAVE_MARGIN_SECONDS + 60) * 1000
+        self.assertAlmostEqual(get_shard_deadline(context), time.time() + 60, delta=5)
+        self.assertIsNone(get_shard_deadline(None))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,13 @@
 """
 This module contains tests for the Lambda function.
 """
+import base64
+import gzip
 import json
 import unittest
 
 # Import your lambda_handler function from your script
-from src.main.lambda_api_function import lambda_handler
+from src.main.lambda_api_function import MAX_BATCH_SIZE, lambda_handler
 
 
 class TestLambdaApiFunction(unittest.TestCase):
@@ -45,6 +47,95 @@ class TestLambdaApiFunction(unittest.TestCase):
         # you can add an assertion to check that as well
         self.assertIn('http', result['body'])
 
+    def test_lambda_handler_batch(self):
+        """
+        Test a batch request, with a valid and an invalid diagram.
+        """
+        event = {'body': json.dumps({'diagrams': {
+            'valid': self.interface_data,
+            'invalid': [{'code_id': 'missing fields'}]
+        }})}
+
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result['statusCode'], 200)
+        results = json.loads(result['body'])['results']
+        self.assertEqual(results['valid']['url'],
+                         lambda_handler(self.test_event, None)['body'])
+        self.assertIn('error', results['invalid'])
+
+    def test_lambda_handler_invalid_batch(self):
+        """
+        Test that malformed and oversized batches are rejected.
+        """
+        for body in ({'diagram': {}},
+                     {'diagrams': {str(index): [] for index in range(MAX_BATCH_SIZE + 1)}}):
+            result = lambda_handler({'body': json.dumps(body)}, None)
+            self.assertEqual(result['statusCode'], 400)
+            self.assertIn('error', json.loads(result['body']))
+
+    def test_lambda_handler_compressed(self):
+        """
+        Test a gzip request body and a gzip response.
+        """
+        event = {
+            'body': base64.b64encode(gzip.compress(self.test_event['body'].encode())).decode(),
+            'isBase64Encoded': True,
+            'headers': {'Content-Encoding': 'gzip', 'Accept-Encoding': 'gzip, deflate'}
+        }
+
+        result = lambda_handler(event, None)
+
+        self.assertEqual(result['statusCode'], 200)
+        self.assertTrue(result['isBase64Encoded'])
+        self.assertEqual(result['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(base64.b64decode(result['body'])).decode(),
+                         lambda_handler(self.test_event, None)['body'])
+
+    def test_lambda_handler_invalid_encoding(self):
+        """
+        Test that unsupported and corrupted bodies are rejected.
+        """
+        event = {'body': self.test_event['body'], 'headers': {'content-encoding': 'br'}}
+        self.assertEqual(lambda_handler(event, None)['statusCode'], 415)
+
+        event['headers']['content-encoding'] = 'gzip'
+        self.assertEqual(lambda_handler(event, None)['statusCode'], 400)
+
+    def test_lambda_handler_response_modes(self):
+        """
+        Test the xml, drawio and redirect response modes.
+        """
+        url = lambda_handler(self.test_event, None)['body']
+
+        result = lambda_handler(dict(self.test_event, queryStringParameters={'format': 'xml'}),
+                                None)
+        self.assertEqual(result['statusCode'], 200)
+        self.assertEqual(result['headers']['Content-Type'], 'application/xml')
+        self.assertTrue(result['body'].startswith('<mxfile'))
+
+        result = lambda_handler(dict(self.test_event, headers={'X-Diagram-Format': 'drawio'}),
+                                None)
+        self.assertEqual(result['headers']['Content-Type'], 'application/vnd.jgraph.mxfile')
+        self.assertIn('attachment', result['headers']['Content-Disposition'])
+
+        result = lambda_handler(
+            dict(self.test_event, queryStringParameters={'format': 'redirect'}), None)
+        self.assertEqual(result['statusCode'], 302)
+        self.assertEqual(result['headers']['Location'], url)
+        self.assertEqual(result['body'], '')
+
+    def test_lambda_handler_invalid_mode(self):
+        """
+        Test that unknown modes, and modes not supported by batches, are rejected.
+        """
+        event = dict(self.test_event, queryStringParameters={'format': 'png'})
+        self.assertEqual(lambda_handler(event, None)['statusCode'], 400)
+
+        event = {'body': json.dumps({'diagrams': {'a': self.interface_data}}),
+                 'queryStringParameters': {'format': 'redirect'}}
+        self.assertEqual(lambda_handler(event, None)['statusCode'], 400)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,7 +4,10 @@ import json
 import shutil
 import unittest
 
+import pandas as pd
+
 from src.main.local_interface_url_getter import LocalInterfaceURLGetter
+from src.main.result_collector import body_hash
 
 
 class TestLocalInterfaceURLGetter(unittest.TestCase):
@@ -60,6 +63,182 @@ class TestLocalInterfaceURLGetter(unittest.TestCase):
         self.assertEqual(
             self.getter.data_frame.loc[0, 'body'], json.dumps(sample_data))
 
+    def test_process_single_file_without_body(self):
+        """Test that the body is replaced by its hash and backup path when not stored."""
+        getter = LocalInterfaceURLGetter(
+            self.source_dir, self.excel_file, store_body=False)
+
+        with open('./src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as json_file:
+            sample_data = json.load(json_file)
+
+        test_file_path = os.path.join(self.source_dir, 'sample.json')
+        with open(test_file_path, 'w', encoding='utf-8') as json_file:
+            json.dump(sample_data, json_file)
+
+        getter.process_single_file('sample.json')
+
+        data_frame = getter.data_frame
+        self.assertNotIn('body', data_frame.columns)
+        self.assertEqual(data_frame.loc[0, 'body_hash'],
+                         body_hash(json.dumps(sample_data)))
+        self.assertEqual(data_frame.loc[0, 'body_ref'],
+                         os.path.join(self.backup_dir, 'sample.json'))
+        self.assertEqual(getter.load_body(
+            data_frame.loc[0, 'body_ref']), sample_data)
+
+    def test_process_single_file_streamed(self):
+        """Test that streaming the records gives the same results as loading the file."""
+        with open('./src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as json_file:
+            sample_data = json.load(json_file)
+
+        results = {}
+        for store_body in (True, False):
+            for stream_records in (False, True):
+                test_file_path = os.path.join(self.source_dir, 'sample.json')
+                with open(test_file_path, 'w', encoding='utf-8') as json_file:
+                    json.dump(sample_data, json_file, indent=4)
+
+                getter = LocalInterfaceURLGetter(
+                    self.source_dir, self.excel_file, store_body=store_body,
+                    stream_records=stream_records)
+                getter.process_single_file('sample.json')
+                results[store_body, stream_records] = getter.data_frame.to_dict('records')
+
+                os.remove(os.path.join(self.backup_dir, 'sample.json'))
+
+        self.assertEqual(results[True, True], results[True, False])
+        self.assertEqual(results[False, True], results[False, False])
+
+    def test_streamed_file_identical_to_backup(self):
+        """Test that a streamed file identical to its backup is deleted."""
+        getter = LocalInterfaceURLGetter(
+            self.source_dir, self.excel_file, stream_records=True)
+
+        for directory in (self.source_dir, self.backup_dir):
+            shutil.copy('./src/tests/test_data/interfaces.json',
+                        os.path.join(directory, 'sample.json'))
+
+        getter.process_single_file('sample.json')
+
+        self.assertEqual(len(getter.results), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.source_dir, 'sample.json')))
+
+    def test_process_csv_file(self):
+        """Test that a CSV export gives one row per connected app, with a loadable body."""
+        getter = LocalInterfaceURLGetter(self.source_dir, self.excel_file, store_body=False)
+        shutil.copy('./src/tests/test_data/interfaces.csv',
+                    os.path.join(self.source_dir, 'export.csv'))
+
+        getter.process_json_files()
+
+        rows = getter.data_frame.to_dict('records')
+        self.assertEqual([(row['connected_app'], row['file_name']) for row in rows],
+                         [('3PL', 'export.csv#3PL')])
+        self.assertTrue(rows[0]['url'].startswith('https://viewer.diagrams.net/'))
+        self.assertTrue(os.path.exists(os.path.join(self.backup_dir, 'export.csv')))
+        self.assertEqual(len(getter.load_body(rows[0]['body_ref'])), 43)
+
+    def test_csv_file_without_valid_partition(self):
+        """Test that a CSV export whose partitions all fail is moved to the error
+        directory."""
+        getter = LocalInterfaceURLGetter(self.source_dir, self.excel_file,
+                                         partition_key='code_id')
+        with open(os.path.join(self.source_dir, 'export.csv'), 'w', encoding='utf-8') as file:
+            file.write('code_id,direction,app_name\nIF_1,Inbound,App A\nIF_2,Inbound,App B\n')
+
+        getter.process_json_files()
+
+        self.assertEqual(len(getter.results), 0)
+        self.assertTrue(os.path.exists(os.path.join(self.error_dir, 'export.csv')))
+        self.assertFalse(os.path.exists(os.path.join(self.backup_dir, 'export.csv')))
+
+    def assert_only_good_file_processed(self, getter):
+        """Check that bad.csv was moved to the error directory and good.json processed."""
+        self.assertEqual(list(getter.data_frame['file_name']), ['good.json'])
+        self.assertTrue(os.path.exists(os.path.join(self.error_dir, 'bad.csv')))
+        self.assertTrue(os.path.exists(os.path.join(self.backup_dir, 'good.json')))
+        self.assertFalse(os.path.exists(os.path.join(self.source_dir, 'bad.csv')))
+
+    def test_csv_file_missing_column(self):
+        """Test that a CSV export without the code_id column is moved to the error
+        directory and the other files are still processed."""
+        shutil.copy('./src/tests/test_data/interfaces.json',
+                    os.path.join(self.source_dir, 'good.json'))
+        with open(os.path.join(self.source_dir, 'bad.csv'), 'w', encoding='utf-8') as file:
+            file.write('direction,app_type,app_name\nInbound,Target,App A\n')
+
+        self.getter.process_json_files()
+
+        self.assert_only_good_file_processed(self.getter)
+
+    def test_csv_row_missing_fields(self):
+        """Test that a CSV export with a row missing fields is moved to the error
+        directory and the other files are still processed."""
+        shutil.copy('./src/tests/test_data/interfaces.json',
+                    os.path.join(self.source_dir, 'good.json'))
+        with open('./src/tests/test_data/interfaces.csv', 'r', encoding='utf-8-sig') as file:
+            export = file.read()
+        with open(os.path.join(self.source_dir, 'bad.csv'), 'w', encoding='utf-8') as file:
+            file.write(export.rstrip('\n') + '\nIF_1,Inbound,Target\n')
+
+        self.getter.process_json_files()
+
+        self.assert_only_good_file_processed(self.getter)
+
+    def test_results_spilled_in_chunks(self):
+        """Test that the results flushed in chunks are all saved to the Excel file."""
+        getter = LocalInterfaceURLGetter(self.source_dir, self.excel_file, chunk_size=2)
+        for index in range(5):
+            shutil.copy('./src/tests/test_data/interfaces.json',
+                        os.path.join(self.source_dir, f'sample_{index}.json'))
+
+        getter.process_json_files()
+        getter.save_results()
+
+        self.assertEqual(getter.results.sink.chunks, 2)
+        self.assertEqual(sorted(pd.read_excel(self.excel_file)['file_name']),
+                         [f'sample_{index}.json' for index in range(5)])
+
+    def test_manifest_skips_processed_files(self):
+        """Test that a file processed by a previous run is not processed again."""
+        manifest_path = os.path.join(self.source_dir, 'manifest.db')
+        sample_path = os.path.join(self.source_dir, 'sample.json')
+
+        shutil.copy('./src/tests/test_data/interfaces.json', sample_path)
+        getter = LocalInterfaceURLGetter(self.source_dir, self.excel_file,
+                                         manifest_path=manifest_path)
+        getter.process_json_files()
+        self.assertEqual(len(getter.results), 1)
+
+        # Copied again with a new modification time but the same content
+        shutil.copy('./src/tests/test_data/interfaces.json', sample_path)
+        os.remove(os.path.join(self.backup_dir, 'sample.json'))
+        next_getter = LocalInterfaceURLGetter(self.source_dir, self.excel_file,
+                                              manifest_path=manifest_path)
+        next_getter.process_json_files()
+
+        self.assertEqual(len(next_getter.results), 0)
+        self.assertFalse(os.path.exists(sample_path))
+
+        entry = next_getter.manifest_run.manifest.lookup('sample.json')
+        self.assertEqual((entry.status, entry.run_id),
+                         ('done', getter.manifest_run.run_id))
+
+    def test_manifest_run_finished_once_processed(self):
+        """Test that the run is finished by process_json_files, not by each file."""
+        shutil.copy('./src/tests/test_data/interfaces.json',
+                    os.path.join(self.source_dir, 'sample.json'))
+        getter = LocalInterfaceURLGetter(
+            self.source_dir, self.excel_file,
+            manifest_path=os.path.join(self.source_dir, 'manifest.db'))
+        manifest, run_id = getter.manifest_run.manifest, getter.manifest_run.run_id
+
+        getter.process_single_file('sample.json')
+        self.assertIsNone(manifest.finished_at(run_id))
+
+        getter.process_json_files()
+        self.assertIsNotNone(manifest.finished_at(run_id))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,97 @@
+"""Unit tests for the manifest module."""
+import unittest
+
+from src.main.manifest import (STATUS_DONE, STATUS_ERROR, STATUS_PROCESSING,
+                               STATUS_UNCHANGED, Manifest, ManifestRun, url_hash)
+from src.main.storage import ObjectInfo
+
+
+class TestManifest(unittest.TestCase):
+    """Test cases for the Manifest and ManifestRun classes."""
+
+    def setUp(self):
+        """Open an in-memory manifest."""
+        self.manifest = Manifest(':memory:')
+
+    def tearDown(self):
+        """Close the manifest."""
+        self.manifest.close()
+
+    def test_lookup_after_commit(self):
+        """Test that a run records the outcome of its files when committed."""
+        run = ManifestRun(self.manifest)
+        info = ObjectInfo('a.json', 10, 'etag-a', 1.0)
+
+        self.assertTrue(run.begin('a.json', info, lambda: 'hash-a'))
+        self.assertEqual(self.manifest.lookup('a.json').status, STATUS_PROCESSING)
+        self.assertIsNone(self.manifest.lookup('b.json'))
+
+        run.track('a.json', content_hash='hash-a')
+        run.track('a.json', status=STATUS_DONE, url_hash=url_hash('url'))
+        run.commit()
+
+        entry = self.manifest.lookup('a.json')
+        self.assertEqual((entry.status, entry.content_hash, entry.url_hash, entry.run_id),
+                         (STATUS_DONE, 'hash-a', url_hash('url'), run.run_id))
+
+    def test_finish_once(self):
+        """Test that a run is only finished by finish, not by its commits."""
+        run = ManifestRun(self.manifest)
+        run.commit()
+        self.assertIsNone(self.manifest.finished_at(run.run_id))
+
+        run.finish()
+        finished_at = self.manifest.finished_at(run.run_id)
+        self.assertIsNotNone(finished_at)
+
+        run.commit()
+        run.finish()
+        self.assertEqual(self.manifest.finished_at(run.run_id), finished_at)
+
+    def test_already_processed(self):
+        """Test that processed files are recognized by ETag or content hash."""
+        run = ManifestRun(self.manifest)
+        run.begin('a.json', ObjectInfo('a.json', 10, 'etag-a', 1.0), lambda: 'hash-a')
+        run.track('a.json', status=STATUS_DONE, content_hash='hash-a')
+        run.commit()
+
+        next_run = ManifestRun(self.manifest)
+        self.assertFalse(next_run.begin(
+            'a.json', ObjectInfo('a.json', 10, 'etag-a', 1.0), self.fail))
+        self.assertFalse(next_run.begin(
+            'a.json', ObjectInfo('a.json', 10, 'etag-b', 2.0), lambda: 'hash-a'))
+        self.assertTrue(next_run.begin(
+            'a.json', ObjectInfo('a.json', 10, 'etag-c', 3.0), lambda: 'hash-c'))
+        self.assertTrue(next_run.is_known('a.json'))
+
+    def test_failed_files_stay_incomplete(self):
+        """Test that the files of failed operations can be resumed."""
+        run = ManifestRun(self.manifest)
+        for name in ('a.json', 'b.json'):
+            run.begin(name, ObjectInfo(name, 1, name, 1.0), lambda: '')
+            run.track(name, status=STATUS_DONE)
+        run.commit(failed=['b.json'])
+
+        self.assertEqual([entry.file_name for entry in self.manifest.incomplete()],
+                         ['b.json'])
+
+    def test_changed_since(self):
+        """Test listing the files processed after a run."""
+        first_run = ManifestRun(self.manifest)
+        first_run.begin('a.json', ObjectInfo('a.json', 1, 'a', 1.0), lambda: '')
+        first_run.track('a.json', status=STATUS_DONE)
+        first_run.commit()
+
+        second_run = ManifestRun(self.manifest)
+        for name, status in (('b.json', STATUS_ERROR), ('c.json', STATUS_UNCHANGED)):
+            second_run.begin(name, ObjectInfo(name, 1, name, 1.0), lambda: '')
+            second_run.track(name, status=status)
+        second_run.commit()
+
+        self.assertEqual([entry.file_name for entry in
+                          self.manifest.changed_since(first_run.run_id)], ['b.json'])
+        self.assertEqual(len(self.manifest.changed_since(0)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Unit tests for the profiling module."""
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.main.data_definitions import SourceStructure
+from src.main.interface_diagram import InterfaceDiagram
+from src.main.json_parser import JSONParser
+from src.main.lambda_api_function import lambda_handler
+from src.main.local_interface_url_getter import LocalInterfaceURLGetter
+from src.main.profiling import (PROFILE_DESTINATION_ENV, PROFILE_ENV, profile_invocation,
+                                profiled, profiling_requested)
+
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for the profiling sessions and the profiled functions."""
+
+    def setUp(self):
+        """Load the sample records and create the destination directory."""
+        with open('src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as file:
+            self.records = json.load(file)
+        self.interfaces = JSONParser.json_to_object(
+            [SourceStructure(**item) for item in self.records])
+
+        temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(temp_dir.cleanup)
+        self.destination = temp_dir.name
+
+    def written_files(self):
+        """Return the report files written to the destination."""
+        return sorted(os.path.join(root, name)
+                      for root, _, names in os.walk(self.destination) for name in names)
+
+    def test_profiling_requested(self):
+        """Test the modes of the DIAGRAM_PROFILE variable."""
+        for mode, flag, expected in (('off', True, False), ('always', False, True),
+                                     ('request', False, False), ('request', True, True)):
+            with mock.patch.dict(os.environ, {PROFILE_ENV: mode}):
+                self.assertEqual(profiling_requested(flag), expected)
+
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertFalse(profiling_requested(True))
+
+    def test_no_session(self):
+        """Test that a profiled function runs unchanged without a session."""
+        self.assertEqual(profiled(lambda value: value * 2)(21), 42)
+
+        with profile_invocation(False, self.destination) as session:
+            self.assertIsNone(session)
+            InterfaceDiagram(self.interfaces).generate_diagram_url()
+
+        self.assertEqual(self.written_files(), [])
+
+    def test_session_writes_reports(self):
+        """Test the reports of a profiled call, the nested calls being part of it."""
+        with profile_invocation(True, self.destination) as session:
+            url = InterfaceDiagram(self.interfaces).generate_diagram_url()
+
+        self.assertEqual(url, InterfaceDiagram(self.interfaces).generate_diagram_url())
+        self.assertEqual(len(session.written), 1)
+
+        prof_file, txt_file = self.written_files()
+        self.assertTrue(prof_file.endswith('InterfaceDiagram.generate_diagram_url.prof'))
+        self.assertGreater(pstats.Stats(prof_file).total_calls, 0)
+        with open(txt_file, 'r', encoding='utf-8') as report:
+            content = report.read()
+        self.assertIn('build_xml_file', content)
+        self.assertIn('allocation sites', content)
+
+    def test_getter_profiles_each_file(self):
+        """Test that the getters profile the processing of each file."""
+        source_dir = os.path.join(self.destination, 'in')
+        os.makedirs(os.path.join(source_dir, 'backup'))
+        shutil.copy('src/tests/test_data/interfaces.json', source_dir)
+        getter = LocalInterfaceURLGetter(source_dir,
+                                         os.path.join(self.destination, 'urls.xlsx'))
+
+        reports = os.path.join(self.destination, 'profiles')
+        with profile_invocation(True, reports) as session:
+            getter.process_json_files()
+
+        self.assertEqual(len(getter.results), 1)
+        self.assertEqual(len(session.written), 1)
+        self.assertTrue(session.written[0].endswith('_process_file-interfaces.json'))
+
+    def test_api_profile_request(self):
+        """Test that the API profiles the requests asking for it."""
+        environment = {PROFILE_ENV: 'request', PROFILE_DESTINATION_ENV: self.destination}
+        event = {'body': json.dumps(self.records)}
+
+        with mock.patch.dict(os.environ, environment):
+            expected = lambda_handler(event, None)['body']
+            self.assertEqual(self.written_files(), [])
+
+            event['headers'] = {'X-Diagram-Profile': '1'}
+            self.assertEqual(lambda_handler(event, None)['body'], expected)
+
+        self.assertEqual(len(self.written_files()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+"""Unit tests for the render profile."""
+import unittest
+
+from src.main import config
+from src.main.render_profile import app_style, get_render_profile
+
+
+class TestRenderProfile(unittest.TestCase):
+    """Test cases for the get_render_profile function."""
+
+    def test_profile_is_cached(self):
+        """Test that the profile is built once."""
+        self.assertIs(get_render_profile(), get_render_profile())
+
+    def test_profile_follows_config(self):
+        """Test that the styles and offsets are derived from the config constants."""
+        profile = get_render_profile()
+
+        fill_color, stroke_color = config.COLOR_MAP['gateway']
+        self.assertEqual(profile.app_styles['gateway'], app_style(fill_color, stroke_color))
+        self.assertIn(f'fillColor={config.CONNECTION_OUT_FILL_COLOR};',
+                      profile.connection_styles[config.OUTBOUND])
+        self.assertIn(f'fillColor={config.CONNECTION_IN_FILL_COLOR};',
+                      profile.connection_styles[config.INBOUND])
+        self.assertEqual(profile.column_width, config.APP_WIDTH * config.APP_SIZE_SPACE)
+        self.assertEqual(profile.row_height, config.PROTOCOL_HEIGHT + config.Y_OFFSET)
+        self.assertEqual(profile.protocol_positions['out'], config.PROTOCOL_OUT_POSITION)
+
+
+if __name__ == '__main__':
+    unittest.main()
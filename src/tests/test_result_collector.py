@@ -0,0 +1,95 @@
+"""Unit tests for the ResultCollector class."""
+import json
+import unittest
+
+from src.main.result_collector import (
+    REFERENCE_COLUMNS, RESULT_COLUMNS, ResultCollector, body_hash)
+
+
+class TestResultCollector(unittest.TestCase):
+    """Test cases for the ResultCollector class."""
+
+    def test_to_data_frame_builds_rows_in_order(self):
+        """Test that the buffered rows are returned in insertion order."""
+        collector = ResultCollector()
+        collector.append('App A', '[]', 'a.json', 'url_a')
+        collector.append('App B', '[]', 'b.json', 'url_b')
+
+        data_frame = collector.to_data_frame()
+
+        self.assertEqual(list(data_frame.columns), RESULT_COLUMNS)
+        self.assertEqual(list(data_frame['file_name']), ['a.json', 'b.json'])
+        self.assertEqual(len(collector), 2)
+
+    def test_empty_collector(self):
+        """Test that an empty collector returns an empty DataFrame with the columns."""
+        data_frame = ResultCollector().to_data_frame()
+
+        self.assertTrue(data_frame.empty)
+        self.assertEqual(list(data_frame.columns), RESULT_COLUMNS)
+
+    def test_append_empty_row(self):
+        """Test that the empty row only contains missing values."""
+        collector = ResultCollector()
+        collector.append_empty_row()
+
+        self.assertTrue(collector.to_data_frame().isna().all().all())
+
+    def test_append_wrong_number_of_values(self):
+        """Test that a row with the wrong size is rejected."""
+        with self.assertRaises(ValueError):
+            ResultCollector().append('App A', 'a.json')
+
+    def test_chunks_are_spilled_without_sink(self):
+        """Test that flushed chunks are spilled and read back when no sink is given."""
+        collector = ResultCollector(chunk_size=2)
+        for index in range(5):
+            collector.append('App', '[]', f'{index}.json', 'url')
+
+        # Only the rows of the last, incomplete chunk are held in memory
+        self.assertEqual(len(collector._rows), 1)  # pylint: disable=protected-access
+
+        data_frame = collector.to_data_frame()
+
+        self.assertEqual(len(data_frame), 5)
+        self.assertEqual(list(data_frame.index), list(range(5)))
+        self.assertEqual(data_frame.loc[4, 'file_name'], '4.json')
+
+    def test_chunks_are_handed_to_sink(self):
+        """Test that flushed chunks go to the sink and are not retained."""
+        chunks = []
+        collector = ResultCollector(chunk_size=2, sink=chunks.append)
+        for index in range(5):
+            collector.append('App', '[]', f'{index}.json', 'url')
+        collector.flush()
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(len(collector), 5)
+        self.assertTrue(collector.to_data_frame().empty)
+
+    def test_clear_drops_spilled_chunks(self):
+        """Test that clearing the collector drops the spilled chunks."""
+        collector = ResultCollector(chunk_size=2)
+        for index in range(3):
+            collector.append('App', '[]', f'{index}.json', 'url')
+        collector.clear()
+        collector.append('App', '[]', 'new.json', 'url')
+
+        self.assertEqual(list(collector.to_data_frame()['file_name']), ['new.json'])
+        self.assertEqual(len(collector), 1)
+
+    def test_append_result_stores_reference(self):
+        """Test that the body is replaced by its hash and reference when not stored."""
+        data = [{'app_name': 'App A'}]
+        collector = ResultCollector(store_body=False)
+        collector.append_result('App A', data, 'a.json', 'url_a', 'backup/a.json')
+
+        data_frame = collector.to_data_frame()
+
+        self.assertEqual(list(data_frame.columns), REFERENCE_COLUMNS)
+        self.assertEqual(data_frame.loc[0, 'body_hash'], body_hash(json.dumps(data)))
+        self.assertEqual(data_frame.loc[0, 'body_ref'], 'backup/a.json')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Unit tests for the S3InterfaceURLGetter class, run against a LocalS3Client."""
+import io
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.main.local_s3_client import LocalS3Client
+from src.main.s3_interface_url_getter import S3InterfaceURLGetter
+from src.main.time_budget import TimeBudget
+
+BUCKET = 'interface-diagram-files'
+SOURCE_DIR = f's3://{BUCKET}/in/'
+EXCEL_FILE = f's3://{BUCKET}/out/interfaces_diagrams_urls.xlsx'
+
+
+class TestS3InterfaceURLGetter(unittest.TestCase):
+    """Test cases for the S3InterfaceURLGetter class."""
+
+    def setUp(self):
+        """Create a local S3 stand-in with a few JSON files in the source directory."""
+        self.root_dir = tempfile.mkdtemp()
+        self.s3_client = LocalS3Client(self.root_dir)
+
+        with open('src/tests/test_data/interfaces.json', 'r', encoding='utf-8') as file:
+            self.body = file.read()
+
+        for index in range(3):
+            self.s3_client.put_object(
+                Bucket=BUCKET, Key=f'in/file_{index}.json', Body=self.body)
+
+    def tearDown(self):
+        """Remove the local S3 stand-in."""
+        shutil.rmtree(self.root_dir)
+
+    def _keys(self, prefix):
+        response = self.s3_client.list_objects(Bucket=BUCKET, Prefix=prefix)
+        return [content['Key'] for content in response.get('Contents', [])]
+
+    def _read_excel(self):
+        response = self.s3_client.get_object(
+            Bucket=BUCKET, Key='out/interfaces_diagrams_urls.xlsx')
+        return pd.read_excel(io.BytesIO(response['Body'].read()), engine='openpyxl')
+
+    def _getter(self):
+        return S3InterfaceURLGetter(
+            SOURCE_DIR, EXCEL_FILE, s3_client=self.s3_client, store_body=False)
+
+    def test_process_keys_only_processes_given_keys(self):
+        """Test that only the given keys of the source directory are processed."""
+        getter = self._getter()
+        added = getter.process_keys([
+            'in/file_1.json', 'in/backup/file_0.json', 'out/file_2.json', 'in/missing.json'])
+
+        self.assertEqual(added, 1)
+        self.assertEqual(list(getter.data_frame['file_name']), ['file_1.json'])
+        self.assertEqual(self._keys('in/'),
+                         ['in/backup/file_1.json', 'in/file_0.json', 'in/file_2.json'])
+
+    def test_time_budget_and_checkpoint(self):
+        """Test that a run stopped by its time budget is continued from its checkpoint."""
+        clock = iter(range(100)).__next__
+        getter = self._getter()
+        getter.time_budget = TimeBudget(3.5, clock=clock)
+
+        getter.process_json_files()
+        getter.save_results()
+        getter.save_checkpoint()
+
+        self.assertEqual((len(getter.results), getter.remaining), (1, 2))
+        self.assertEqual(getter.read_checkpoint()['remaining'], 2)
+        self.assertEqual(self._keys('in/'), ['in/backup/file_0.json',
+                                             'in/checkpoint/continuation.json',
+                                             'in/file_1.json', 'in/file_2.json'])
+
+        next_getter = self._getter()
+        next_getter.set_time_budget(60)
+        next_getter.process_json_files()
+        next_getter.save_results(merge=True)
+        next_getter.clear_checkpoint()
+
+        self.assertEqual(next_getter.remaining, 0)
+        self.assertIsNone(next_getter.read_checkpoint())
+        self.assertEqual(sorted(self._read_excel()['file_name']),
+                         ['file_0.json', 'file_1.json', 'file_2.json'])
+
+    def test_save_results_merge(self):
+        """Test that merged results replace the rows of the same files only."""
+        getter = self._getter()
+        getter.process_json_files()
+        getter.save_results()
+
+        self.s3_client.put_object(Bucket=BUCKET, Key='in/file_1.json', Body=self.body)
+        self.s3_client.delete_object(Bucket=BUCKET, Key='in/backup/file_1.json')
+
+        getter = self._getter()
+        getter.process_keys(['in/file_1.json'])
+        getter.save_results(merge=True)
+
+        data_frame = self._read_excel()
+        self.assertEqual(sorted(data_frame['file_name']),
+                         ['file_0.json', 'file_1.json', 'file_2.json'])
+
+    def test_save_results_merge_retries_on_conflict(self):
+        """Test that the merge is retried when the Excel file changed meanwhile."""
+        getter = self._getter()
+        getter.process_keys(['in/file_0.json'])
+
+        other_getter = self._getter()
+        other_getter.process_keys(['in/file_1.json'])
+
+        original_read_excel = getter._read_excel  # pylint: disable=protected-access
+
+        def read_excel_then_conflict():
+            result = original_read_excel()
+            if not self._keys('out/'):
+                # Another invocation writes the file between the read and the write
+                other_getter.save_results(merge=True)
+            return result
+
+        getter._read_excel = read_excel_then_conflict  # pylint: disable=protected-access
+        getter.save_results(merge=True)
+
+        self.assertEqual(sorted(self._read_excel()['file_name']),
+                         ['file_0.json', 'file_1.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
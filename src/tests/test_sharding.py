@@ -0,0 +1,104 @@
+"""Unit tests for the sharding module."""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.main.local_interface_url_getter import LocalInterfaceURLGetter
+from src.main.sharding import (ShardCoordinator, ShardError, SubprocessShardDispatcher,
+                               partition_keys, run_shard)
+from src.main.storage import ObjectInfo
+
+JSON_FILE = './src/tests/test_data/interfaces.json'
+
+
+class TestSharding(unittest.TestCase):
+    """Test cases for the shard partitioning and the coordinator."""
+
+    def setUp(self):
+        """Create a source directory with a few JSON files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, 'in')
+        self.excel_file = os.path.join(self.temp_dir, 'out', 'urls.xlsx')
+        os.makedirs(self.source_dir)
+        for index in range(5):
+            shutil.copy(JSON_FILE, os.path.join(self.source_dir, f'file_{index}.json'))
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def _getter(self):
+        return LocalInterfaceURLGetter(self.source_dir, self.excel_file)
+
+    def test_partition_keys(self):
+        """Test that the shards respect the limits and are balanced by size."""
+        infos = [ObjectInfo(f'{name}.json', size, '', 0)
+                 for name, size in zip('abcdef', (50, 40, 30, 20, 10, 10))]
+
+        shards = partition_keys(infos, max_keys=4, max_bytes=100)
+        self.assertEqual([(shard.keys, shard.size) for shard in shards],
+                         [(['a.json', 'd.json', 'e.json'], 80),
+                          (['b.json', 'c.json', 'f.json'], 80)])
+
+        shards = partition_keys(infos, max_keys=2, max_bytes=1000)
+        self.assertEqual(len(shards), 3)
+        self.assertTrue(all(len(shard.keys) == 2 for shard in shards))
+        self.assertEqual(partition_keys([]), [])
+
+    def test_subprocess_workers(self):
+        """Test that the results of the worker processes are collected once."""
+        getter = self._getter()
+        coordinator = ShardCoordinator(
+            getter, SubprocessShardDispatcher(self.source_dir, self.excel_file), max_workers=2)
+
+        summary = coordinator.run(max_keys=2)
+
+        self.assertEqual((summary['shards'], summary['records'], summary['failed']),
+                         (3, 5, []))
+        self.assertEqual(sorted(getter.data_frame['file_name']),
+                         [f'file_{index}.json' for index in range(5)])
+        self.assertEqual(getter.list_pending(), [])
+        self.assertEqual(os.listdir(os.path.dirname(self.excel_file)), ['urls.xlsx.shards'])
+        self.assertEqual(getter.remaining, 0)
+
+    def test_failed_shard(self):
+        """Test that the files of a failed shard are counted as remaining."""
+        def dispatcher(payload):
+            if 'file_0.json' in payload['keys']:
+                raise ShardError('worker failed')
+            return run_shard(self._getter(), payload['keys'], payload['result_key'])
+
+        getter = self._getter()
+        summary = ShardCoordinator(getter, dispatcher).run(max_keys=3)
+
+        self.assertEqual((summary['records'], len(summary['failed'])), (2, 1))
+        self.assertEqual(getter.remaining, 3)
+        self.assertEqual(len(getter.results), 2)
+
+    def test_shard_deadline(self):
+        """Test that the deadline of the coordinator is sent to the workers and caps
+        their time budget."""
+        payloads = []
+
+        def dispatcher(payload):
+            payloads.append(payload)
+            return run_shard(self._getter(), payload['keys'], payload['result_key'],
+                             payload['deadline'])
+
+        getter = self._getter()
+        summary = ShardCoordinator(getter, dispatcher).run(max_keys=3,
+                                                           deadline=time.time() - 1)
+
+        self.assertEqual(len(payloads), 2)
+        self.assertEqual((summary['records'], getter.remaining), (0, 5))
+
+        worker = self._getter()
+        worker.set_time_budget(3600)
+        run_shard(worker, [], os.path.join('shards', 'result.json'), time.time() + 60)
+        self.assertLessEqual(worker.time_budget.time_left, 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
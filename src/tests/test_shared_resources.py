@@ -0,0 +1,47 @@
+"""Unit tests for the shared_resources module."""
+import unittest
+from unittest import mock
+
+from src.main import shared_resources
+from src.main.s3_interface_url_getter import S3InterfaceURLGetter
+
+
+class TestSharedResources(unittest.TestCase):
+    """Test cases for the resources shared by the invocations of a container."""
+
+    def setUp(self):
+        """Start without shared resources."""
+        shared_resources.reset()
+        self.addCleanup(shared_resources.reset)
+
+    def test_client_created_once(self):
+        """Test that the S3 client is created once, with its tuned connection pool."""
+        with mock.patch('boto3.client') as create_client:
+            first = shared_resources.get_s3_client()
+            second = shared_resources.get_s3_client()
+
+        self.assertIs(first, second)
+        create_client.assert_called_once()
+        config = create_client.call_args.kwargs['config']
+        self.assertEqual(config.max_pool_connections, shared_resources.S3_MAX_POOL_CONNECTIONS)
+
+    def test_getters_share_client(self):
+        """Test that the S3 getters use the shared client."""
+        with mock.patch('boto3.client') as create_client:
+            first = S3InterfaceURLGetter('s3://bucket/in/', 's3://bucket/out/urls.xlsx')
+            second = S3InterfaceURLGetter('s3://bucket/in/', 's3://bucket/out/urls.xlsx')
+
+        self.assertIs(first.s3_client, second.s3_client)
+        create_client.assert_called_once()
+
+    def test_initialize_once(self):
+        """Test that the logging is configured by the first initialization only."""
+        with mock.patch.object(shared_resources, 'configure_logging') as configure:
+            shared_resources.initialize()
+            shared_resources.initialize()
+
+        configure.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Unit tests for the storage backends."""
+import hashlib
+import shutil
+import tempfile
+import unittest
+
+from src.main.local_s3_client import LocalS3Client
+from src.main.storage import (InMemoryStorage, LocalStorage, ObjectNotFoundError,
+                              PreconditionFailedError, S3Storage)
+
+
+class TestStorage(unittest.TestCase):
+    """Test cases run against every storage backend."""
+
+    def setUp(self):
+        """Create one storage of each backend."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.storages = {
+            'local': LocalStorage(f'{self.temp_dir}/local'),
+            'memory': InMemoryStorage(),
+            's3': S3Storage(LocalS3Client(f'{self.temp_dir}/s3'), 'bucket', 'in/')
+        }
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_put_get_and_list(self):
+        """Test that listings only return the objects directly under the prefix."""
+        for name, storage in self.storages.items():
+            with self.subTest(storage=name):
+                storage.put('b.json', b'[2]')
+                storage.put('a.json', b'[1]')
+                storage.put('backup/a.json', b'[0]')
+
+                self.assertEqual(storage.get('a.json'), b'[1]')
+                self.assertEqual([info.key for info in storage.list()],
+                                 ['a.json', 'b.json'])
+                self.assertEqual([info.key for info in storage.list('backup/')],
+                                 ['backup/a.json'])
+                self.assertEqual(storage.head('b.json').size, 3)
+
+    def test_open_and_digest(self):
+        """Test reading an object as a stream and hashing it."""
+        for name, storage in self.storages.items():
+            with self.subTest(storage=name):
+                storage.put('a.json', b'[1, 2, 3]')
+
+                stream = storage.open('a.json')
+                self.assertEqual(stream.read(), b'[1, 2, 3]')
+                stream.close()
+
+                self.assertEqual(storage.digest('a.json', chunk_size=2),
+                                 hashlib.sha256(b'[1, 2, 3]').hexdigest())
+                with self.assertRaises(ObjectNotFoundError):
+                    storage.open('missing.json')
+
+    def test_missing_objects(self):
+        """Test that missing objects raise ObjectNotFoundError."""
+        for name, storage in self.storages.items():
+            with self.subTest(storage=name):
+                self.assertFalse(storage.exists('missing.json'))
+                with self.assertRaises(ObjectNotFoundError):
+                    storage.get('missing.json')
+                with self.assertRaises(ObjectNotFoundError):
+                    storage.head('missing.json')
+                storage.delete('missing.json')
+
+    def test_move_and_delete_many(self):
+        """Test moving objects and deleting several objects at once."""
+        for name, storage in self.storages.items():
+            with self.subTest(storage=name):
+                storage.put('a.json', b'[1]')
+                storage.put('b.json', b'[2]')
+
+                storage.move('a.json', 'backup/a.json')
+                self.assertFalse(storage.exists('a.json'))
+                self.assertEqual(storage.get('backup/a.json'), b'[1]')
+
+                self.assertEqual(storage.delete_many(['b.json', 'backup/a.json']), [])
+                self.assertEqual(list(storage.list()), [])
+
+    def test_conditional_put(self):
+        """Test the IfMatch and IfNoneMatch conditions of put."""
+        for name, storage in self.storages.items():
+            with self.subTest(storage=name):
+                etag = storage.put('out.xlsx', b'first', if_none_match=True)
+                with self.assertRaises(PreconditionFailedError):
+                    storage.put('out.xlsx', b'second', if_none_match=True)
+
+                storage.put('out.xlsx', b'second', if_match=etag)
+                with self.assertRaises(PreconditionFailedError):
+                    storage.put('out.xlsx', b'third', if_match=etag)
+                self.assertEqual(storage.get('out.xlsx'), b'second')
+
+    def test_uri_round_trip(self):
+        """Test that key_from_uri is the inverse of uri."""
+        for name, storage in self.storages.items():
+            with self.subTest(storage=name):
+                self.assertEqual(storage.key_from_uri(storage.uri('backup/a.json')),
+                                 'backup/a.json')
+
+        self.assertEqual(self.storages['s3'].uri('a.json'), 's3://bucket/in/a.json')
+
+
+if __name__ == '__main__':
+    unittest.main()
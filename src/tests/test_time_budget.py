@@ -0,0 +1,56 @@
+"""Unit tests for the TimeBudget class."""
+import unittest
+
+from src.main.time_budget import TimeBudget
+
+
+class FakeClock:
+    """Clock advanced manually."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTimeBudget(unittest.TestCase):
+    """Test cases for the TimeBudget class."""
+
+    def test_longest_item_is_kept_in_reserve(self):
+        """Test that no item is started when the longest one would not fit."""
+        clock = FakeClock()
+        budget = TimeBudget(10, clock=clock)
+        self.assertTrue(budget.has_time_for_item())
+
+        budget.start_item()
+        clock.now = 4
+        budget.finish_item()
+        self.assertEqual(budget.longest_item, 4)
+        self.assertTrue(budget.has_time_for_item())
+
+        clock.now = 6.5
+        self.assertEqual(budget.time_left, 3.5)
+        self.assertFalse(budget.has_time_for_item())
+
+    def test_concurrent_items(self):
+        """Test that overlapping items are tracked by their own start time."""
+        clock = FakeClock()
+        budget = TimeBudget(10, clock=clock)
+
+        first = budget.start_item()
+        clock.now = 1
+        second = budget.start_item()
+        clock.now = 3
+        budget.finish_item(first)
+        budget.finish_item(second)
+
+        self.assertEqual(budget.longest_item, 3)
+
+    def test_exhausted_budget(self):
+        """Test that an empty budget allows no item."""
+        self.assertFalse(TimeBudget(0, clock=FakeClock()).has_time_for_item())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Unit tests for the WatchLocalInterfaceURLGetter class."""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.main.watch_local_interface_url_getter import WatchLocalInterfaceURLGetter
+
+JSON_FILE = './src/tests/test_data/interfaces.json'
+
+
+class TestWatchLocalInterfaceURLGetter(unittest.TestCase):
+    """Test cases for the WatchLocalInterfaceURLGetter class."""
+
+    def setUp(self):
+        """Create the source directory and the getter."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, 'in')
+        self.excel_file = os.path.join(self.temp_dir, 'urls.xlsx')
+        os.makedirs(self.source_dir)
+
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.getter = WatchLocalInterfaceURLGetter(
+            self.source_dir, self.excel_file, debounce=0.05, render_executor=self.executor)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.executor.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+    def read_file_names(self):
+        """Return the file names of the Excel file."""
+        return sorted(pd.read_excel(self.excel_file)['file_name'])
+
+    def test_process_batch_merges_results(self):
+        """Test that each batch is merged into the Excel file."""
+        shutil.copy(JSON_FILE, os.path.join(self.source_dir, 'a.json'))
+        self.assertEqual(self.getter.process_batch(['a.json', 'ignored.txt'], self.executor), 1)
+
+        shutil.copy(JSON_FILE, os.path.join(self.source_dir, 'b.json'))
+        self.assertEqual(self.getter.process_batch(['b.json', 'missing.json'],
+                                                   self.executor), 1)
+
+        self.assertEqual(self.read_file_names(), ['a.json', 'b.json'])
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, 'backup', 'b.json')))
+
+    def test_process_batch_moves_invalid_files(self):
+        """Test that invalid files are moved to the error directory while the valid
+        files of the batch are processed."""
+        with open(os.path.join(self.source_dir, 'a_malformed.json'), 'w',
+                  encoding='utf-8') as file:
+            file.write('[{"code_id": ')
+        with open(os.path.join(self.source_dir, 'b_incomplete.json'), 'w',
+                  encoding='utf-8') as file:
+            file.write('[{"code_id": "IF_1", "direction": "Inbound"}]')
+        shutil.copy(JSON_FILE, os.path.join(self.source_dir, 'c_valid.json'))
+
+        self.assertEqual(self.getter.process_batch(
+            ['a_malformed.json', 'b_incomplete.json', 'c_valid.json'], self.executor), 1)
+
+        self.assertEqual(self.read_file_names(), ['c_valid.json'])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.source_dir, 'error'))),
+                         ['a_malformed.json', 'b_incomplete.json'])
+
+    def test_watch_processes_dropped_files(self):
+        """Test that the existing and dropped files are processed while watching."""
+        shutil.copy(JSON_FILE, os.path.join(self.source_dir, 'existing.json'))
+
+        for use_inotify in (True, False):
+            with self.subTest(use_inotify=use_inotify):
+                stop_event = threading.Event()
+                watcher = threading.Thread(target=self.getter.watch, args=(stop_event,),
+                                           kwargs={'poll_interval': 0.02,
+                                                   'use_inotify': use_inotify})
+                watcher.start()
+                try:
+                    dropped = f'dropped_{use_inotify}.json'
+                    shutil.copy(JSON_FILE, os.path.join(self.source_dir, dropped))
+
+                    deadline = time.monotonic() + 10
+                    while os.path.exists(os.path.join(self.source_dir, dropped)) \
+                            and time.monotonic() < deadline:
+                        time.sleep(0.02)
+                finally:
+                    stop_event.set()
+                    watcher.join()
+
+                self.assertIn(dropped, self.read_file_names())
+
+        self.assertEqual(self.read_file_names(),
+                         ['dropped_False.json', 'dropped_True.json', 'existing.json'])
+
+    def test_watch_continues_after_invalid_file(self):
+        """Test that the watch keeps processing the files dropped after an invalid
+        file."""
+        stop_event = threading.Event()
+        watcher = threading.Thread(target=self.getter.watch, args=(stop_event,),
+                                   kwargs={'poll_interval': 0.02, 'use_inotify': False})
+        watcher.start()
+        try:
+            with open(os.path.join(self.source_dir, 'invalid.json'), 'w',
+                      encoding='utf-8') as file:
+                file.write('not json')
+            time.sleep(0.2)
+            shutil.copy(JSON_FILE, os.path.join(self.source_dir, 'valid.json'))
+
+            deadline = time.monotonic() + 10
+            while os.path.exists(os.path.join(self.source_dir, 'valid.json')) \
+                    and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            stop_event.set()
+            watcher.join()
+
+        self.assertEqual(self.read_file_names(), ['valid.json'])
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, 'error', 'invalid.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()